@@ -9,8 +9,9 @@ Agent handover notes:
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Callable, Iterator, Mapping
 
+from resilience import Deadline, ResilientToolRunner
 from tools import lookup_policy, summarize_context
 
 
@@ -24,6 +25,16 @@ FINAL_RESPONSE_KEYS = (
     "final_recommendation",
 )
 
+# Default tool registry; tests and runners may pass their own mapping.
+TOOLS: Mapping[str, Callable[[str], dict]] = {
+    "lookup_policy": lookup_policy,
+    "summarize_context": summarize_context,
+}
+
+REVIEW_CONFIDENCE_THRESHOLD = 0.8
+LOW_CONFIDENCE_NOTE = "Some tool outputs are low confidence; recommend human review."
+STAGES_COMPLETED_NOTE = "All required workflow stages completed."
+
 
 @dataclass
 class TaskState:
@@ -43,20 +54,104 @@ def plan_task(state: TaskState) -> TaskState:
     return state
 
 
-def execute_plan(state: TaskState) -> TaskState:
+def select_tool_call(state: TaskState, step: str) -> tuple[str, str]:
+    if "policy" in step.lower() or "context" in step.lower():
+        return "lookup_policy", state.task
+    return "summarize_context", f"Step: {step} | Task: {state.task}"
+
+
+def _failed_output(tool: str, error: Exception) -> dict[str, Any]:
+    # Failures stay in the output contract with zero confidence so review escalates them.
+    return {"tool": tool, "error": f"{type(error).__name__}: {error}", "confidence": 0.0}
+
+
+def iter_execute_plan(
+    state: TaskState,
+    runner: ResilientToolRunner | None = None,
+    deadline: Deadline | None = None,
+    tools: Mapping[str, Callable[[str], dict]] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Run plan steps one at a time, yielding each output as soon as it is recorded.
+
+    ``tools`` overrides the default registry (e.g. a cassette replay); a
+    ``runner`` brings its own tool mapping.
+    """
+    registry = TOOLS if tools is None else tools
     for step in state.plan:
-        if "policy" in step.lower() or "context" in step.lower():
-            state.tool_outputs.append(lookup_policy(state.task))
+        tool, argument = select_tool_call(state, step)
+        if runner is None:
+            output = registry[tool](argument)
         else:
-            state.tool_outputs.append(summarize_context(f"Step: {step} | Task: {state.task}"))
+            try:
+                output = runner.call(tool, argument, deadline=deadline)
+            except Exception as error:  # Open circuits, deadlines and backend errors alike.
+                output = _failed_output(tool, error)
+            finally:
+                state.review_notes.extend(runner.pop_events())
+        state.tool_outputs.append(output)
+        yield output
+
+
+def execute_plan(
+    state: TaskState,
+    runner: ResilientToolRunner | None = None,
+    deadline: Deadline | None = None,
+    tools: Mapping[str, Callable[[str], dict]] | None = None,
+) -> TaskState:
+    for _ in iter_execute_plan(state, runner=runner, deadline=deadline, tools=tools):
+        pass
     return state
 
 
+def is_low_confidence(output: dict[str, Any], threshold: float = REVIEW_CONFIDENCE_THRESHOLD) -> bool:
+    return output.get("confidence", 0.0) < threshold
+
+
 def review_outputs(state: TaskState) -> TaskState:
-    low_confidence = [o for o in state.tool_outputs if o.get("confidence", 0.0) < 0.8]
-    if low_confidence:
-        state.review_notes.append("Some tool outputs are low confidence; recommend human review.")
-    state.review_notes.append("All required workflow stages completed.")
+    if any(is_low_confidence(o) for o in state.tool_outputs):
+        state.review_notes.append(LOW_CONFIDENCE_NOTE)
+    state.review_notes.append(STAGES_COMPLETED_NOTE)
+    return state
+
+
+def execute_and_review(
+    state: TaskState,
+    runner: ResilientToolRunner | None = None,
+    deadline: Deadline | None = None,
+    stop_on_escalation: bool = False,
+    tools: Mapping[str, Callable[[str], dict]] | None = None,
+) -> TaskState:
+    """Pipelined execute + review: each output is reviewed as soon as it is produced.
+
+    Without early stop it records the same outputs and review notes as
+    ``execute_plan`` followed by ``review_outputs``.
+    With ``stop_on_escalation`` the remaining steps are skipped once a
+    low-confidence output makes human review certain, and the stages are not
+    reported as completed.
+    """
+    steps = iter_execute_plan(state, runner=runner, deadline=deadline, tools=tools)
+    escalated = False
+    executed = 0
+    skipped = 0
+    try:
+        for output in steps:
+            executed += 1
+            if escalated or not is_low_confidence(output):
+                continue
+            escalated = True
+            state.review_notes.append(LOW_CONFIDENCE_NOTE)
+            if stop_on_escalation:
+                # Count this call's steps: tool_outputs may hold earlier outputs.
+                skipped = len(state.plan) - executed
+                if skipped:
+                    state.review_notes.append(
+                        f"Skipped {skipped} remaining step(s): human review is already required."
+                    )
+                break
+    finally:
+        steps.close()
+    if not skipped:
+        state.review_notes.append(STAGES_COMPLETED_NOTE)
     return state
 
 
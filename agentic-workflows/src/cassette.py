@@ -0,0 +1,98 @@
+"""Record-and-replay cassettes for tool calls.
+
+Agent handover notes:
+- ``Cassette.record(tools)`` wraps a tool mapping and captures every call and
+  its result, including the timestamps the stubs stamp in.
+- Behind a ``ResilientToolRunner``, pass ``record_call`` as its ``on_result``
+  instead: only the result the workflow received is taped, not hedged
+  duplicates or abandoned attempts that finish after ``save()``.
+- ``Cassette.replay()`` returns a tool mapping served from an in-memory index
+  keyed by (tool, argument hash); repeated identical calls replay in order.
+- Files are gzip-compressed JSON lines, one call per line, so diffs of
+  regression cassettes stay readable after ``zcat``.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+ToolMapping = Mapping[str, Callable[..., dict]]
+
+
+class CassetteMiss(LookupError):
+    pass
+
+
+def call_key(tool: str, args: tuple[Any, ...]) -> str:
+    digest = hashlib.sha256(json.dumps(args, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"{tool}:{digest[:32]}"
+
+
+class Cassette:
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.calls: list[dict[str, Any]] = []
+        self._index: dict[str, deque[dict]] | None = None
+
+    @classmethod
+    def load(cls, path: Path | str) -> Cassette:
+        cassette = cls(path)
+        with gzip.open(cassette.path, "rt", encoding="utf-8") as handle:
+            cassette.calls = [json.loads(line) for line in handle if line.strip()]
+        return cassette
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Empty name and mtime=0 keep the gzip header stable across identical runs;
+        # key order is preserved so replayed results serialize exactly as recorded.
+        with open(self.path, "wb") as raw, gzip.GzipFile(filename="", fileobj=raw, mode="wb", mtime=0) as handle:
+            for call in self.calls:
+                handle.write((json.dumps(call, separators=(",", ":")) + "\n").encode("utf-8"))
+
+    def record_call(self, name: str, args: tuple[Any, ...], result: dict) -> None:
+        snapshot = json.loads(json.dumps(result))  # Later mutation must not alter the tape.
+        self.calls.append({"key": call_key(name, args), "tool": name, "args": list(args), "result": snapshot})
+        self._index = None
+
+    def record(self, tools: ToolMapping) -> dict[str, Callable[..., dict]]:
+        def wrap(name: str, tool: Callable[..., dict]) -> Callable[..., dict]:
+            def recorded(*args: Any) -> dict:
+                result = tool(*args)
+                self.record_call(name, args, result)
+                return result
+
+            return recorded
+
+        return {name: wrap(name, tool) for name, tool in tools.items()}
+
+    def _build_index(self) -> dict[str, deque[dict]]:
+        index: dict[str, deque[dict]] = defaultdict(deque)
+        for call in self.calls:
+            index[call["key"]].append(call["result"])
+        return index
+
+    def replay(self, tools: ToolMapping | None = None) -> dict[str, Callable[..., dict]]:
+        """Serve recorded results; ``tools`` only supplies the names when the cassette is empty."""
+        self._index = self._build_index()
+        names = {call["tool"] for call in self.calls} | set(tools or {})
+
+        def wrap(name: str) -> Callable[..., dict]:
+            def replayed(*args: Any) -> dict:
+                key = call_key(name, args)
+                results = self._index.get(key) if self._index is not None else None
+                if not results:
+                    raise CassetteMiss(f"No recorded result for {name}{args!r} in {self.path}")
+                result = results.popleft()
+                # Keep the last result so extra identical calls stay deterministic.
+                if not results:
+                    results.append(result)
+                return json.loads(json.dumps(result))
+
+            return replayed
+
+        return {name: wrap(name) for name in names}
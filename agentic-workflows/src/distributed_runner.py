@@ -0,0 +1,101 @@
+"""Coordinator/worker CLI for running workflow batches across processes and hosts.
+
+Usage:
+    python3 src/distributed_runner.py enqueue --backend sqlite:runs/queue.sqlite3 --tasks-file tasks.txt
+    python3 src/distributed_runner.py worker --backend sqlite:runs/queue.sqlite3 --processes 4
+    python3 src/distributed_runner.py status --backend sqlite:runs/queue.sqlite3
+
+Run ``worker`` on every host that can reach the backend; ``--shards`` pins a
+worker to a subset of shards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+from pathlib import Path
+from typing import Any
+
+from agent import TaskState, execute_plan, finalize_response, plan_task, review_outputs
+from work_queue import (
+    DEFAULT_MAX_ATTEMPTS,
+    DEFAULT_SHARDS,
+    DEFAULT_VISIBILITY_TIMEOUT,
+    default_worker_id,
+    open_backend,
+    run_worker,
+)
+
+
+def run_workflow(payload: dict[str, Any]) -> dict[str, Any]:
+    state = TaskState(task=payload["task"], model=payload["model"])
+    state = plan_task(state)
+    state = execute_plan(state)
+    state = review_outputs(state)
+    return finalize_response(state)
+
+
+def _worker_process(
+    spec: str, options: dict[str, Any], shards: list[int] | None, idle_timeout: float, max_attempts: int
+) -> int:
+    backend = open_backend(spec, **options)
+    try:
+        return run_worker(backend, run_workflow, shards=shards, idle_timeout=idle_timeout, max_attempts=max_attempts)
+    finally:
+        backend.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=("enqueue", "worker", "status"))
+    parser.add_argument("--backend", required=True, help="sqlite:<path> or fs:<directory>")
+    parser.add_argument("--num-shards", default=DEFAULT_SHARDS, type=int)
+    parser.add_argument("--visibility-timeout", default=DEFAULT_VISIBILITY_TIMEOUT, type=float)
+    parser.add_argument("--tasks-file", type=Path, help="enqueue: one task per line")
+    parser.add_argument("--model", default="opus-4.6")
+    parser.add_argument("--processes", default=1, type=int, help="worker: local worker processes")
+    parser.add_argument("--shards", help="worker: comma-separated shard ids to serve")
+    parser.add_argument("--idle-timeout", default=5.0, type=float)
+    parser.add_argument(
+        "--max-attempts", default=DEFAULT_MAX_ATTEMPTS, type=int, help="worker: deliveries before dead-lettering"
+    )
+    args = parser.parse_args()
+
+    options = {"shards": args.num_shards, "visibility_timeout": args.visibility_timeout}
+    if args.backend.startswith("sqlite:"):
+        Path(args.backend.partition(":")[2]).parent.mkdir(parents=True, exist_ok=True)
+
+    if args.command == "enqueue":
+        if args.tasks_file is None:
+            parser.error("enqueue requires --tasks-file")
+        lines = args.tasks_file.read_text(encoding="utf-8").splitlines()
+        payloads = [{"task": line.strip(), "model": args.model} for line in lines if line.strip()]
+        backend = open_backend(args.backend, **options)
+        task_ids = backend.enqueue_many(payloads)
+        backend.close()
+        print(f"Enqueued {len(task_ids)} tasks across {args.num_shards} shards.")
+        return
+
+    if args.command == "worker":
+        shards = [int(shard) for shard in args.shards.split(",")] if args.shards else None
+        jobs = [(args.backend, options, shards, args.idle_timeout, args.max_attempts)] * args.processes
+        with multiprocessing.Pool(args.processes) as pool:
+            processed = pool.starmap(_worker_process, jobs)
+        print(f"{default_worker_id()}: handled {sum(processed)} leases with {args.processes} process(es).")
+        return
+
+    backend = open_backend(args.backend, **options)
+    failed = backend.failed()
+    status = {
+        "outstanding": backend.outstanding(),
+        "results": len(backend.results()),
+        "failed": len(failed),
+        "failures": {task_id: entry.get("error") for task_id, entry in failed.items()},
+    }
+    print(json.dumps(status, indent=2))
+    backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Resilience layer for tool calls: deadlines, hedged requests, circuit breakers.
+
+Agent handover notes:
+- One ``Deadline`` is created by the runner and passed down to every tool call.
+- A hedged duplicate is sent when the primary is slower than the tool's
+  observed p95; the first successful result wins. A primary that fails fast
+  is not hedged: the error goes straight to the circuit breaker.
+- The p95 needs ``MIN_LATENCY_SAMPLES`` successful calls per tool; until then
+  ``DEFAULT_HEDGE_DELAY`` applies. A short-lived process never gets there on
+  its own, so ``save_latencies``/``load_latencies`` carry samples across runs.
+- ``on_result`` sees each result the caller receives, once, after hedging.
+- Each tool has its own ``CircuitBreaker`` so one unhealthy backend fails fast
+  without slowing the others. Trips are reported through ``pop_events()``.
+- Python threads cannot be cancelled: abandoned calls finish in the background
+  and their results are discarded.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+DEFAULT_HEDGE_DELAY = 0.5
+MIN_LATENCY_SAMPLES = 20
+LATENCY_WINDOW = 200
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 30.0
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Deadline:
+    expires_at: float
+    clock: Callable[[], float] = time.monotonic
+
+    @classmethod
+    def after(cls, seconds: float, clock: Callable[[], float] = time.monotonic) -> Deadline:
+        return cls(expires_at=clock() + seconds, clock=clock)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self.clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+
+class LatencyTracker:
+    """Rolling latency window used to pick the hedge delay."""
+
+    def __init__(self, window: int = LATENCY_WINDOW, default: float = DEFAULT_HEDGE_DELAY) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self.default = default
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def samples(self) -> list[float]:
+        return list(self._samples)
+
+    def p95(self) -> float:
+        if len(self._samples) < MIN_LATENCY_SAMPLES:
+            return self.default
+        ordered = sorted(self._samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+@dataclass
+class CircuitBreaker:
+    name: str
+    failure_threshold: int = FAILURE_THRESHOLD
+    reset_timeout: float = RESET_TIMEOUT
+    clock: Callable[[], float] = time.monotonic
+    failures: int = 0
+    opened_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> bool:
+        """Count a failure; return True when this failure trips the breaker."""
+        was_half_open = self.state == "half_open"
+        self.failures += 1
+        if was_half_open or (self.opened_at is None and self.failures >= self.failure_threshold):
+            self.opened_at = self.clock()
+            return True
+        return False
+
+
+@dataclass
+class ResilientToolRunner:
+    tools: Mapping[str, Callable[..., dict]]
+    hedge_after: float | None = None
+    failure_threshold: int = FAILURE_THRESHOLD
+    reset_timeout: float = RESET_TIMEOUT
+    max_workers: int = 8
+    clock: Callable[[], float] = time.monotonic
+    breakers: dict[str, CircuitBreaker] = field(default_factory=dict)
+    latencies: dict[str, LatencyTracker] = field(default_factory=dict)
+    hedges_sent: int = 0
+    on_result: Callable[[str, tuple[Any, ...], dict], None] | None = None
+    _events: list[str] = field(init=False, default_factory=list)
+
+    def __post_init__(self) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool")
+        for name in self.tools:
+            self.breakers[name] = CircuitBreaker(name, self.failure_threshold, self.reset_timeout, self.clock)
+            self.latencies[name] = LatencyTracker()
+
+    def __enter__(self) -> ResilientToolRunner:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def pop_events(self) -> list[str]:
+        events, self._events = self._events, []
+        return events
+
+    def load_latencies(self, path: Path) -> None:
+        """Seed each tool's latency window from a file written by ``save_latencies``."""
+        try:
+            saved = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return  # No history yet (or unreadable): start from the default delay.
+        for name, samples in saved.items() if isinstance(saved, dict) else ():
+            if name in self.latencies and isinstance(samples, list):
+                for seconds in samples:
+                    self.latencies[name].record(float(seconds))
+
+    def save_latencies(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps({name: tracker.samples() for name, tracker in self.latencies.items()}), encoding="utf-8"
+        )
+        os.replace(tmp, path)
+
+    def hedge_delay(self, name: str) -> float:
+        return self.hedge_after if self.hedge_after is not None else self.latencies[name].p95()
+
+    def call(self, name: str, *args: Any, deadline: Deadline | None = None) -> dict:
+        breaker = self.breakers[name]
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for tool '{name}'")
+        if deadline is not None and deadline.expired:
+            raise DeadlineExceeded(f"Deadline exceeded before calling '{name}'")
+
+        started = self.clock()
+        try:
+            result = self._hedged(name, args, deadline)
+        except Exception:
+            if breaker.record_failure():
+                self._events.append(
+                    f"Circuit breaker opened for {name} after {breaker.failures} consecutive failures."
+                )
+            raise
+        breaker.record_success()
+        self.latencies[name].record(self.clock() - started)
+        if self.on_result is not None:
+            self.on_result(name, args, result)
+        return result
+
+    def _hedged(self, name: str, args: tuple[Any, ...], deadline: Deadline | None) -> dict:
+        tool = self.tools[name]
+        pending: set[Future[dict]] = {self._pool.submit(tool, *args)}
+        hedged = False
+        error: BaseException | None = None
+
+        while pending:
+            remaining = deadline.remaining() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceeded(f"Deadline exceeded waiting for '{name}'")
+            timeout = remaining
+            if not hedged:
+                delay = self.hedge_delay(name)
+                timeout = delay if remaining is None else min(delay, remaining)
+
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+
+            if error is not None and not hedged:
+                # Fast failure, not slowness: a duplicate would only add load to a failing backend.
+                raise error
+            if not hedged:
+                # Primary is slower than the hedge delay: send one duplicate and race them.
+                pending.add(self._pool.submit(tool, *args))
+                self.hedges_sent += 1
+                hedged = True
+
+        assert error is not None
+        raise error
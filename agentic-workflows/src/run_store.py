@@ -0,0 +1,151 @@
+"""Embedded SQLite store for ``finalize_response`` records.
+
+Agent handover notes:
+- One row per workflow run; the full record is kept as JSON for audit replay.
+- Query columns (task, model, created_at, min_confidence) are denormalized and
+  indexed so audit queries never rescan JSON.
+- WAL mode lets readers query while a runner is appending.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task TEXT NOT NULL,
+        model TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        min_confidence REAL,
+        record TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_runs_task ON runs (task, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_model ON runs (model, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_min_confidence ON runs (min_confidence)",
+)
+
+
+def _iso(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def min_confidence(record: dict[str, Any]) -> float | None:
+    scores = [o["confidence"] for o in record.get("tool_outputs", []) if "confidence" in o]
+    return min(scores) if scores else None
+
+
+class RunStore:
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+
+    def __enter__(self) -> RunStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _row(self, record: dict[str, Any], created_at: datetime | None) -> tuple:
+        return (
+            record["task"],
+            record["model"],
+            _iso(created_at or datetime.now(timezone.utc)),
+            min_confidence(record),
+            json.dumps(record, sort_keys=True),
+        )
+
+    def insert(self, record: dict[str, Any], created_at: datetime | None = None) -> int:
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (task, model, created_at, min_confidence, record) VALUES (?, ?, ?, ?, ?)",
+                self._row(record, created_at),
+            )
+        return int(cursor.lastrowid)
+
+    def insert_many(self, records: Iterable[dict[str, Any]], created_at: datetime | None = None) -> int:
+        """Insert records in a single transaction; returns the number written."""
+        rows = [self._row(record, created_at) for record in records]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO runs (task, model, created_at, min_confidence, record) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def _select(
+        self,
+        task: str | None = None,
+        model: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        max_confidence: float | None = None,
+        limit: int | None = None,
+    ) -> tuple[str, list[Any]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if task is not None:
+            clauses.append("task = ?")
+            params.append(task)
+        if model is not None:
+            clauses.append("model = ?")
+            params.append(model)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(_iso(since))
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(_iso(until))
+        if max_confidence is not None:
+            clauses.append("min_confidence < ?")
+            params.append(max_confidence)
+
+        sql = "SELECT id, created_at, record FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return sql, params
+
+    def query(self, **filters: Any) -> list[dict[str, Any]]:
+        """Return stored records, newest first.
+
+        Filters: ``task``, ``model``, ``since``/``until`` (datetimes),
+        ``max_confidence`` (exclusive upper bound on the run's lowest tool
+        confidence) and ``limit``.
+        """
+        sql, params = self._select(**filters)
+        results = []
+        for row in self._conn.execute(sql, params):
+            record = json.loads(row["record"])
+            record["run_id"] = row["id"]
+            record["created_at"] = row["created_at"]
+            results.append(record)
+        return results
+
+    def explain(self, **filters: Any) -> str:
+        """Return SQLite's query plan for ``query(**filters)``."""
+        sql, params = self._select(**filters)
+        return "\n".join(row[3] for row in self._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
@@ -0,0 +1,188 @@
+"""Map-reduce summarization for contexts too large for a single tool call.
+
+Agent handover notes:
+- Chunks are cut on sentence boundaries chosen by content (a sentence hash),
+  so an edit only changes the chunks around it and the rest hit the cache.
+- Map runs on a thread pool with a bounded number of in-flight chunks; reduce
+  folds partial summaries in groups of ``fan_in`` as they arrive, so memory
+  stays bounded by ``fan_in * depth`` summaries, not by input size.
+- ``summarize_chunk`` is the single provider seam; keep it deterministic.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+SUMMARY_CHARS = 120
+MIN_CHUNK_CHARS = 1_000
+MAX_CHUNK_CHARS = 4_000
+BOUNDARY_DIVISOR = 4
+FAN_IN = 8
+MAX_WORKERS = 4
+CACHE_ENTRIES = 4_096
+
+SENTENCE_END = re.compile(r"(?<=[.!?。！？])\s+")
+
+
+@dataclass
+class SummaryResult:
+    summary: str
+    chunks: int
+    cache_hits: int
+    levels: int
+
+
+class ChunkCache:
+    """LRU map from chunk content hash to its summary."""
+
+    def __init__(self, max_entries: int = CACHE_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> str | None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        return None
+
+    def put(self, key: str, summary: str) -> None:
+        self._entries[key] = summary
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+DEFAULT_CACHE = ChunkCache()
+
+
+def chunk_key(chunk: str) -> str:
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+
+def _iter_sentences(parts: Iterable[str], max_chars: int = MAX_CHUNK_CHARS) -> Iterator[str]:
+    pending = ""
+    for part in parts:
+        pending += part
+        *sentences, pending = SENTENCE_END.split(pending)
+        yield from (sentence for sentence in sentences if sentence)
+        # An unterminated sentence is cut at ``max_chars`` so the buffer (and re-splitting it) stays bounded.
+        cut = 0
+        while len(pending) - cut > max_chars:
+            yield pending[cut : cut + max_chars]
+            cut += max_chars
+        pending = pending[cut:]
+    if pending.strip():
+        yield pending
+
+
+def _is_boundary(sentence: str) -> bool:
+    return int(chunk_key(sentence)[:8], 16) % BOUNDARY_DIVISOR == 0
+
+
+def iter_chunks(
+    context: str | Iterable[str],
+    min_chars: int = MIN_CHUNK_CHARS,
+    max_chars: int = MAX_CHUNK_CHARS,
+) -> Iterator[str]:
+    """Yield sentence-aligned chunks from a string or a stream of string parts."""
+    parts = [context] if isinstance(context, str) else context
+    chunk: list[str] = []
+    size = 0
+    for sentence in _iter_sentences(parts, max_chars):
+        # Oversized sentences are hard-split so no chunk exceeds ``max_chars``.
+        while len(sentence) > max_chars:
+            if chunk:
+                yield " ".join(chunk)
+                chunk, size = [], 0
+            yield sentence[:max_chars]
+            sentence = sentence[max_chars:]
+        if chunk and size + len(sentence) + 1 > max_chars:
+            yield " ".join(chunk)
+            chunk, size = [], 0
+        chunk.append(sentence)
+        size += len(sentence) + 1
+        if size >= min_chars and _is_boundary(sentence):
+            yield " ".join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield " ".join(chunk)
+
+
+def summarize_chunk(text: str) -> str:
+    # Replace this stub with a real model call; keep it a pure function of ``text``.
+    first = SENTENCE_END.split(text.strip(), maxsplit=1)[0]
+    return first if len(first) <= SUMMARY_CHARS else first[: SUMMARY_CHARS - 3] + "..."
+
+
+def _reduce(summaries: list[str]) -> str:
+    return summarize_chunk(" ".join(summaries))
+
+
+def map_reduce_summarize(
+    context: str | Iterable[str],
+    cache: ChunkCache | None = None,
+    executor: Executor | None = None,
+    fan_in: int = FAN_IN,
+    max_workers: int = MAX_WORKERS,
+    min_chars: int = MIN_CHUNK_CHARS,
+    max_chars: int = MAX_CHUNK_CHARS,
+) -> SummaryResult:
+    """Summarize chunks in parallel and fold partial summaries hierarchically."""
+    cache = DEFAULT_CACHE if cache is None else cache
+    owns_executor = executor is None
+    pool = executor or ThreadPoolExecutor(max_workers=max_workers)
+    levels: list[list[str]] = [[]]
+    in_flight: deque[tuple[str, Future[str] | str]] = deque()
+    chunks = 0
+    cache_hits = 0
+
+    def push(summary: str, level: int = 0) -> None:
+        while True:
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(summary)
+            if len(levels[level]) < fan_in:
+                return
+            summary = _reduce(levels[level])
+            levels[level] = []
+            level += 1
+
+    def drain(limit: int) -> None:
+        while len(in_flight) > limit:
+            key, pending = in_flight.popleft()
+            summary = pending if isinstance(pending, str) else pending.result()
+            cache.put(key, summary)
+            push(summary)
+
+    try:
+        for chunk in iter_chunks(context, min_chars=min_chars, max_chars=max_chars):
+            chunks += 1
+            key = chunk_key(chunk)
+            cached = cache.get(key)
+            if cached is not None:
+                cache_hits += 1
+                in_flight.append((key, cached))
+            else:
+                in_flight.append((key, pool.submit(summarize_chunk, chunk)))
+            drain(limit=2 * max_workers)
+        drain(limit=0)
+    finally:
+        if owns_executor:
+            pool.shutdown(wait=True)
+
+    # Fold the partially filled levels bottom-up into one summary.
+    carry: list[str] = []
+    for level in levels:
+        carry = level + carry if carry else level
+        if len(carry) > 1:
+            carry = [_reduce(carry)]
+    summary = carry[0] if carry else ""
+    return SummaryResult(summary=summary, chunks=chunks, cache_hits=cache_hits, levels=len(levels))
@@ -9,6 +9,8 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
+from summarize import MIN_CHUNK_CHARS, map_reduce_summarize
+
 
 def lookup_policy(question: str) -> dict:
     return {
@@ -20,9 +22,19 @@ def lookup_policy(question: str) -> dict:
 
 
 def summarize_context(context: str) -> dict:
+    if len(context) <= MIN_CHUNK_CHARS:
+        return {
+            "tool": "summarize_context",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "result": f"Stubbed summary: {context[:120]}",
+            "confidence": 0.79,
+        }
+    # Large inputs are chunked and summarized map-reduce style instead of truncated.
+    summary = map_reduce_summarize(context)
     return {
         "tool": "summarize_context",
         "timestamp": datetime.now(timezone.utc).isoformat(),
-        "result": f"Stubbed summary: {context[:120]}",
+        "result": f"Stubbed summary: {summary.summary}",
         "confidence": 0.79,
+        "chunks": summary.chunks,
     }
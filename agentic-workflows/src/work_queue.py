@@ -0,0 +1,396 @@
+"""Sharded work queue for running workflow batches on many workers.
+
+Agent handover notes:
+- Delivery is at-least-once: a leased task that is not acked before its
+  visibility timeout becomes visible again and is re-delivered.
+- Results are keyed by ``task_hash`` and written first-writer-wins, so a
+  re-delivered task never produces a second result.
+- A handler error releases the task for another attempt; after
+  ``max_attempts`` deliveries (raised or crashed) it is moved to a ``failed``
+  dead-letter state with its last error, and ``failed()`` lists it.
+- Backends are pluggable (``QueueBackend``). ``SQLiteLeaseQueue`` suits one
+  host or a shared local disk; ``FilesystemQueue`` only needs atomic
+  ``rename``/``link`` and also works on a shared network filesystem.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Protocol
+
+DEFAULT_VISIBILITY_TIMEOUT = 60.0
+DEFAULT_SHARDS = 8
+DEFAULT_MAX_ATTEMPTS = 5
+POLL_INTERVAL = 0.05
+
+
+def task_hash(payload: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def shard_for(task_id: str, shards: int) -> int:
+    return int(task_id[:8], 16) % shards
+
+
+@dataclass(frozen=True)
+class Lease:
+    task_id: str
+    payload: dict[str, Any]
+    shard: int
+    attempt: int
+    receipt: str
+
+
+class QueueBackend(Protocol):
+    shards: int
+
+    def enqueue_many(self, payloads: Iterable[dict[str, Any]]) -> list[str]: ...
+
+    def lease(self, shards: Iterable[int] | None = None) -> Lease | None: ...
+
+    def ack(self, lease: Lease) -> bool: ...
+
+    def fail(self, lease: Lease, error: str, dead: bool) -> bool: ...
+
+    def put_result(self, task_id: str, result: dict[str, Any]) -> bool: ...
+
+    def results(self) -> dict[str, dict[str, Any]]: ...
+
+    def failed(self) -> dict[str, dict[str, Any]]: ...
+
+    def outstanding(self) -> int: ...
+
+
+class SQLiteLeaseQueue:
+    """Lease-based queue in one SQLite file (WAL mode, ``BEGIN IMMEDIATE`` claims)."""
+
+    def __init__(
+        self,
+        path: Path | str,
+        shards: int = DEFAULT_SHARDS,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.shards = shards
+        self.visibility_timeout = visibility_timeout
+        self.clock = clock
+        self._conn = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                shard INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                receipt TEXT,
+                visible_at REAL NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks (state, shard, visible_at);
+            CREATE TABLE IF NOT EXISTS results (
+                task_id TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                completed_at REAL NOT NULL
+            );
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        if "error" not in columns:  # Queues created before dead-lettering existed.
+            self._conn.execute("ALTER TABLE tasks ADD COLUMN error TEXT")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def enqueue_many(self, payloads: Iterable[dict[str, Any]]) -> list[str]:
+        rows = []
+        for payload in payloads:
+            task_id = task_hash(payload)
+            rows.append((task_id, shard_for(task_id, self.shards), json.dumps(payload, sort_keys=True)))
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany("INSERT OR IGNORE INTO tasks (task_id, shard, payload) VALUES (?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return [task_id for task_id, _, _ in rows]
+
+    def lease(self, shards: Iterable[int] | None = None) -> Lease | None:
+        now = self.clock()
+        shard_list = list(shards) if shards is not None else list(range(self.shards))
+        if not shard_list:
+            return None
+        marks = ",".join("?" * len(shard_list))
+        receipt = uuid.uuid4().hex
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute(
+                f"""
+                SELECT task_id, shard, payload, attempts FROM tasks
+                WHERE state IN ('pending', 'leased') AND visible_at <= ? AND shard IN ({marks})
+                ORDER BY visible_at LIMIT 1
+                """,
+                (now, *shard_list),
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE tasks SET state = 'leased', receipt = ?, visible_at = ?, attempts = attempts + 1 "
+                    "WHERE task_id = ?",
+                    (receipt, now + self.visibility_timeout, row[0]),
+                )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        task_id, shard, payload, attempts = row
+        return Lease(task_id, json.loads(payload), shard, attempts + 1, receipt)
+
+    def ack(self, lease: Lease) -> bool:
+        cursor = self._conn.execute(
+            "UPDATE tasks SET state = 'done' WHERE task_id = ? AND receipt = ?", (lease.task_id, lease.receipt)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, lease: Lease, error: str, dead: bool) -> bool:
+        """Dead-letter the task, or make it visible again for the next attempt."""
+        if dead:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET state = 'failed', error = ? WHERE task_id = ? AND receipt = ?",
+                (error, lease.task_id, lease.receipt),
+            )
+        else:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET state = 'pending', receipt = NULL, visible_at = ?, error = ? "
+                "WHERE task_id = ? AND receipt = ?",
+                (self.clock(), error, lease.task_id, lease.receipt),
+            )
+        return cursor.rowcount == 1
+
+    def put_result(self, task_id: str, result: dict[str, Any]) -> bool:
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO results (task_id, result, completed_at) VALUES (?, ?, ?)",
+            (task_id, json.dumps(result, sort_keys=True), self.clock()),
+        )
+        return cursor.rowcount == 1
+
+    def results(self) -> dict[str, dict[str, Any]]:
+        return {task_id: json.loads(result) for task_id, result in self._conn.execute("SELECT task_id, result FROM results")}
+
+    def failed(self) -> dict[str, dict[str, Any]]:
+        rows = self._conn.execute("SELECT task_id, payload, attempts, error FROM tasks WHERE state = 'failed'")
+        return {
+            task_id: {"payload": json.loads(payload), "attempts": attempts, "error": error}
+            for task_id, payload, attempts, error in rows
+        }
+
+    def outstanding(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM tasks WHERE state NOT IN ('done', 'failed')").fetchone()[0]
+
+
+class FilesystemQueue:
+    """Directory-based queue: a lease is an atomic rename from ``pending/`` to ``leased/``.
+
+    Layout under ``root``: ``pending/<shard>/<task_id>.json``,
+    ``leased/<task_id>.<receipt>.json`` (mtime = lease start), ``results/<task_id>.json``,
+    ``failed/<task_id>.json`` (dead letters).
+    """
+
+    def __init__(
+        self,
+        root: Path | str,
+        shards: int = DEFAULT_SHARDS,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.root = Path(root)
+        self.shards = shards
+        self.visibility_timeout = visibility_timeout
+        self.clock = clock
+        for shard in range(shards):
+            (self.root / "pending" / str(shard)).mkdir(parents=True, exist_ok=True)
+        (self.root / "leased").mkdir(exist_ok=True)
+        (self.root / "results").mkdir(exist_ok=True)
+        (self.root / "failed").mkdir(exist_ok=True)
+
+    def close(self) -> None:
+        pass
+
+    def _write_atomic(self, target: Path, data: dict[str, Any], overwrite: bool) -> bool:
+        tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps(data, sort_keys=True), encoding="utf-8")
+        try:
+            if overwrite:
+                os.replace(tmp, target)
+                return True
+            os.link(tmp, target)  # Fails if the target exists: first writer wins.
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _known(self, task_id: str) -> bool:
+        # Leased is checked before results: ack removes the lease only after the
+        # result is written, so a task finishing in between is still seen.
+        if any((self.root / "leased").glob(f"{task_id}.*.json")):
+            return True
+        return any((self.root / folder / f"{task_id}.json").exists() for folder in ("results", "failed"))
+
+    def enqueue_many(self, payloads: Iterable[dict[str, Any]]) -> list[str]:
+        task_ids = []
+        for payload in payloads:
+            task_id = task_hash(payload)
+            task_ids.append(task_id)
+            if self._known(task_id):
+                continue
+            target = self.root / "pending" / str(shard_for(task_id, self.shards)) / f"{task_id}.json"
+            self._write_atomic(target, {"payload": payload, "attempts": 0}, overwrite=False)
+        return task_ids
+
+    def _requeue_expired(self) -> None:
+        deadline = self.clock() - self.visibility_timeout
+        for leased in (self.root / "leased").glob("*.json"):
+            try:
+                if leased.stat().st_mtime > deadline:
+                    continue
+                task_id = leased.name.split(".", 1)[0]
+                target = self.root / "pending" / str(shard_for(task_id, self.shards)) / f"{task_id}.json"
+                os.rename(leased, target)
+            except FileNotFoundError:
+                continue  # Acked or requeued by another worker.
+
+    def lease(self, shards: Iterable[int] | None = None) -> Lease | None:
+        self._requeue_expired()
+        for shard in shards if shards is not None else range(self.shards):
+            for pending in sorted((self.root / "pending" / str(shard)).glob("*.json")):
+                task_id = pending.stem
+                receipt = uuid.uuid4().hex
+                leased = self.root / "leased" / f"{task_id}.{receipt}.json"
+                now = self.clock()
+                try:
+                    # Stamp the lease start before the rename, so the claimed file never
+                    # carries its enqueue mtime and cannot look expired to another worker.
+                    os.utime(pending, (now, now))
+                    os.rename(pending, leased)
+                    # "r+" never recreates a file another worker has already moved away.
+                    with leased.open("r+", encoding="utf-8") as handle:
+                        record = json.load(handle)
+                        record["attempts"] += 1
+                        handle.seek(0)
+                        handle.truncate()
+                        json.dump(record, handle, sort_keys=True)
+                    os.utime(leased, (now, now))  # The write moved mtime to wall-clock time.
+                except FileNotFoundError:
+                    continue  # Lost the race to another worker; try the next file.
+                return Lease(task_id, record["payload"], shard, record["attempts"], receipt)
+        return None
+
+    def ack(self, lease: Lease) -> bool:
+        try:
+            (self.root / "leased" / f"{lease.task_id}.{lease.receipt}.json").unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def fail(self, lease: Lease, error: str, dead: bool) -> bool:
+        """Dead-letter the task, or move it back to ``pending/`` for the next attempt."""
+        leased = self.root / "leased" / f"{lease.task_id}.{lease.receipt}.json"
+        if dead:
+            target = self.root / "failed" / f"{lease.task_id}.json"
+        else:
+            target = self.root / "pending" / str(lease.shard) / f"{lease.task_id}.json"
+        try:
+            with leased.open("r+", encoding="utf-8") as handle:
+                record = json.load(handle)
+                record["error"] = error
+                handle.seek(0)
+                handle.truncate()
+                json.dump(record, handle, sort_keys=True)
+            os.rename(leased, target)
+            return True
+        except FileNotFoundError:
+            return False  # The lease expired and another worker owns the task now.
+
+    def put_result(self, task_id: str, result: dict[str, Any]) -> bool:
+        return self._write_atomic(self.root / "results" / f"{task_id}.json", result, overwrite=False)
+
+    def results(self) -> dict[str, dict[str, Any]]:
+        return {
+            path.stem: json.loads(path.read_text(encoding="utf-8"))
+            for path in (self.root / "results").glob("*.json")
+        }
+
+    def failed(self) -> dict[str, dict[str, Any]]:
+        return {
+            path.stem: json.loads(path.read_text(encoding="utf-8"))
+            for path in (self.root / "failed").glob("*.json")
+        }
+
+    def outstanding(self) -> int:
+        pending = sum(1 for _ in (self.root / "pending").glob("*/*.json"))
+        return pending + sum(1 for _ in (self.root / "leased").glob("*.json"))
+
+
+def open_backend(spec: str, **options: Any) -> QueueBackend:
+    """Open ``sqlite:<path>`` or ``fs:<directory>``."""
+    kind, _, location = spec.partition(":")
+    if kind == "sqlite":
+        return SQLiteLeaseQueue(location, **options)
+    if kind == "fs":
+        return FilesystemQueue(location, **options)
+    raise ValueError(f"Unknown queue backend: {spec!r} (expected sqlite:<path> or fs:<dir>)")
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def run_worker(
+    backend: QueueBackend,
+    handler: Callable[[dict[str, Any]], dict[str, Any]],
+    shards: Iterable[int] | None = None,
+    idle_timeout: float = 1.0,
+    max_tasks: int | None = None,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> int:
+    """Process leases until the queue stays empty for ``idle_timeout`` seconds.
+
+    Returns the number of leases handled, including ones that failed.
+    """
+    shard_list = list(shards) if shards is not None else None
+    processed = 0
+    idle_since = time.monotonic()
+    while max_tasks is None or processed < max_tasks:
+        lease = backend.lease(shard_list)
+        if lease is None:
+            if time.monotonic() - idle_since >= idle_timeout:
+                break
+            time.sleep(POLL_INTERVAL)
+            continue
+        if lease.attempt > max_attempts:
+            # Earlier deliveries never reported back (e.g. the worker crashed).
+            backend.fail(lease, f"Gave up after {max_attempts} attempts without a result", dead=True)
+        else:
+            try:
+                result = handler(lease.payload)
+            except Exception as error:
+                backend.fail(lease, f"{type(error).__name__}: {error}", dead=lease.attempt >= max_attempts)
+            else:
+                backend.put_result(lease.task_id, result)
+                backend.ack(lease)
+        processed += 1
+        idle_since = time.monotonic()
+    return processed
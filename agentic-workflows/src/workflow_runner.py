@@ -8,7 +8,18 @@ from pathlib import Path
 
 import yaml
 
-from agent import TaskState, execute_plan, finalize_response, plan_task, review_outputs
+from agent import (
+    TOOLS,
+    TaskState,
+    execute_and_review,
+    execute_plan,
+    finalize_response,
+    plan_task,
+    review_outputs,
+)
+from cassette import Cassette
+from resilience import Deadline, ResilientToolRunner
+from run_store import RunStore
 
 
 def load_config(path: Path) -> dict:
@@ -20,16 +31,62 @@ def main() -> None:
     parser.add_argument("--task", required=True)
     parser.add_argument("--model", default="opus-4.6")
     parser.add_argument("--config", default="agentic-workflows/configs/workflow_config.yaml", type=Path)
+    parser.add_argument("--store", type=Path, help="SQLite run store to append the final response to")
+    parser.add_argument("--deadline-seconds", type=float, help="End-to-end deadline (overrides config)")
+    parser.add_argument("--pipelined", action="store_true", help="Review each tool output as it is produced")
+    parser.add_argument(
+        "--latency-file",
+        type=Path,
+        help="JSON file of per-tool latencies; seeds the p95 hedge delay and is updated after the run",
+    )
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record", type=Path, help="Record every tool call to this cassette file")
+    cassette_group.add_argument("--replay", type=Path, help="Serve tool calls from this cassette file")
     args = parser.parse_args()
 
     config = load_config(args.config)
-    _ = config  # Placeholder for future step controls.
+    deadline_seconds = args.deadline_seconds
+    if deadline_seconds is None:
+        deadline_seconds = config.get("deadline_seconds", 30)
+    deadline = Deadline.after(deadline_seconds)
+
+    cassette = None
+    tools = TOOLS
+    if args.record:
+        # Record at the runner boundary so hedged duplicates are not taped.
+        cassette = Cassette(args.record)
+    elif args.replay:
+        tools = Cassette.load(args.replay).replay(TOOLS)
+    latency_file = args.latency_file or config.get("latency_file")
 
     state = TaskState(task=args.task, model=args.model)
     state = plan_task(state)
-    state = execute_plan(state)
-    state = review_outputs(state)
+    with ResilientToolRunner(
+        tools,
+        hedge_after=config.get("hedge_after_seconds"),
+        failure_threshold=config.get("circuit_breaker_failures", 3),
+        reset_timeout=config.get("circuit_breaker_reset_seconds", 30),
+        on_result=cassette.record_call if cassette is not None else None,
+    ) as runner:
+        if latency_file:
+            runner.load_latencies(Path(latency_file))
+        if args.pipelined or config.get("pipelined_review", False):
+            # require_review: stop spending tool calls once escalation is certain.
+            state = execute_and_review(
+                state, runner=runner, deadline=deadline, stop_on_escalation=config.get("require_review", False)
+            )
+        else:
+            state = execute_plan(state, runner=runner, deadline=deadline)
+            state = review_outputs(state)
+        if latency_file and not args.replay:
+            runner.save_latencies(Path(latency_file))
     final = finalize_response(state)
+    if cassette is not None:
+        cassette.save()
+
+    if args.store:
+        with RunStore(args.store) as store:
+            store.insert(final)
 
     print(json.dumps(final, indent=2))
 
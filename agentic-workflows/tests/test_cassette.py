@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from agent import TOOLS, TaskState, execute_plan, finalize_response, plan_task, review_outputs
+from cassette import Cassette, CassetteMiss
+from resilience import ResilientToolRunner
+
+
+def _run(task: str, tools) -> dict:
+    state = plan_task(TaskState(task=task, model="codex-5.3"))
+    state = execute_plan(state, tools=tools)
+    state = review_outputs(state)
+    return finalize_response(state)
+
+
+def test_replay_is_bit_for_bit_including_timestamps(tmp_path) -> None:
+    path = tmp_path / "workflow.jsonl.gz"
+    recorder = Cassette(path)
+    recorded = [_run(f"Task {i}", recorder.record(TOOLS)) for i in range(3)]
+    recorder.save()
+
+    tools = Cassette.load(path).replay()
+    replayed = [_run(f"Task {i}", tools) for i in range(3)]
+
+    assert replayed == recorded
+
+
+def test_replay_suite_runs_in_milliseconds(tmp_path) -> None:
+    path = tmp_path / "suite.jsonl.gz"
+    recorder = Cassette(path)
+    for i in range(200):
+        _run(f"Task {i}", recorder.record(TOOLS))
+    recorder.save()
+
+    tools = Cassette.load(path).replay()
+    started = time.perf_counter()
+    for i in range(200):
+        _run(f"Task {i}", tools)
+
+    assert time.perf_counter() - started < 0.5
+
+
+def test_cassette_file_is_deterministic_and_misses_are_explicit(tmp_path) -> None:
+    first = Cassette(tmp_path / "a.jsonl.gz")
+    _run("Task", first.record(TOOLS))
+    first.save()
+    copy = Cassette(tmp_path / "b.jsonl.gz")
+    copy.calls = list(first.calls)
+    copy.save()
+
+    assert (tmp_path / "a.jsonl.gz").read_bytes() == (tmp_path / "b.jsonl.gz").read_bytes()
+    with pytest.raises(CassetteMiss):
+        _run("Unrecorded task", Cassette.load(tmp_path / "a.jsonl.gz").replay())
+
+
+def test_runner_records_only_the_results_it_returns(tmp_path) -> None:
+    path = tmp_path / "hedged.jsonl.gz"
+    recorder = Cassette(path)
+    calls = []
+
+    def flaky_latency(argument: str) -> dict:
+        calls.append(argument)
+        time.sleep(0.2 if len(calls) == 1 else 0.0)
+        return {"tool": "lookup_policy", "result": argument, "confidence": 0.9}
+
+    with ResilientToolRunner(
+        {"lookup_policy": flaky_latency}, hedge_after=0.02, on_result=recorder.record_call
+    ) as runner:
+        runner.call("lookup_policy", "q")
+        recorder.save()
+        time.sleep(0.3)
+
+    assert len(calls) == 2
+    assert [call["args"] for call in Cassette.load(path).calls] == [["q"]]
+    assert len(recorder.calls) == 1
@@ -0,0 +1,43 @@
+from agent import TaskState, execute_and_review, execute_plan, plan_task, review_outputs
+
+
+def _planned() -> TaskState:
+    return plan_task(TaskState(task="Test task", model="codex-5.3"))
+
+
+def test_pipelined_review_matches_serial_review() -> None:
+    serial = review_outputs(execute_plan(_planned()))
+    pipelined = execute_and_review(_planned())
+
+    assert [o["tool"] for o in pipelined.tool_outputs] == [o["tool"] for o in serial.tool_outputs]
+    assert pipelined.review_notes == serial.review_notes
+
+
+def test_pipelined_review_stops_once_escalation_is_certain() -> None:
+    state = execute_and_review(_planned(), stop_on_escalation=True)
+
+    # The first step is answered by summarize_context (confidence 0.79 < 0.8).
+    assert len(state.tool_outputs) == 1
+    assert state.review_notes[0] == "Some tool outputs are low confidence; recommend human review."
+    assert state.review_notes[1:] == ["Skipped 2 remaining step(s): human review is already required."]
+
+
+def test_pipelined_review_reports_completion_when_nothing_is_skipped() -> None:
+    state = _planned()
+    state.plan = state.plan[:1]
+    state = execute_and_review(state, stop_on_escalation=True)
+
+    assert len(state.tool_outputs) == 1
+    assert state.review_notes == [
+        "Some tool outputs are low confidence; recommend human review.",
+        "All required workflow stages completed.",
+    ]
+
+
+def test_skipped_count_ignores_outputs_from_earlier_calls() -> None:
+    state = _planned()
+    state.tool_outputs = [{"tool": "lookup_policy", "confidence": 0.9}] * 2
+    state = execute_and_review(state, stop_on_escalation=True)
+
+    assert len(state.tool_outputs) == 3
+    assert state.review_notes[1:] == ["Skipped 2 remaining step(s): human review is already required."]
@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+
+from agent import TaskState, execute_plan, plan_task, review_outputs
+from resilience import (
+    DEFAULT_HEDGE_DELAY,
+    MIN_LATENCY_SAMPLES,
+    CircuitOpenError,
+    Deadline,
+    DeadlineExceeded,
+    ResilientToolRunner,
+)
+
+
+class FakeTool:
+    """Latency-injecting tool: returns after ``delays[n]`` seconds on the n-th call."""
+
+    def __init__(self, name: str, delays: list[float], fail: bool = False) -> None:
+        self.name = name
+        self.delays = delays
+        self.fail = fail
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, argument: str) -> dict:
+        with self._lock:
+            delay = self.delays[min(self.calls, len(self.delays) - 1)]
+            self.calls += 1
+        time.sleep(delay)
+        if self.fail:
+            raise ConnectionError(f"{self.name} backend unavailable")
+        return {"tool": self.name, "result": argument, "confidence": 0.9}
+
+
+def test_hedged_call_returns_fast_when_primary_stalls() -> None:
+    tool = FakeTool("lookup_policy", delays=[1.0, 0.01])
+    with ResilientToolRunner({"lookup_policy": tool}, hedge_after=0.05) as runner:
+        started = time.monotonic()
+        result = runner.call("lookup_policy", "q")
+        elapsed = time.monotonic() - started
+
+    assert result["confidence"] == 0.9
+    assert runner.hedges_sent == 1
+    assert elapsed < 0.5
+
+
+def test_fast_primary_failure_is_not_hedged() -> None:
+    tool = FakeTool("lookup_policy", delays=[0.0], fail=True)
+    with ResilientToolRunner({"lookup_policy": tool}, hedge_after=0.5) as runner:
+        with pytest.raises(ConnectionError):
+            runner.call("lookup_policy", "q")
+
+    assert runner.hedges_sent == 0
+    assert tool.calls == 1
+    assert runner.breakers["lookup_policy"].failures == 1
+
+
+def test_deadline_bounds_tool_wait() -> None:
+    tool = FakeTool("lookup_policy", delays=[1.0])
+    with ResilientToolRunner({"lookup_policy": tool}, hedge_after=0.02) as runner:
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            runner.call("lookup_policy", "q", deadline=Deadline.after(0.1))
+
+    assert time.monotonic() - started < 0.5
+
+
+def test_circuit_breaker_fails_fast_and_is_noted_in_review() -> None:
+    failing = FakeTool("summarize_context", delays=[0.0], fail=True)
+    healthy = FakeTool("lookup_policy", delays=[0.0])
+    tools = {"lookup_policy": healthy, "summarize_context": failing}
+
+    with ResilientToolRunner(tools, hedge_after=0.05, failure_threshold=1) as runner:
+        state = plan_task(TaskState(task="Test task", model="codex-5.3"))
+        state = execute_plan(state, runner=runner, deadline=Deadline.after(5))
+        state = review_outputs(state)
+        calls_after_trip = failing.calls
+        with pytest.raises(CircuitOpenError):
+            runner.call("summarize_context", "again")
+
+    assert failing.calls == calls_after_trip
+    assert any("Circuit breaker opened for summarize_context" in note for note in state.review_notes)
+    assert any(output.get("error") for output in state.tool_outputs)
+    assert any(output["tool"] == "lookup_policy" and "error" not in output for output in state.tool_outputs)
+
+
+def test_on_result_sees_one_result_per_hedged_call() -> None:
+    tool = FakeTool("lookup_policy", delays=[0.3, 0.01])
+    seen = []
+    with ResilientToolRunner(
+        {"lookup_policy": tool}, hedge_after=0.02, on_result=lambda *call: seen.append(call)
+    ) as runner:
+        result = runner.call("lookup_policy", "q")
+        time.sleep(0.4)  # Let the abandoned primary finish.
+
+    assert runner.hedges_sent == 1
+    assert tool.calls == 2
+    assert seen == [("lookup_policy", ("q",), result)]
+
+
+def test_saved_latencies_seed_the_next_runs_hedge_delay(tmp_path) -> None:
+    path = tmp_path / "latencies.json"
+    tool = FakeTool("lookup_policy", delays=[0.0])
+    with ResilientToolRunner({"lookup_policy": tool}) as runner:
+        assert runner.hedge_delay("lookup_policy") == DEFAULT_HEDGE_DELAY
+        for _ in range(MIN_LATENCY_SAMPLES):
+            runner.call("lookup_policy", "q")
+        runner.save_latencies(path)
+
+    with ResilientToolRunner({"lookup_policy": tool}) as seeded:
+        seeded.load_latencies(path)
+        assert seeded.hedge_delay("lookup_policy") < 0.05
+
+    with ResilientToolRunner({"lookup_policy": tool}) as fresh:
+        fresh.load_latencies(tmp_path / "missing.json")
+        assert fresh.hedge_delay("lookup_policy") == DEFAULT_HEDGE_DELAY
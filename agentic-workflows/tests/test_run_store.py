@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone
+
+from agent import TaskState, execute_plan, finalize_response, plan_task, review_outputs
+from run_store import RunStore
+
+
+def _run(task: str, model: str) -> dict:
+    state = TaskState(task=task, model=model)
+    state = plan_task(state)
+    state = execute_plan(state)
+    state = review_outputs(state)
+    return finalize_response(state)
+
+
+def test_run_store_round_trips_final_response(tmp_path) -> None:
+    with RunStore(tmp_path / "runs.sqlite3") as store:
+        run_id = store.insert(_run("Test task", "codex-5.3"))
+        [stored] = store.query(task="Test task")
+
+    assert stored["run_id"] == run_id
+    assert stored["model"] == "codex-5.3"
+    assert stored["tool_outputs"], "Tool outputs should be persisted"
+
+
+def test_run_store_filters_low_confidence_runs_by_model_and_window(tmp_path) -> None:
+    now = datetime.now(timezone.utc)
+    record = _run("Test task", "opus-4.6")
+    confident = {**record, "tool_outputs": [{"tool": "lookup_policy", "confidence": 0.95}]}
+
+    with RunStore(tmp_path / "runs.sqlite3") as store:
+        assert store.insert_many([record, confident], created_at=now - timedelta(days=2)) == 2
+        store.insert(record, created_at=now - timedelta(days=30))
+        store.insert({**record, "model": "codex-5.3"}, created_at=now)
+
+        results = store.query(model="opus-4.6", since=now - timedelta(days=7), max_confidence=0.8)
+        plan = store.explain(model="opus-4.6", since=now - timedelta(days=7), max_confidence=0.8)
+
+    assert len(results) == 1
+    assert min(o["confidence"] for o in results[0]["tool_outputs"]) < 0.8
+    assert "USING INDEX" in plan
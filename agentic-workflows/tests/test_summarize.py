@@ -0,0 +1,55 @@
+from itertools import islice, repeat
+
+from summarize import ChunkCache, iter_chunks, map_reduce_summarize
+from tools import summarize_context
+
+
+def _document(sentences: int) -> str:
+    return " ".join(f"Sentence {i} describes mitigation step {i} in detail." for i in range(sentences))
+
+
+def test_iter_chunks_respects_sentence_boundaries_and_limits() -> None:
+    text = _document(500)
+    chunks = list(iter_chunks(text, min_chars=200, max_chars=800))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 800 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_iter_chunks_accepts_streamed_parts() -> None:
+    text = _document(300)
+    streamed = (text[i : i + 97] for i in range(0, len(text), 97))
+
+    assert list(iter_chunks(streamed, min_chars=200, max_chars=800)) == list(
+        iter_chunks(text, min_chars=200, max_chars=800)
+    )
+
+
+def test_iter_chunks_bounds_unterminated_streams() -> None:
+    # No sentence end ever arrives; chunks must still be emitted at ``max_chars``.
+    chunks = list(islice(iter_chunks(repeat("lorem "), min_chars=200, max_chars=800), 3))
+
+    assert [len(chunk) for chunk in chunks] == [800, 800, 800]
+
+
+def test_map_reduce_reprocesses_only_edited_chunks() -> None:
+    cache = ChunkCache()
+    text = _document(2_000)
+    first = map_reduce_summarize(text, cache=cache, fan_in=4, min_chars=200, max_chars=800)
+    edited = text.replace("Sentence 1000 describes", "Sentence 1000 now describes")
+    second = map_reduce_summarize(edited, cache=cache, fan_in=4, min_chars=200, max_chars=800)
+
+    assert first.summary.startswith("Sentence 0")
+    assert first.levels > 1
+    assert first.cache_hits == 0
+    assert second.chunks - second.cache_hits <= 2
+
+
+def test_summarize_context_covers_long_inputs() -> None:
+    output = summarize_context(_document(5_000))
+
+    assert output["chunks"] > 1
+    assert output["result"].startswith("Stubbed summary: Sentence 0")
+    assert summarize_context("short")["result"] == "Stubbed summary: short"
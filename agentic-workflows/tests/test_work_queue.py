@@ -0,0 +1,182 @@
+import multiprocessing
+import sqlite3
+import time
+
+import pytest
+
+from distributed_runner import run_workflow
+from work_queue import FilesystemQueue, SQLiteLeaseQueue, open_backend, run_worker, shard_for, task_hash
+
+TASK_SECONDS = 0.05
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _slow_workflow(payload: dict) -> dict:
+    time.sleep(TASK_SECONDS)
+    return run_workflow(payload)
+
+
+def _worker(path: str) -> int:
+    backend = SQLiteLeaseQueue(path, shards=4)
+    try:
+        return run_worker(backend, _slow_workflow, idle_timeout=0.2)
+    finally:
+        backend.close()
+
+
+def _run_batch(path: str, workers: int, tasks: int) -> float:
+    queue = SQLiteLeaseQueue(path, shards=4)
+    queue.enqueue_many({"task": f"Task {i}", "model": "codex-5.3"} for i in range(tasks))
+    context = multiprocessing.get_context("fork")
+    started = time.monotonic()
+    with context.Pool(workers) as pool:
+        processed = pool.map(_worker, [path] * workers)
+    elapsed = time.monotonic() - started
+    assert sum(processed) == tasks
+    assert queue.outstanding() == 0
+    assert len(queue.results()) == tasks
+    queue.close()
+    return elapsed
+
+
+@pytest.fixture(params=["sqlite", "fs"])
+def make_queue(request, tmp_path):
+    def factory(**options):
+        if request.param == "sqlite":
+            return SQLiteLeaseQueue(tmp_path / "queue.sqlite3", **options)
+        return FilesystemQueue(tmp_path / "queue", **options)
+
+    return factory
+
+
+def test_expired_lease_is_redelivered_and_result_written_once(make_queue) -> None:
+    clock = FakeClock()
+    queue = make_queue(shards=2, visibility_timeout=10, clock=clock)
+    [task_id] = queue.enqueue_many([{"task": "Test task", "model": "codex-5.3"}])
+
+    first = queue.lease()
+    assert first is not None and first.task_id == task_id
+    assert queue.lease() is None  # Invisible while leased.
+
+    clock.now += 11
+    second = queue.lease()
+    assert second is not None and second.task_id == task_id
+    assert second.attempt == 2
+
+    assert queue.put_result(task_id, run_workflow(second.payload))
+    assert not queue.put_result(task_id, {"duplicate": True})
+    assert queue.ack(second)
+    assert not queue.ack(first)  # Stale receipt from the expired lease.
+    assert queue.outstanding() == 0
+    assert queue.results()[task_id]["task"] == "Test task"
+
+
+def test_enqueue_is_idempotent_and_sharded(make_queue) -> None:
+    queue = make_queue(shards=4)
+    payloads = [{"task": f"Task {i}", "model": "codex-5.3"} for i in range(20)]
+    queue.enqueue_many(payloads)
+    queue.enqueue_many(payloads)
+
+    assert queue.outstanding() == 20
+    expected = {task_hash(p) for p in payloads if shard_for(task_hash(p), 4) == 0}
+    assert expected  # The fixed payloads put some tasks on shard 0.
+
+    leased = []
+    while (lease := queue.lease(shards=[0])) is not None:
+        leased.append(lease)
+    assert all(lease.shard == 0 for lease in leased)
+    assert {lease.task_id for lease in leased} == expected
+    assert queue.lease(shards=[]) is None
+    assert queue.outstanding() == 20
+
+
+def _always_raises(payload: dict) -> dict:
+    raise RuntimeError(f"cannot process {payload['task']}")
+
+
+def test_raising_handler_is_retried_then_dead_lettered(make_queue) -> None:
+    queue = make_queue(shards=2)
+    payloads = [{"task": "Bad task", "model": "codex-5.3"}, {"task": "Good task", "model": "codex-5.3"}]
+    bad_id, good_id = queue.enqueue_many(payloads)
+
+    def handler(payload: dict) -> dict:
+        return _always_raises(payload) if payload["task"] == "Bad task" else run_workflow(payload)
+
+    handled = run_worker(queue, handler, idle_timeout=0.1, max_attempts=3)
+
+    assert handled == 4  # Three attempts at the bad task, one at the good one.
+    assert queue.outstanding() == 0
+    assert set(queue.results()) == {good_id}
+    failed = queue.failed()
+    assert set(failed) == {bad_id}
+    assert failed[bad_id]["attempts"] == 3
+    assert failed[bad_id]["error"] == "RuntimeError: cannot process Bad task"
+
+    queue.enqueue_many(payloads)  # Re-enqueueing neither revives nor duplicates either task.
+    assert queue.outstanding() == 0
+
+
+def test_crashed_deliveries_count_towards_max_attempts(make_queue) -> None:
+    clock = FakeClock()
+    queue = make_queue(shards=1, visibility_timeout=10, clock=clock)
+    [task_id] = queue.enqueue_many([{"task": "Crashy task", "model": "codex-5.3"}])
+    for _ in range(2):
+        assert queue.lease() is not None  # The worker dies before acking.
+        clock.now += 11
+
+    calls = []
+    handled = run_worker(queue, calls.append, idle_timeout=0.05, max_attempts=2)
+
+    assert (handled, calls) == (1, [])
+    assert queue.failed()[task_id]["error"] == "Gave up after 2 attempts without a result"
+    assert queue.outstanding() == 0
+
+
+def test_fs_enqueue_does_not_recreate_a_leased_task(tmp_path) -> None:
+    queue = FilesystemQueue(tmp_path / "queue", shards=2)
+    payload = {"task": "Test task", "model": "codex-5.3"}
+    [task_id] = queue.enqueue_many([payload])
+    lease = queue.lease()
+    assert lease is not None
+
+    queue.enqueue_many([payload])
+    assert queue.lease() is None
+    assert queue.outstanding() == 1
+
+    assert queue.put_result(task_id, {"done": True}) and queue.ack(lease)
+    queue.enqueue_many([payload])
+    assert queue.outstanding() == 0
+
+
+def test_sqlite_queue_upgrades_tables_without_error_column(tmp_path) -> None:
+    path = tmp_path / "old.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE tasks (task_id TEXT PRIMARY KEY, shard INTEGER NOT NULL, payload TEXT NOT NULL, "
+        "state TEXT NOT NULL DEFAULT 'pending', receipt TEXT, visible_at REAL NOT NULL DEFAULT 0, "
+        "attempts INTEGER NOT NULL DEFAULT 0)"
+    )
+    conn.close()
+
+    queue = open_backend(f"sqlite:{path}")
+    queue.enqueue_many([{"task": "Test task", "model": "codex-5.3"}])
+    assert run_worker(queue, _always_raises, idle_timeout=0.05, max_attempts=1) == 1
+    assert len(queue.failed()) == 1
+    queue.close()
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_throughput_scales_with_workers(tmp_path) -> None:
+    tasks = 48
+    one = _run_batch(str(tmp_path / "one.sqlite3"), workers=1, tasks=tasks)
+    four = _run_batch(str(tmp_path / "four.sqlite3"), workers=4, tasks=tasks)
+
+    assert one >= tasks * TASK_SECONDS
+    assert four < one / 2
@@ -0,0 +1,246 @@
+"""Content-addressed response cache for the prompt harness.
+
+Best-practice note:
+- Key on everything that changes the answer: model, rendered prompt and call
+  parameters. Template text is already inside the rendered prompt.
+- Store the template version with each entry so a template revision can drop
+  its stale responses without touching the rest of the cache.
+- Near-duplicate reuse (whitespace/case only) is opt-in; it trades exactness
+  for hit rate and should stay off for case-sensitive prompts.
+- The database uses incremental auto-vacuum, so pages freed by eviction or
+  expiry are returned to the filesystem instead of leaving the file at its
+  high-water mark.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+EVICT_TO_FRACTION = 0.9  # Evict below the limit so the next few puts do not evict again.
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        near_key TEXT NOT NULL,
+        model TEXT NOT NULL,
+        template TEXT NOT NULL,
+        template_version TEXT NOT NULL,
+        response BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        latency_ms REAL NOT NULL,
+        created_at REAL NOT NULL,
+        last_used_at REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_responses_near_key ON responses (near_key)",
+    "CREATE INDEX IF NOT EXISTS idx_responses_template ON responses (template, template_version)",
+    "CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used_at)",
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    return _WHITESPACE.sub(" ", prompt).strip().casefold()
+
+
+def cache_key(model: str, prompt: str, params: dict[str, Any] | None = None) -> str:
+    material = json.dumps([model, prompt, params or {}], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def template_version(template: str) -> str:
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class CacheHit:
+    response: dict[str, Any]
+    latency_ms: float  # What the original provider call cost.
+    near_duplicate: bool
+
+
+@dataclass
+class SweepStats:
+    calls: int = 0
+    exact_hits: int = 0
+    near_hits: int = 0
+    latency_saved_ms: float = 0.0
+    latency_spent_ms: float = 0.0
+
+    @property
+    def hits(self) -> int:
+        return self.exact_hits + self.near_hits
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.calls if self.calls else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"cache: {self.hits}/{self.calls} hits ({self.hit_rate:.0%}, {self.near_hits} near-duplicate), "
+            f"saved {self.latency_saved_ms / 1000:.2f}s, spent {self.latency_spent_ms / 1000:.2f}s on model calls"
+        )
+
+
+class ResponseCache:
+    def __init__(self, path: Path | str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        # auto_vacuum only takes effect before the first table exists or after a full VACUUM,
+        # so caches created without it are converted once here.
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        if self._conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            self._conn.execute("VACUUM")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+
+    def __enter__(self) -> ResponseCache:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def get(
+        self,
+        model: str,
+        prompt: str,
+        params: dict[str, Any] | None = None,
+        near_duplicate: bool = False,
+    ) -> CacheHit | None:
+        row = self._conn.execute(
+            "SELECT key, response, latency_ms FROM responses WHERE key = ?", (cache_key(model, prompt, params),)
+        ).fetchone()
+        near = False
+        if row is None and near_duplicate:
+            row = self._conn.execute(
+                "SELECT key, response, latency_ms FROM responses WHERE near_key = ? ORDER BY last_used_at DESC LIMIT 1",
+                (cache_key(model, normalize_prompt(prompt), params),),
+            ).fetchone()
+            near = row is not None
+        if row is None:
+            return None
+        key, blob, latency_ms = row
+        with self._conn:
+            self._conn.execute(
+                "UPDATE responses SET hits = hits + 1, last_used_at = ? WHERE key = ?", (time.time(), key)
+            )
+        return CacheHit(json.loads(zlib.decompress(blob)), latency_ms, near)
+
+    def put(
+        self,
+        model: str,
+        prompt: str,
+        response: dict[str, Any],
+        latency_ms: float,
+        params: dict[str, Any] | None = None,
+        template: str = "",
+        version: str = "",
+    ) -> None:
+        blob = zlib.compress(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+        with self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                    (key, near_key, model, template, template_version, response, size, latency_ms, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    cache_key(model, prompt, params),
+                    cache_key(model, normalize_prompt(prompt), params),
+                    model,
+                    template,
+                    version,
+                    blob,
+                    len(blob),
+                    latency_ms,
+                    now,
+                    now,
+                ),
+            )
+        self.evict()
+
+    def size_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries once stored responses exceed ``max_bytes``."""
+        total = self.size_bytes()
+        if total <= self.max_bytes:
+            return 0
+        target = int(self.max_bytes * EVICT_TO_FRACTION)
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used_at"):
+            if total <= target:
+                break
+            doomed.append((key,))
+            total -= size
+        with self._conn:
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.vacuum()
+        return len(doomed)
+
+    def vacuum(self) -> None:
+        """Release free pages left by deletes back to the filesystem."""
+        self._conn.execute("PRAGMA incremental_vacuum").fetchall()
+
+    def expire_template(self, template: str, keep_version: str) -> int:
+        """Delete responses rendered from other versions of ``template``."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE template = ? AND template_version != ?", (template, keep_version)
+            )
+        if cursor.rowcount:
+            self.vacuum()
+        return cursor.rowcount
+
+
+def cached_call(
+    cache: ResponseCache | None,
+    call: Callable[[str, str], dict[str, Any]],
+    model: str,
+    prompt: str,
+    stats: SweepStats,
+    params: dict[str, Any] | None = None,
+    template: str = "",
+    version: str = "",
+    near_duplicate: bool = False,
+) -> dict[str, Any]:
+    stats.calls += 1
+    hit = cache.get(model, prompt, params, near_duplicate=near_duplicate) if cache else None
+    if hit is not None:
+        if hit.near_duplicate:
+            stats.near_hits += 1
+        else:
+            stats.exact_hits += 1
+        stats.latency_saved_ms += hit.latency_ms
+        return hit.response
+
+    started = time.perf_counter()
+    response = call(model, prompt)
+    latency_ms = (time.perf_counter() - started) * 1000
+    stats.latency_spent_ms += latency_ms
+    if cache is not None:
+        cache.put(model, prompt, response, latency_ms, params=params, template=template, version=version)
+    return response
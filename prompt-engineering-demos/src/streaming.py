@@ -0,0 +1,137 @@
+"""Streaming model calls with incremental JSON parsing and latency metrics.
+
+Best-practice note:
+- Measure time-to-first-token separately from total latency; users feel the
+  first one, budgets pay for the second.
+- Parse structured output field by field as it streams so downstream steps
+  (e.g. showing ``summary``) can start before the response is complete.
+- The stub provider is deterministic and offline; swap it for a real SDK
+  stream that yields text deltas.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator
+
+# Roughly word-piece sized chunks: words, numbers, single punctuation and whitespace runs.
+_TOKEN = re.compile(r"\w+|\s+|[^\w\s]")
+
+
+def fake_stream_call(
+    response: dict[str, Any],
+    first_token_delay: float = 0.0,
+    token_delay: float = 0.0,
+) -> Iterator[str]:
+    """Stub streaming provider: yields ``response`` as JSON text in token-sized chunks."""
+    time.sleep(first_token_delay)
+    for index, token in enumerate(_TOKEN.findall(json.dumps(response, indent=2))):
+        if index:
+            time.sleep(token_delay)
+        yield token
+
+
+class IncrementalJSONParser:
+    """Parses a streamed top-level JSON object one completed field at a time.
+
+    Only the top-level object is tracked; a field is complete once the parser
+    sees the comma or closing brace that ends it at depth 1.
+    """
+
+    def __init__(self) -> None:
+        self.fields: dict[str, Any] = {}
+        self._buffer: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.done = False
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        completed = []
+        for char in chunk:
+            if self.done:
+                break
+            if self._in_string:
+                self._buffer.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+                if self._depth == 1:
+                    continue  # Opening brace of the top-level object.
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.extend(self._flush())
+                    self.done = True
+                    continue
+            elif char == "," and self._depth == 1:
+                completed.extend(self._flush())
+                continue
+            if self._depth >= 1:
+                self._buffer.append(char)
+        return completed
+
+    def _flush(self) -> list[tuple[str, Any]]:
+        text = "".join(self._buffer).strip()
+        self._buffer.clear()
+        if not text:
+            return []
+        (key, value), = json.loads("{" + text + "}").items()
+        self.fields[key] = value
+        return [(key, value)]
+
+
+@dataclass
+class StreamMetrics:
+    ttft_ms: float | None = None
+    total_ms: float = 0.0
+    tokens: int = 0
+    field_ready_ms: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def tokens_per_second(self) -> float:
+        # Decode rate after the first token, so queueing/prefill time is not counted twice.
+        if self.ttft_ms is None or self.tokens < 2 or self.total_ms <= self.ttft_ms:
+            return 0.0
+        return (self.tokens - 1) / ((self.total_ms - self.ttft_ms) / 1000)
+
+    def summary(self) -> str:
+        ttft = f"{self.ttft_ms:.0f}ms" if self.ttft_ms is not None else "n/a"
+        return (
+            f"ttft {ttft}, total {self.total_ms:.0f}ms, {self.tokens} tokens, "
+            f"{self.tokens_per_second:.1f} tok/s"
+        )
+
+
+def consume_stream(
+    stream: Iterable[str],
+    on_field: Callable[[str, Any, float], None] | None = None,
+) -> tuple[dict[str, Any], StreamMetrics]:
+    """Drain a token stream, parsing fields as they complete; returns (response, metrics)."""
+    parser = IncrementalJSONParser()
+    metrics = StreamMetrics()
+    started = time.perf_counter()
+    for token in stream:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if metrics.ttft_ms is None:
+            metrics.ttft_ms = elapsed_ms
+        metrics.tokens += 1
+        for key, value in parser.feed(token):
+            metrics.field_ready_ms[key] = elapsed_ms
+            if on_field is not None:
+                on_field(key, value, elapsed_ms)
+    metrics.total_ms = (time.perf_counter() - started) * 1000
+    if not parser.done:
+        raise ValueError("Stream ended before the JSON object was complete")
+    return parser.fields, metrics
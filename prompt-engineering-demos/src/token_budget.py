@@ -0,0 +1,192 @@
+"""Token accounting and per-model prompt budgets for templates.
+
+Best-practice note:
+- Count tokens before sending: prompt size drives both latency and cost.
+- Template text is static, so tokenize it once per template version and only
+  count the injected ``{{user_input}}`` at render time.
+- When a render exceeds the model budget, drop few-shot examples (last first)
+  before touching the instructions or the user input.
+
+Counts use ``tiktoken`` (cl100k_base) when it is installed and a word-piece
+approximation otherwise; treat them as estimates across providers. A rendered
+prompt is counted as the sum of its parts, which can differ from tokenizing
+the joined string by a token or two at each seam.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to the approximation below.
+    tiktoken = None
+
+PLACEHOLDER = "{{user_input}}"
+OUTPUT_RESERVE_TOKENS = 4096
+
+# Context windows minus OUTPUT_RESERVE_TOKENS; adjust when providers change limits.
+MODEL_PROMPT_BUDGETS = {
+    "codex-5.3": 128_000 - OUTPUT_RESERVE_TOKENS,
+    "opus-4.6": 200_000 - OUTPUT_RESERVE_TOKENS,
+    "glm": 128_000 - OUTPUT_RESERVE_TOKENS,
+}
+
+# A few-shot example starts at a line like "Good example:" / "Example 2:" and runs to the next blank line.
+_EXAMPLE_START = re.compile(r"^(?:good |bad )?example\b[^\n]*:\s*$", re.IGNORECASE | re.MULTILINE)
+_APPROX_TOKEN = re.compile(r"\w{1,4}|[^\w\s]|\s+")
+
+
+def _approximate_count(text: str) -> int:
+    # ~4 characters per word piece; whitespace runs are merged into the next token.
+    return sum(1 for piece in _APPROX_TOKEN.findall(text) if not piece.isspace())
+
+
+def default_counter() -> tuple[str, Callable[[str], int]]:
+    if tiktoken is not None:
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return "cl100k_base", lambda text: len(encoding.encode(text, disallowed_special=()))
+    return "approx", _approximate_count
+
+
+TOKENIZER_NAME, count_tokens = default_counter()
+
+
+@dataclass(frozen=True)
+class Segment:
+    kind: str  # "static" | "example" | "input"
+    text: str
+    tokens: int
+
+
+@dataclass(frozen=True)
+class PreparedTemplate:
+    version: str
+    segments: tuple[Segment, ...]
+
+    @property
+    def static_tokens(self) -> int:
+        return sum(s.tokens for s in self.segments if s.kind == "static")
+
+    @property
+    def example_tokens(self) -> tuple[int, ...]:
+        return tuple(s.tokens for s in self.segments if s.kind == "example")
+
+
+def _split_examples(text: str) -> list[tuple[str, str]]:
+    parts = []
+    cursor = 0
+    for match in _EXAMPLE_START.finditer(text):
+        end = text.find("\n\n", match.start())
+        end = len(text) if end == -1 else end + 2
+        if match.start() < cursor:
+            continue
+        parts.append(("static", text[cursor : match.start()]))
+        parts.append(("example", text[match.start() : end]))
+        cursor = end
+    parts.append(("static", text[cursor:]))
+    return [(kind, chunk) for kind, chunk in parts if chunk]
+
+
+@lru_cache(maxsize=128)
+def prepare_template(template: str) -> PreparedTemplate:
+    """Tokenize static parts and few-shot examples once per distinct template text."""
+    segments: list[Segment] = []
+    pieces = template.split(PLACEHOLDER)
+    for index, piece in enumerate(pieces):
+        if index:
+            segments.append(Segment("input", PLACEHOLDER, 0))
+        for kind, chunk in _split_examples(piece):
+            segments.append(Segment(kind, chunk, count_tokens(chunk)))
+    version = hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+    return PreparedTemplate(version=version, segments=tuple(segments))
+
+
+@dataclass
+class BudgetedRender:
+    prompt: str
+    tokens: int
+    static_tokens: int
+    input_tokens: int
+    example_tokens: int
+    examples_kept: int
+    examples_dropped: int
+    budget: int
+
+    @property
+    def over_budget(self) -> bool:
+        return self.tokens > self.budget
+
+
+def render_within_budget(template: str, user_input: str, budget: int) -> BudgetedRender:
+    """Render with as many few-shot examples as fit in ``budget`` (earlier examples win)."""
+    prepared = prepare_template(template)
+    input_tokens = count_tokens(user_input)
+    placeholders = sum(1 for s in prepared.segments if s.kind == "input")
+    fixed = prepared.static_tokens + input_tokens * placeholders
+
+    examples = prepared.example_tokens
+    kept = len(examples)
+    while kept and fixed + sum(examples[:kept]) > budget:
+        kept -= 1
+
+    parts = []
+    seen_examples = 0
+    for segment in prepared.segments:
+        if segment.kind == "example":
+            seen_examples += 1
+            if seen_examples > kept:
+                continue
+        parts.append(user_input if segment.kind == "input" else segment.text)
+    example_tokens = sum(examples[:kept])
+    return BudgetedRender(
+        prompt="".join(parts),
+        tokens=fixed + example_tokens,
+        static_tokens=prepared.static_tokens,
+        input_tokens=input_tokens * placeholders,
+        example_tokens=example_tokens,
+        examples_kept=kept,
+        examples_dropped=len(examples) - kept,
+        budget=budget,
+    )
+
+
+def model_budget(model: str, override: int | None = None) -> int:
+    if override is not None:
+        return override
+    return MODEL_PROMPT_BUDGETS.get(model, min(MODEL_PROMPT_BUDGETS.values()))
+
+
+@dataclass
+class TokenStats:
+    renders: list[int] = field(default_factory=list)
+    input_tokens: int = 0
+    static_tokens: int = 0
+    example_tokens: int = 0
+    trimmed: int = 0
+    over_budget: int = 0
+
+    def add(self, render: BudgetedRender) -> None:
+        self.renders.append(render.tokens)
+        self.input_tokens += render.input_tokens
+        self.static_tokens += render.static_tokens
+        self.example_tokens += render.example_tokens
+        self.trimmed += bool(render.examples_dropped)
+        self.over_budget += render.over_budget
+
+    def summary(self) -> str:
+        if not self.renders:
+            return f"tokens ({TOKENIZER_NAME}): no renders"
+        ordered = sorted(self.renders)
+        total = sum(ordered)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        return (
+            f"tokens ({TOKENIZER_NAME}): {len(ordered)} prompts, total {total}, "
+            f"mean {total / len(ordered):.0f}, p50 {ordered[len(ordered) // 2]}, p95 {p95}, max {ordered[-1]} | "
+            f"static {self.static_tokens}, examples {self.example_tokens}, input {self.input_tokens} | "
+            f"{self.trimmed} trimmed, {self.over_budget} over budget"
+        )
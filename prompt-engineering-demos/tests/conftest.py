@@ -0,0 +1,11 @@
+"""Put the library modules in ../src on sys.path for the unit tests."""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+# The harness is a CLI script whose name happens to match pytest's *_test.py pattern.
+collect_ignore = ["interactive_prompt_test.py"]
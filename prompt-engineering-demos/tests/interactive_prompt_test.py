@@ -9,10 +9,19 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 
+# The harness runs as a script; its library modules live in ../src.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from response_cache import DEFAULT_MAX_BYTES, ResponseCache, SweepStats, cached_call, template_version
+from streaming import StreamMetrics, consume_stream, fake_stream_call
+from token_budget import TokenStats, model_budget, render_within_budget
+
 
 SUPPORTED_MODELS = {"codex-5.3", "opus-4.6", "glm"}
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "responses.sqlite3"
 
 
 def load_template(path: Path) -> str:
@@ -41,24 +50,163 @@ def fake_model_call(model: str, prompt: str) -> dict:
     }
 
 
+def fake_model_stream(model: str, prompt: str, first_token_delay: float = 0.2, token_delay: float = 0.005):
+    # Replace this stub with the provider's streaming SDK call (yielding text deltas).
+    return fake_stream_call(fake_model_call(model, prompt), first_token_delay, token_delay)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def stream_summary(metrics: list[StreamMetrics]) -> str:
+    ttfts = [m.ttft_ms for m in metrics if m.ttft_ms is not None]
+    if not ttfts:
+        return "stream: no model calls"
+    totals = [m.total_ms for m in metrics]
+    rates = [m.tokens_per_second for m in metrics]
+    return (
+        f"stream: {len(metrics)} calls, ttft p50 {percentile(ttfts, 0.5):.0f}ms / p95 {percentile(ttfts, 0.95):.0f}ms, "
+        f"total p50 {percentile(totals, 0.5):.0f}ms, {sum(rates) / len(rates):.1f} tok/s mean"
+    )
+
+
+def run_sweep(
+    template_path: Path,
+    inputs: list[str],
+    models: list[str],
+    cache: ResponseCache | None,
+    params: dict,
+    near_duplicate: bool = False,
+    stream: bool = False,
+    on_field=None,
+    stream_metrics: list[StreamMetrics] | None = None,
+    token_stats: TokenStats | None = None,
+    max_prompt_tokens: int | None = None,
+) -> tuple[list[dict], SweepStats]:
+    """Render every input and call every model, serving repeats from the cache.
+
+    With ``stream`` the model is called through the streaming stub; each
+    call's metrics are appended to ``stream_metrics`` and parsed fields are
+    passed to ``on_field`` as soon as they complete.
+    Renders are trimmed to each model's prompt budget; prompts still over
+    budget are not sent.
+    """
+    template = load_template(template_path)
+    version = template_version(template)
+    stats = SweepStats()
+    results = []
+    call = fake_model_call
+    if stream:
+        def call(model: str, prompt: str) -> dict:
+            response, metrics = consume_stream(fake_model_stream(model, prompt), on_field=on_field)
+            if stream_metrics is not None:
+                stream_metrics.append(metrics)
+            return response
+
+    for model in models:
+        for user_input in inputs:
+            render = render_within_budget(template, user_input, model_budget(model, max_prompt_tokens))
+            rendered = render.prompt
+            if token_stats is not None:
+                token_stats.add(render)
+            if render.over_budget:
+                error = f"Prompt is {render.tokens} tokens; {model} budget is {render.budget}."
+                results.append({"model": model, "input": user_input, "rendered": rendered, "response": {"error": error}})
+                continue
+            response = cached_call(
+                cache,
+                call,
+                model,
+                rendered,
+                stats,
+                params=params,
+                template=template_path.name,
+                version=version,
+                near_duplicate=near_duplicate,
+            )
+            results.append({"model": model, "input": user_input, "rendered": rendered, "response": response})
+    return results, stats
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--template", required=True, type=Path)
-    parser.add_argument("--input", required=True)
-    parser.add_argument("--model", default="codex-5.3")
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument("--input")
+    inputs.add_argument("--inputs-file", type=Path, help="Sweep: one input per line")
+    parser.add_argument("--model", default="codex-5.3", help="Model, or comma-separated models for a sweep")
+    parser.add_argument("--temperature", default=0.0, type=float)
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, type=Path, help="Response cache database")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--cache-max-mb", default=DEFAULT_MAX_BYTES / 1024 / 1024, type=float)
+    parser.add_argument("--near-duplicates", action="store_true", help="Reuse responses for whitespace/case variants")
+    parser.add_argument("--stream", action="store_true", help="Stream responses and report TTFT and tokens/s")
+    parser.add_argument("--max-prompt-tokens", type=int, help="Override every model's prompt token budget")
+    parser.add_argument(
+        "--expire-stale", action="store_true", help="Drop cached responses from older versions of this template"
+    )
     args = parser.parse_args()
 
-    if args.model not in SUPPORTED_MODELS:
-        raise ValueError(f"Unsupported model: {args.model}. Choose from {sorted(SUPPORTED_MODELS)}")
-
-    template = load_template(args.template)
-    rendered = render_template(template, args.input)
-    response = fake_model_call(args.model, rendered)
-
-    print("\n--- Rendered Prompt ---")
-    print(rendered)
-    print("\n--- Model Response (Stub) ---")
-    print(json.dumps(response, indent=2))
+    models = [model.strip() for model in args.model.split(",") if model.strip()]
+    for model in models:
+        if model not in SUPPORTED_MODELS:
+            raise ValueError(f"Unsupported model: {model}. Choose from {sorted(SUPPORTED_MODELS)}")
+
+    if args.inputs_file:
+        user_inputs = [line.strip() for line in args.inputs_file.read_text(encoding="utf-8").splitlines() if line.strip()]
+    else:
+        user_inputs = [args.input]
+
+    single = len(user_inputs) == 1 and len(models) == 1
+    metrics: list[StreamMetrics] = []
+    tokens = TokenStats()
+
+    def print_field(key: str, value, elapsed_ms: float) -> None:
+        if single:
+            print(f"[{elapsed_ms:6.0f}ms] {key}: {json.dumps(value)}")
+
+    if single:
+        print("\n--- Rendered Prompt ---")
+        budget = model_budget(models[0], args.max_prompt_tokens)
+        print(render_within_budget(load_template(args.template), user_inputs[0], budget).prompt)
+        if args.stream:
+            print("\n--- Streaming Fields ---")
+
+    cache = None if args.no_cache else ResponseCache(args.cache, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+    try:
+        if cache is not None and args.expire_stale:
+            expired = cache.expire_template(args.template.name, template_version(load_template(args.template)))
+            print(f"Expired {expired} cached responses from older versions of {args.template.name}.")
+        results, stats = run_sweep(
+            args.template,
+            user_inputs,
+            models,
+            cache,
+            params={"temperature": args.temperature},
+            near_duplicate=args.near_duplicates,
+            stream=args.stream,
+            on_field=print_field,
+            stream_metrics=metrics,
+            token_stats=tokens,
+            max_prompt_tokens=args.max_prompt_tokens,
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+
+    if single:
+        print("\n--- Model Response (Stub) ---")
+        print(json.dumps(results[0]["response"], indent=2))
+    else:
+        for result in results:
+            response = result["response"]
+            print(f"[{result['model']}] {result['input'][:60]} -> {response.get('summary', response.get('error', ''))[:60]}")
+    print(f"\n{stats.summary()}")
+    print(tokens.summary())
+    if args.stream:
+        print(stream_summary(metrics) if len(metrics) != 1 else f"stream: {metrics[0].summary()}")
 
 
 if __name__ == "__main__":
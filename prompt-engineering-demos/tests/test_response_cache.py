@@ -0,0 +1,138 @@
+import os
+import sqlite3
+
+from response_cache import ResponseCache, SweepStats, cache_key, cached_call
+
+
+class CountingCall:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, model: str, prompt: str) -> dict:
+        self.calls += 1
+        return {"model": model, "prompt": prompt, "n": self.calls}
+
+
+def _filler(size: int) -> dict:
+    # Random hex compresses to about half its length, so entries stay close to ``size // 2`` bytes.
+    return {"text": os.urandom(size // 2).hex()}
+
+
+def test_second_identical_call_is_a_hit(tmp_path) -> None:
+    call = CountingCall()
+    stats = SweepStats()
+    with ResponseCache(tmp_path / "cache.sqlite3") as cache:
+        first = cached_call(cache, call, "glm", "Summarize this.", stats)
+        second = cached_call(cache, call, "glm", "Summarize this.", stats)
+        cached_call(cache, call, "glm", "Summarize that.", stats)
+
+    assert second == first
+    assert call.calls == 2
+    assert (stats.calls, stats.exact_hits, stats.near_hits) == (3, 1, 0)
+
+
+def test_params_and_model_are_part_of_the_key(tmp_path) -> None:
+    call = CountingCall()
+    stats = SweepStats()
+    with ResponseCache(tmp_path / "cache.sqlite3") as cache:
+        cached_call(cache, call, "glm", "Hi", stats, params={"temperature": 0})
+        cached_call(cache, call, "glm", "Hi", stats, params={"temperature": 1})
+        cached_call(cache, call, "opus-4.6", "Hi", stats, params={"temperature": 0})
+
+    assert call.calls == 3
+    assert stats.hits == 0
+
+
+def test_near_duplicates_are_opt_in(tmp_path) -> None:
+    call = CountingCall()
+    stats = SweepStats()
+    with ResponseCache(tmp_path / "cache.sqlite3") as cache:
+        cached_call(cache, call, "glm", "Summarize  this.", stats)
+        cached_call(cache, call, "glm", "summarize this.", stats)
+        cached_call(cache, call, "glm", "SUMMARIZE this.", stats, near_duplicate=True)
+
+    assert call.calls == 2
+    assert (stats.exact_hits, stats.near_hits) == (0, 1)
+
+
+def test_no_cache_always_calls_the_model() -> None:
+    call = CountingCall()
+    stats = SweepStats()
+    cached_call(None, call, "glm", "Hi", stats)
+    cached_call(None, call, "glm", "Hi", stats)
+
+    assert call.calls == 2
+    assert stats.hit_rate == 0.0
+
+
+def test_eviction_keeps_stored_bytes_under_budget(tmp_path) -> None:
+    with ResponseCache(tmp_path / "cache.sqlite3", max_bytes=20_000) as cache:
+        for i in range(40):
+            cache.put("glm", f"prompt {i}", _filler(2_000), latency_ms=1.0)
+            assert cache.size_bytes() <= cache.max_bytes
+
+        assert cache.get("glm", "prompt 0") is None
+        assert cache.get("glm", "prompt 39") is not None
+
+
+def test_eviction_drops_least_recently_used_first(tmp_path) -> None:
+    with ResponseCache(tmp_path / "cache.sqlite3", max_bytes=20_000) as cache:
+        cache.put("glm", "keep", _filler(2_000), latency_ms=1.0)
+        cache.put("glm", "drop", _filler(2_000), latency_ms=1.0)
+        for i in range(30):
+            assert cache.get("glm", "keep") is not None
+            cache.put("glm", f"prompt {i}", _filler(2_000), latency_ms=1.0)
+
+        assert cache.get("glm", "keep") is not None
+        assert cache.get("glm", "drop") is None
+
+
+def test_eviction_returns_pages_to_the_filesystem(tmp_path) -> None:
+    path = tmp_path / "cache.sqlite3"
+    with ResponseCache(path, max_bytes=50_000) as cache:
+        for i in range(60):
+            cache.put("glm", f"prompt {i}", _filler(4_000), latency_ms=1.0)
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_existing_cache_is_converted_to_incremental_vacuum(tmp_path) -> None:
+    path = tmp_path / "cache.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE legacy (x)")
+    conn.commit()
+    conn.close()
+
+    ResponseCache(path).close()
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    finally:
+        conn.close()
+
+
+def test_expire_template_keeps_only_the_current_version(tmp_path) -> None:
+    with ResponseCache(tmp_path / "cache.sqlite3") as cache:
+        cache.put("glm", "a", {"v": 1}, latency_ms=1.0, template="t", version="v1")
+        cache.put("glm", "b", {"v": 2}, latency_ms=1.0, template="t", version="v2")
+
+        assert cache.expire_template("t", keep_version="v2") == 1
+        assert cache.get("glm", "a") is None
+        assert cache.get("glm", "b") is not None
+
+
+def test_cache_key_is_stable() -> None:
+    assert cache_key("glm", "Hello", {"temperature": 0}) == (
+        "7f2b20fb9e2e2b96176f41c70fe1c9a7f3f84bf6d5dbe8f15e0a80cd129a74db"
+    )
+    assert cache_key("glm", "Hi", {"temperature": 0, "top_p": 1}) == cache_key(
+        "glm", "Hi", {"top_p": 1, "temperature": 0}
+    )
+    assert cache_key("glm", "Hi") == cache_key("glm", "Hi", {})
+    assert cache_key("glm", "Hi") != cache_key("glm", "hi")
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+import streaming
+from streaming import IncrementalJSONParser, StreamMetrics, consume_stream, fake_stream_call
+
+RESPONSE = {
+    "summary": 'Quote "x", path C:\\tmp, brace } and comma , inside',
+    "recommended_actions": ["retry", {"when": "later, maybe"}],
+    "confidence": 0.8,
+}
+
+
+def _feed_all(chunks) -> tuple[IncrementalJSONParser, list[tuple[str, object]]]:
+    parser = IncrementalJSONParser()
+    completed = []
+    for chunk in chunks:
+        completed.extend(parser.feed(chunk))
+    return parser, completed
+
+
+def test_fake_stream_round_trips() -> None:
+    response, metrics = consume_stream(fake_stream_call(RESPONSE))
+
+    assert response == RESPONSE
+    assert metrics.tokens > len(RESPONSE)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7])
+def test_any_chunk_boundary_parses_the_same(size: int) -> None:
+    text = json.dumps(RESPONSE)
+    parser, completed = _feed_all(text[i : i + size] for i in range(0, len(text), size))
+
+    assert parser.done
+    assert parser.fields == RESPONSE
+    assert [key for key, _ in completed] == list(RESPONSE)
+
+
+def test_boundary_between_backslash_and_escaped_quote() -> None:
+    text = json.dumps({"a": 'say \\"hi\\"', "b": 1})
+    split = text.index("\\") + 1
+    parser, _ = _feed_all([text[:split], text[split:]])
+
+    assert parser.fields == {"a": 'say \\"hi\\"', "b": 1}
+
+
+def test_field_completes_on_its_terminating_comma() -> None:
+    parser = IncrementalJSONParser()
+
+    assert parser.feed('{"a": "x,') == []
+    assert parser.feed(' y"') == []
+    assert parser.feed(', "b"') == [("a", "x, y")]
+    assert parser.feed(": [1, 2]}") == [("b", [1, 2])]
+    assert parser.done
+
+
+def test_text_after_the_object_is_ignored() -> None:
+    parser, completed = _feed_all(['{"a": 1}', ' {"b": 2}'])
+
+    assert completed == [("a", 1)]
+    assert parser.fields == {"a": 1}
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"a": 1 "b": 2}',
+        '{"a": tru}',
+        '{"a": }',
+        '{"a" 1}',
+    ],
+)
+def test_malformed_json_raises(text: str) -> None:
+    with pytest.raises(ValueError):
+        consume_stream(iter([text]))
+
+
+def test_truncated_stream_raises() -> None:
+    with pytest.raises(ValueError, match="before the JSON object was complete"):
+        consume_stream(iter(['{"a": 1, "b": "unterminated']))
+
+
+def test_metrics_fields(monkeypatch) -> None:
+    # Each perf_counter() call advances the clock by 10ms: start, then one read per token, then the end.
+    ticks = iter(range(0, 1000, 10))
+    monkeypatch.setattr(streaming.time, "perf_counter", lambda: next(ticks) / 1000)
+    seen = []
+
+    response, metrics = consume_stream(
+        iter(['{"a": 1', ', "b": ', "2", "}"]),
+        on_field=lambda key, value, at_ms: seen.append((key, value, at_ms)),
+    )
+
+    assert response == {"a": 1, "b": 2}
+    assert metrics.ttft_ms == pytest.approx(10)
+    assert metrics.tokens == 4
+    assert metrics.total_ms == pytest.approx(50)
+    assert metrics.field_ready_ms == pytest.approx({"a": 20, "b": 40})
+    assert seen == [("a", 1, pytest.approx(20)), ("b", 2, pytest.approx(40))]
+    # Three tokens after the first, decoded over 40ms.
+    assert metrics.tokens_per_second == pytest.approx(75)
+
+
+def test_tokens_per_second_needs_two_tokens() -> None:
+    assert StreamMetrics().tokens_per_second == 0.0
+    assert StreamMetrics(ttft_ms=5, total_ms=5, tokens=1).tokens_per_second == 0.0
+    assert StreamMetrics().summary().startswith("ttft n/a")
@@ -0,0 +1,99 @@
+from interactive_prompt_test import run_sweep
+from token_budget import (
+    MODEL_PROMPT_BUDGETS,
+    TokenStats,
+    count_tokens,
+    model_budget,
+    prepare_template,
+    render_within_budget,
+)
+
+TEMPLATE = (
+    "You are a support triage assistant. Classify the ticket.\n\n"
+    "Example 1:\nTicket: refund please\nLabel: billing\n\n"
+    "Example 2:\nTicket: app crashes on login\nLabel: bug\n\n"
+    "Example 3:\nTicket: how do I export data\nLabel: how-to\n\n"
+    "Ticket: {{user_input}}\nLabel:"
+)
+USER_INPUT = "I was charged twice this month"
+
+
+def _fixed_tokens() -> int:
+    return prepare_template(TEMPLATE).static_tokens + count_tokens(USER_INPUT)
+
+
+def test_template_splits_into_static_examples_and_input() -> None:
+    kinds = [segment.kind for segment in prepare_template(TEMPLATE).segments]
+
+    assert kinds == ["static", "example", "example", "example", "static", "input", "static"]
+
+
+def test_everything_fits_under_a_generous_budget() -> None:
+    render = render_within_budget(TEMPLATE, USER_INPUT, budget=10_000)
+
+    assert render.prompt == TEMPLATE.replace("{{user_input}}", USER_INPUT)
+    assert (render.examples_kept, render.examples_dropped) == (3, 0)
+    assert render.tokens == _fixed_tokens() + sum(prepare_template(TEMPLATE).example_tokens)
+    assert not render.over_budget
+
+
+def test_trimming_drops_the_last_example_first() -> None:
+    examples = prepare_template(TEMPLATE).example_tokens
+    budget = _fixed_tokens() + examples[0] + examples[1]
+
+    render = render_within_budget(TEMPLATE, USER_INPUT, budget)
+
+    assert (render.examples_kept, render.examples_dropped) == (2, 1)
+    assert "Example 1:" in render.prompt and "Example 2:" in render.prompt
+    assert "Example 3:" not in render.prompt
+    assert render.prompt.startswith("You are a support triage assistant.")
+    assert render.prompt.endswith(f"Ticket: {USER_INPUT}\nLabel:")
+    assert render.tokens <= budget
+
+
+def test_one_token_short_drops_one_more_example() -> None:
+    examples = prepare_template(TEMPLATE).example_tokens
+    budget = _fixed_tokens() + examples[0] + examples[1] - 1
+
+    render = render_within_budget(TEMPLATE, USER_INPUT, budget)
+
+    assert render.examples_kept == 1
+    assert "Example 2:" not in render.prompt
+
+
+def test_over_budget_system_prompt_is_reported() -> None:
+    budget = prepare_template(TEMPLATE).static_tokens - 1
+
+    render = render_within_budget(TEMPLATE, USER_INPUT, budget)
+
+    assert render.over_budget
+    assert render.examples_kept == 0
+    assert render.tokens == _fixed_tokens()
+    assert "You are a support triage assistant." in render.prompt
+
+
+def test_over_budget_prompt_is_not_sent(tmp_path) -> None:
+    template_path = tmp_path / "triage.md"
+    template_path.write_text(TEMPLATE, encoding="utf-8")
+    token_stats = TokenStats()
+
+    results, stats = run_sweep(
+        template_path,
+        [USER_INPUT],
+        ["glm"],
+        cache=None,
+        params={},
+        token_stats=token_stats,
+        max_prompt_tokens=5,
+    )
+
+    assert stats.calls == 0
+    assert "budget is 5" in results[0]["response"]["error"]
+    assert token_stats.over_budget == 1
+    assert "1 over budget" in token_stats.summary()
+
+
+def test_known_and_unknown_model_budgets() -> None:
+    assert model_budget("opus-4.6") == MODEL_PROMPT_BUDGETS["opus-4.6"]
+    assert model_budget("unknown-model") == min(MODEL_PROMPT_BUDGETS.values())
+    assert model_budget("unknown-model", override=2_000) == 2_000
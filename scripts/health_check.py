@@ -6,22 +6,39 @@ Implements BDD health-check scenarios from prompts/openclaw-health-check.md
 Runs as a scheduled cron job via GitHub Actions.
 """
 
+import argparse
+import gzip
 import json
 import re
 import sys
+import threading
+import time
 import uuid
+import xml.etree.ElementTree as ET
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Optional
+from urllib.parse import urljoin, urlparse
 
 try:
     import requests
     from bs4 import BeautifulSoup
+    from urllib3.exceptions import ProtocolError, ReadTimeoutError
 except ImportError:
     print("ERROR: Missing dependencies. Run: pip install requests beautifulsoup4")
     sys.exit(1)
 
+try:
+    import brotli  # Optional: lets the audit request and parse br responses
+except ImportError:
+    brotli = None
+
+from site_source_check import PAGES_WITHOUT_JA_PARITY
+
 
 class Severity(Enum):
     CRITICAL = "CRITICAL"
@@ -47,6 +64,8 @@ class HealthCheckResult:
     failures: list[Failure] = field(default_factory=list)
     failures_fixed: int = 0
     failures_deferred: int = 0
+    performance: list["PageMetrics"] = field(default_factory=list)
+    images: list["ResourceMetrics"] = field(default_factory=list)
 
     @property
     def critical_count(self) -> int:
@@ -94,8 +113,107 @@ JAPANESE_PAGES = [
     "/ja/projects/enterprise-ai-enablement-in-insurance-reporting-incident-intelligence/",
 ]
 
-# JD Concierge Sandbox has no Japanese counterpart
-PAGES_WITHOUT_JA_PARITY = ["/projects/jd-concierge-sandbox/"]
+# URL discovery budgets
+SITEMAP_URL = f"{BASE_URL}/sitemap.xml"
+MAX_CRAWL_DEPTH = 3
+MAX_CRAWL_PAGES = 150
+FETCH_WORKERS = 8
+PAGE_EXTENSIONS = ("", ".html", ".htm")
+
+
+class PageCache:
+    """One measured GET per page per run, shared by discovery and Features 1, 2, 3 and 9."""
+
+    def __init__(self):
+        self._entries: dict[str, tuple["ResourceMetrics", bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> tuple["ResourceMetrics", bytes]:
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is None:
+            entry = measure_resource(f"{BASE_URL}{path}")
+            with self._lock:
+                entry = self._entries.setdefault(path, entry)
+        return entry
+
+
+@dataclass
+class SiteInventory:
+    """Pages to check, plus the internal link graph when it was crawled."""
+    english: list[str]
+    japanese: list[str]
+    links: dict[str, set[str]] = field(default_factory=dict)
+    source: str = "static"
+    pages: PageCache = field(default_factory=PageCache)
+
+    @property
+    def all_pages(self) -> list[str]:
+        return self.english + self.japanese
+
+
+# Performance budgets (override with --budgets budgets.json)
+@dataclass
+class PerformanceBudget:
+    max_ttfb_ms: float = 800.0
+    max_page_bytes: int = 1_500_000
+    max_subresources: int = 40
+    max_image_bytes: int = 300_000
+    min_compress_bytes: int = 1024
+
+    @classmethod
+    def from_file(cls, path: str) -> "PerformanceBudget":
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f)
+        unknown = set(overrides) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"Unknown budget keys in {path}: {', '.join(sorted(unknown))}")
+        return cls(**overrides)
+
+
+COMPRESSIBLE_TYPES = ("text/html", "text/css", "javascript", "json", "image/svg+xml", "text/plain")
+ACCEPT_ENCODING = "br, gzip" if brotli else "gzip"
+# Raw reads bypass requests' exception wrapping, and bodies are decoded locally.
+# gzip.BadGzipFile is an OSError; truncated gzip streams raise EOFError.
+MEASURE_ERRORS = (
+    requests.RequestException, ReadTimeoutError, ProtocolError, OSError, EOFError, zlib.error,
+) + ((brotli.error,) if brotli else ())
+
+
+@dataclass
+class ResourceMetrics:
+    """One fetched response, measured on the wire (compressed bytes)."""
+    url: str
+    status: Optional[int] = None
+    ttfb_ms: float = 0.0
+    transfer_bytes: int = 0
+    content_type: str = ""
+    content_encoding: str = ""
+    cache_control: str = ""
+    etag: str = ""
+    error: str = ""
+
+    @property
+    def compressible(self) -> bool:
+        return any(kind in self.content_type for kind in COMPRESSIBLE_TYPES)
+
+    @property
+    def compressed(self) -> bool:
+        return self.content_encoding in ("gzip", "br")
+
+
+@dataclass
+class PageMetrics:
+    path: str
+    ttfb_ms: float
+    html_bytes: int
+    transfer_bytes: int
+    subresources: int
+    compressed: bool
+
+
+def static_inventory() -> SiteInventory:
+    return SiteInventory(english=list(ENGLISH_PAGES), japanese=list(JAPANESE_PAGES))
 
 
 def log(msg: str, level: str = "INFO"):
@@ -104,65 +222,192 @@ def log(msg: str, level: str = "INFO"):
     print(f"[{timestamp}] [{level}] {msg}")
 
 
-def check_url(url: str, result: HealthCheckResult, feature: str) -> bool:
-    """Check if a URL returns HTTP 200."""
+def check_url(url: str, result: HealthCheckResult, feature: str, pages: Optional[PageCache] = None) -> bool:
+    """Check if a URL returns HTTP 200 (site paths are served from ``pages`` when given)."""
     full_url = f"{BASE_URL}{url}" if url.startswith("/") else url
-    try:
-        response = requests.get(full_url, timeout=30)
-        if response.status_code != 200:
-            result.add_failure(Failure(
-                feature=feature,
-                url=full_url,
-                expected="HTTP 200",
-                actual=f"HTTP {response.status_code}",
-                severity=Severity.CRITICAL,
-                root_cause="Page not reachable or server error"
-            ))
-            return False
-        if not response.content:
-            result.add_failure(Failure(
-                feature=feature,
-                url=full_url,
-                expected="Non-empty body",
-                actual="Empty body",
-                severity=Severity.CRITICAL,
-                root_cause="Page returns empty content"
-            ))
-            return False
-        return True
-    except requests.RequestException as e:
+    if pages is not None and url.startswith("/"):
+        metrics, _ = pages.get(url)
+        status, empty, error = metrics.status, metrics.transfer_bytes == 0, metrics.error
+    else:
+        try:
+            response = requests.get(full_url, timeout=30)
+            status, empty, error = response.status_code, not response.content, ""
+        except requests.RequestException as e:
+            status, empty, error = None, True, str(e)
+
+    if error:
         result.add_failure(Failure(
             feature=feature,
             url=full_url,
             expected="HTTP 200",
-            actual=f"Request failed: {e}",
+            actual=f"Request failed: {error}",
             severity=Severity.CRITICAL,
-            root_cause="Network or DNS error"
+            root_cause="Network or DNS error" if status is None else "Response body could not be read or decoded"
         ))
         return False
+    if status != 200:
+        result.add_failure(Failure(
+            feature=feature,
+            url=full_url,
+            expected="HTTP 200",
+            actual=f"HTTP {status}",
+            severity=Severity.CRITICAL,
+            root_cause="Page not reachable or server error"
+        ))
+        return False
+    if empty:
+        result.add_failure(Failure(
+            feature=feature,
+            url=full_url,
+            expected="Non-empty body",
+            actual="Empty body",
+            severity=Severity.CRITICAL,
+            root_cause="Page returns empty content"
+        ))
+        return False
+    return True
+
+
+def internal_path(href: str, page_url: str) -> Optional[str]:
+    """Resolve href against page_url; return its path if it stays on BASE_URL."""
+    if not href or href.startswith(("mailto:", "tel:", "javascript:", "data:", "#")):
+        return None
+    absolute = urljoin(page_url, href)
+    parsed = urlparse(absolute)
+    if parsed.scheme not in ("http", "https") or parsed.netloc != urlparse(BASE_URL).netloc:
+        return None
+    return parsed.path or "/"
+
+
+def is_page_path(path: str) -> bool:
+    """Crawlable HTML page (not an asset or API endpoint)."""
+    if path.startswith(("/assets/", "/api/")):
+        return False
+    last = path.rsplit("/", 1)[-1]
+    return "." not in last or last.endswith(PAGE_EXTENSIONS[1:])
+
+
+def discover_from_sitemap(max_pages: int = MAX_CRAWL_PAGES) -> list[str]:
+    """Page paths listed in sitemap.xml (follows one level of sitemap index)."""
+    ns = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+    pending, pages, seen = [SITEMAP_URL], [], set()
+    while pending and len(pages) < max_pages:
+        url = pending.pop(0)
+        try:
+            response = requests.get(url, timeout=30)
+            if response.status_code != 200:
+                continue
+            root = ET.fromstring(response.content)
+        except (requests.RequestException, ET.ParseError):
+            continue
+        for loc in root.iter(f"{ns}loc"):
+            target = (loc.text or "").strip()
+            if root.tag == f"{ns}sitemapindex":
+                if url == SITEMAP_URL:
+                    pending.append(target)
+                continue
+            path = internal_path(target, BASE_URL)
+            if path and is_page_path(path) and path not in seen:
+                seen.add(path)
+                pages.append(path)
+    return pages[:max_pages]
+
+
+def fetch_links(path: str, pages: PageCache) -> tuple[str, Optional[set[str]]]:
+    """Fetch one page (through the shared cache) and return every internal href/src it references."""
+    full_url = f"{BASE_URL}{path}"
+    metrics, html = pages.get(path)
+    if metrics.error or metrics.status != 200 or "html" not in metrics.content_type:
+        return path, None
+    soup = BeautifulSoup(html, 'html.parser')
+    targets = set()
+    for tag, attr in (("a", "href"), ("link", "href"), ("script", "src"), ("img", "src")):
+        for element in soup.find_all(tag, **{attr: True}):
+            target = internal_path(element.get(attr), full_url)
+            if target:
+                targets.add(target)
+    return path, targets
+
+
+def crawl_site(
+    seeds: list[str],
+    max_depth: int = MAX_CRAWL_DEPTH,
+    max_pages: int = MAX_CRAWL_PAGES,
+    workers: int = FETCH_WORKERS,
+    pages: Optional[PageCache] = None,
+) -> dict[str, set[str]]:
+    """Breadth-first crawl of internal pages; returns the page -> targets link graph."""
+    pages = pages or PageCache()
+    seen = set()
+    frontier = []
+    for seed in seeds:
+        if seed not in seen:
+            seen.add(seed)
+            frontier.append(seed)
+    frontier = frontier[:max_pages]
+    graph: dict[str, set[str]] = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for depth in range(max_depth + 1):
+            if not frontier:
+                break
+            next_frontier = []
+            for path, targets in pool.map(lambda path: fetch_links(path, pages), frontier):
+                if targets is None:
+                    continue
+                graph[path] = targets
+                if depth == max_depth:
+                    continue
+                for target in sorted(targets):
+                    if is_page_path(target) and target not in seen and len(seen) < max_pages:
+                        seen.add(target)
+                        next_frontier.append(target)
+            frontier = next_frontier
+    return graph
+
+
+def discover_pages(max_depth: int = MAX_CRAWL_DEPTH, max_pages: int = MAX_CRAWL_PAGES) -> SiteInventory:
+    """Sitemap first, breadth-first crawl as fallback; hand-maintained lists are always seeds."""
+    static = static_inventory()
+    sitemap_pages = discover_from_sitemap(max_pages)
+    if sitemap_pages:
+        # Sitemap is authoritative: fetch listed pages once for links, no expansion.
+        graph = crawl_site(static.all_pages + sitemap_pages, max_depth=0, max_pages=max_pages, pages=static.pages)
+        source = "sitemap"
+    else:
+        graph = crawl_site(static.all_pages, max_depth=max_depth, max_pages=max_pages, pages=static.pages)
+        source = "crawl"
 
+    discovered = list(dict.fromkeys(static.all_pages + sitemap_pages + sorted(graph)))
+    japanese = [p for p in discovered if p == "/ja/" or p.startswith("/ja/")]
+    english = [p for p in discovered if p not in japanese]
+    log(f"Discovered {len(discovered)} pages via {source} ({len(english)} EN, {len(japanese)} JA)")
+    return SiteInventory(english=english, japanese=japanese, links=graph, source=source, pages=static.pages)
 
-def feature_1_page_availability(result: HealthCheckResult):
+
+def feature_1_page_availability(result: HealthCheckResult, inventory: Optional[SiteInventory] = None):
     """Feature 1: All pages are reachable."""
     log("Running Feature 1: Page Availability")
-    all_pages = ENGLISH_PAGES + JAPANESE_PAGES
+    inventory = inventory or static_inventory()
+    all_pages = inventory.all_pages
     result.pages_checked = len(all_pages)
     
     for url in all_pages:
-        check_url(url, result, "Feature 1: Page Availability")
+        check_url(url, result, "Feature 1: Page Availability", inventory.pages)
 
 
-def feature_2_bilingual_parity(result: HealthCheckResult):
+def feature_2_bilingual_parity(result: HealthCheckResult, inventory: Optional[SiteInventory] = None):
     """Feature 2: EN/JA Page Parity."""
     log("Running Feature 2: Bilingual Page Parity")
+    inventory = inventory or static_inventory()
     
     # Check English pages have Japanese counterparts
-    for en_url in ENGLISH_PAGES:
+    for en_url in inventory.english:
         if en_url in PAGES_WITHOUT_JA_PARITY:
             continue  # Expected to have no JA counterpart
         
         ja_url = f"/ja{en_url}"
-        if ja_url not in JAPANESE_PAGES:
+        if ja_url not in inventory.japanese:
             result.add_failure(Failure(
                 feature="Feature 2: Bilingual Parity",
                 url=en_url,
@@ -172,12 +417,12 @@ def feature_2_bilingual_parity(result: HealthCheckResult):
                 root_cause="Missing Japanese translation"
             ))
         else:
-            check_url(ja_url, result, "Feature 2: Bilingual Parity")
+            check_url(ja_url, result, "Feature 2: Bilingual Parity", inventory.pages)
     
     # Check Japanese pages have English counterparts
-    for ja_url in JAPANESE_PAGES:
+    for ja_url in inventory.japanese:
         en_url = ja_url.replace("/ja", "", 1)
-        if en_url not in ENGLISH_PAGES:
+        if en_url not in inventory.english:
             result.add_failure(Failure(
                 feature="Feature 2: Bilingual Parity",
                 url=ja_url,
@@ -188,70 +433,65 @@ def feature_2_bilingual_parity(result: HealthCheckResult):
             ))
 
 
-def feature_3_navigation_consistency(result: HealthCheckResult):
+def feature_3_navigation_consistency(result: HealthCheckResult, inventory: Optional[SiteInventory] = None):
     """Feature 3: Consistent header and footer on all pages."""
     log("Running Feature 3: Navigation Consistency")
-    all_pages = ENGLISH_PAGES + JAPANESE_PAGES
+    inventory = inventory or static_inventory()
     
-    for url in all_pages:
+    for url in inventory.all_pages:
         full_url = f"{BASE_URL}{url}"
-        try:
-            response = requests.get(full_url, timeout=30)
-            if response.status_code != 200:
-                continue  # Already logged in Feature 1
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Check for nav/header
-            nav = soup.find('nav') or soup.find('header')
-            if not nav:
-                result.add_failure(Failure(
-                    feature="Feature 3: Navigation",
-                    url=full_url,
-                    expected="<nav> or <header> element",
-                    actual="No navigation element found",
-                    severity=Severity.WARNING,
-                    root_cause="Missing navigation structure"
-                ))
-            
-            # Check for site title link
-            home_link = soup.find('a', href='/') or soup.find('a', href='/ja/')
-            if not home_link:
-                result.add_failure(Failure(
-                    feature="Feature 3: Navigation",
-                    url=full_url,
-                    expected="Site title link to / or /ja/",
-                    actual="No home link found",
-                    severity=Severity.WARNING,
-                    root_cause="Missing site title link"
-                ))
-            
-            # Check for language toggle
-            lang_toggle = soup.find('a', href=re.compile(r'/ja/')) or soup.find('a', href=re.compile(r'^/(?!.*/ja/)'))
-            if not lang_toggle:
-                result.add_failure(Failure(
-                    feature="Feature 3: Navigation",
-                    url=full_url,
-                    expected="Language toggle link",
-                    actual="No language toggle found",
-                    severity=Severity.WARNING,
-                    root_cause="Missing language switcher"
-                ))
-            
-            # Check for footer
-            footer = soup.find('footer')
-            if not footer:
-                result.add_failure(Failure(
-                    feature="Feature 3: Navigation",
-                    url=full_url,
-                    expected="<footer> element",
-                    actual="No footer found",
-                    severity=Severity.WARNING,
-                    root_cause="Missing footer"
-                ))
-                
-        except requests.RequestException:
-            continue  # Already logged
+        metrics, html = inventory.pages.get(url)
+        if metrics.error or metrics.status != 200:
+            continue  # Already logged in Feature 1
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Check for nav/header
+        nav = soup.find('nav') or soup.find('header')
+        if not nav:
+            result.add_failure(Failure(
+                feature="Feature 3: Navigation",
+                url=full_url,
+                expected="<nav> or <header> element",
+                actual="No navigation element found",
+                severity=Severity.WARNING,
+                root_cause="Missing navigation structure"
+            ))
+        
+        # Check for site title link
+        home_link = soup.find('a', href='/') or soup.find('a', href='/ja/')
+        if not home_link:
+            result.add_failure(Failure(
+                feature="Feature 3: Navigation",
+                url=full_url,
+                expected="Site title link to / or /ja/",
+                actual="No home link found",
+                severity=Severity.WARNING,
+                root_cause="Missing site title link"
+            ))
+        
+        # Check for language toggle
+        lang_toggle = soup.find('a', href=re.compile(r'/ja/')) or soup.find('a', href=re.compile(r'^/(?!.*/ja/)'))
+        if not lang_toggle:
+            result.add_failure(Failure(
+                feature="Feature 3: Navigation",
+                url=full_url,
+                expected="Language toggle link",
+                actual="No language toggle found",
+                severity=Severity.WARNING,
+                root_cause="Missing language switcher"
+            ))
+        
+        # Check for footer
+        footer = soup.find('footer')
+        if not footer:
+            result.add_failure(Failure(
+                feature="Feature 3: Navigation",
+                url=full_url,
+                expected="<footer> element",
+                actual="No footer found",
+                severity=Severity.WARNING,
+                root_cause="Missing footer"
+            ))
 
 
 def feature_4_jd_widget_render(result: HealthCheckResult):
@@ -657,6 +897,166 @@ def feature_7_asset_integrity(result: HealthCheckResult):
         pass
 
 
+def measure_resource(url: str) -> tuple[ResourceMetrics, bytes]:
+    """GET url and measure TTFB and compressed transfer size; also return the decoded body."""
+    metrics = ResourceMetrics(url=url)
+    started = time.perf_counter()
+    try:
+        with requests.get(url, timeout=30, stream=True, headers={"Accept-Encoding": ACCEPT_ENCODING}) as response:
+            metrics.ttfb_ms = (time.perf_counter() - started) * 1000
+            metrics.status = response.status_code
+            metrics.content_type = response.headers.get("Content-Type", "")
+            metrics.content_encoding = response.headers.get("Content-Encoding", "").lower()
+            metrics.cache_control = response.headers.get("Cache-Control", "")
+            metrics.etag = response.headers.get("ETag", "")
+            wire = response.raw.read(decode_content=False)
+            metrics.transfer_bytes = len(wire)
+            body = b""
+            if "html" in metrics.content_type:
+                # Re-decode locally so HTML can be parsed for subresources.
+                body = decode_body(wire, metrics.content_encoding)
+            return metrics, body
+    except MEASURE_ERRORS as e:
+        metrics.error = f"{type(e).__name__}: {e}"
+        return metrics, b""
+
+
+def decode_body(wire: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(wire)
+    if encoding == "br":
+        return brotli.decompress(wire) if brotli else b""
+    return wire
+
+
+def page_subresources(html: bytes, page_url: str) -> list[str]:
+    """Absolute URLs of stylesheets, scripts, images and other linked subresources."""
+    soup = BeautifulSoup(html, 'html.parser')
+    urls = []
+    for tag, attr in (("link", "href"), ("script", "src"), ("img", "src"), ("source", "src"), ("video", "poster")):
+        for element in soup.find_all(tag, **{attr: True}):
+            if tag == "link" and not {"stylesheet", "icon", "preload", "modulepreload"} & set(element.get("rel") or []):
+                continue
+            value = element.get(attr)
+            if value and not value.startswith("data:"):
+                urls.append(urljoin(page_url, value))
+    return list(dict.fromkeys(urls))
+
+
+def feature_9_performance_budget(
+    result: HealthCheckResult,
+    inventory: Optional[SiteInventory] = None,
+    budget: Optional[PerformanceBudget] = None,
+):
+    """Feature 9: Page weight, TTFB, compression and asset caching stay within budget."""
+    log("Running Feature 9: Performance Budget")
+    inventory = inventory or static_inventory()
+    budget = budget or PerformanceBudget()
+    feature = "Feature 9: Performance"
+
+    def flag(url: str, expected: str, actual: str, root_cause: str, severity: Severity = Severity.WARNING):
+        result.add_failure(Failure(feature, url, expected, actual, severity, root_cause))
+
+    # Pages come from the shared cache, so each is fetched once per run. Uncached pages are
+    # fetched one at a time; pages fetched during discovery ran FETCH_WORKERS-wide, which
+    # can add client-side queueing to their TTFB.
+    pages = []
+    for path in inventory.all_pages:
+        metrics, html = inventory.pages.get(path)
+        if metrics.error:
+            flag(metrics.url, "Complete, decodable response", metrics.error, "Transfer failed while measuring")
+        elif metrics.status == 200:
+            pages.append((path, metrics, page_subresources(html, metrics.url) if html else []))
+
+    # Shared subresources (CSS, JS, logos) are fetched once per run, concurrently.
+    unique = sorted({url for _, _, urls in pages for url in urls})
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        assets = {metrics.url: metrics for metrics, _ in pool.map(measure_resource, unique)}
+
+    for path, page, urls in pages:
+        transfer = page.transfer_bytes + sum(assets[url].transfer_bytes for url in urls)
+        result.performance.append(PageMetrics(
+            path=path,
+            ttfb_ms=round(page.ttfb_ms, 1),
+            html_bytes=page.transfer_bytes,
+            transfer_bytes=transfer,
+            subresources=len(urls),
+            compressed=page.compressed,
+        ))
+        if page.ttfb_ms > budget.max_ttfb_ms:
+            flag(page.url, f"TTFB <= {budget.max_ttfb_ms:.0f} ms", f"{page.ttfb_ms:.0f} ms", "Slow server response")
+        if transfer > budget.max_page_bytes:
+            flag(page.url, f"Page weight <= {budget.max_page_bytes} bytes", f"{transfer} bytes",
+                 "Page plus subresources exceed the weight budget")
+        if len(urls) > budget.max_subresources:
+            flag(page.url, f"<= {budget.max_subresources} subresources", str(len(urls)), "Too many requests per page")
+        if not page.compressed and page.transfer_bytes >= budget.min_compress_bytes:
+            flag(page.url, "HTML served with gzip or br", page.content_encoding or "identity", "Compression disabled")
+
+    for url, asset in assets.items():
+        if asset.error:
+            flag(url, "Complete, decodable response", asset.error, "Transfer failed while measuring")
+            continue
+        if asset.status != 200:
+            continue  # Availability is Feature 7/8's job
+        if asset.content_type.startswith("image/"):
+            result.images.append(asset)
+        if asset.compressible and not asset.compressed and asset.transfer_bytes >= budget.min_compress_bytes:
+            flag(url, "Served with gzip or br", asset.content_encoding or "identity", "Compression disabled for text asset")
+        if asset.content_type.startswith("image/") and asset.transfer_bytes > budget.max_image_bytes:
+            flag(url, f"Image <= {budget.max_image_bytes} bytes", f"{asset.transfer_bytes} bytes", "Oversized image")
+        if urlparse(url).netloc == urlparse(BASE_URL).netloc and urlparse(url).path.startswith("/assets/"):
+            if "max-age" not in asset.cache_control and not asset.etag:
+                flag(url, "Cache-Control max-age or ETag", "Neither header present", "Asset cannot be cached or revalidated")
+            elif not asset.etag:
+                flag(url, "ETag header", f"Cache-Control: {asset.cache_control}", "No validator for revalidation",
+                     severity=Severity.INFO)
+
+    log(f"Measured {len(pages)} pages and {len(assets)} unique subresources")
+
+
+def check_link_target(path: str) -> tuple[str, Optional[int], str]:
+    """HEAD a link target (GET if HEAD is not allowed); return (path, status, error)."""
+    full_url = f"{BASE_URL}{path}"
+    try:
+        response = requests.head(full_url, timeout=10, allow_redirects=True)
+        if response.status_code in (405, 501):
+            response = requests.get(full_url, timeout=10)
+        return path, response.status_code, ""
+    except requests.RequestException as e:
+        return path, None, str(e)
+
+
+def feature_8_link_graph(result: HealthCheckResult, inventory: SiteInventory):
+    """Feature 8: No broken internal links; each unique target is validated once."""
+    log("Running Feature 8: Internal Link Graph")
+    if not inventory.links:
+        log("No link graph available (discovery disabled); skipping", level="WARN")
+        return
+
+    referrers = defaultdict(list)
+    for page, targets in inventory.links.items():
+        for target in targets:
+            referrers[target].append(page)
+    # Crawled pages already returned 200; only validate the rest.
+    unchecked = sorted(t for t in referrers if t not in inventory.links)
+    log(f"Validating {len(unchecked)} unique link targets from {len(inventory.links)} pages")
+
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        for path, status, error in pool.map(check_link_target, unchecked):
+            if status is not None and status < 400:
+                continue
+            pages = sorted(referrers[path])
+            result.add_failure(Failure(
+                feature="Feature 8: Link Graph",
+                url=f"{BASE_URL}{path}",
+                expected="Link target reachable (HTTP < 400)",
+                actual=f"HTTP {status}" if status is not None else f"Request failed: {error}",
+                severity=Severity.WARNING,
+                root_cause=f"Broken link on {', '.join(pages[:3])}" + (" ..." if len(pages) > 3 else "")
+            ))
+
+
 def generate_report(result: HealthCheckResult) -> str:
     """Generate the improvement report."""
     report = f"""## kinokoholic.com Health Check — {result.timestamp}
@@ -679,10 +1079,26 @@ def generate_report(result: HealthCheckResult) -> str:
             report += f"| {i} | {failure.severity.value} | {failure.feature} | {failure.url} | {failure.expected} | {failure.actual} | {failure.root_cause} |\n"
         
         report += "\n"
+
+    if result.performance:
+        report += "### Performance\n\n"
+        report += "| Page | TTFB (ms) | HTML (bytes) | Total transfer (bytes) | Subresources | HTML compressed |\n"
+        report += "|------|-----------|--------------|------------------------|--------------|-----------------|\n"
+        for page in result.performance:
+            report += f"| {page.path} | {page.ttfb_ms} | {page.html_bytes} | {page.transfer_bytes} | {page.subresources} | {'yes' if page.compressed else 'no'} |\n"
+        report += "\n"
+
+    if result.images:
+        report += "### Images\n\n"
+        report += "| Image | Type | Transfer (bytes) |\n"
+        report += "|-------|------|------------------|\n"
+        for image in sorted(result.images, key=lambda i: i.transfer_bytes, reverse=True):
+            report += f"| {image.url} | {image.content_type.split(';')[0]} | {image.transfer_bytes} |\n"
+        report += "\n"
     
     report += """### Suggested Improvements for Next Cycle
 - Add automated screenshot comparison tests
-- Add Lighthouse performance/SEO/accessibility checks
+- Add Lighthouse SEO/accessibility checks
 - Expand API calibration test cases
 - Add Japanese JD Concierge sandbox page for parity
 - Monitor Worker CPU/memory usage
@@ -698,8 +1114,23 @@ def generate_report(result: HealthCheckResult) -> str:
     return report
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="kinokoholic.com health check")
+    parser.add_argument(
+        "--no-discover",
+        action="store_true",
+        help="Only check the hand-maintained page lists (no sitemap/crawl, no link graph)",
+    )
+    parser.add_argument("--max-depth", type=int, default=MAX_CRAWL_DEPTH, help="Crawl depth budget")
+    parser.add_argument("--max-pages", type=int, default=MAX_CRAWL_PAGES, help="Crawl page budget")
+    parser.add_argument("--budgets", help="JSON file overriding PerformanceBudget fields")
+    return parser.parse_args()
+
+
 def main():
     """Run all health checks."""
+    args = parse_args()
+    budget = PerformanceBudget.from_file(args.budgets) if args.budgets else PerformanceBudget()
     result = HealthCheckResult(
         timestamp=datetime.now().strftime("%Y-%m-%d")
     )
@@ -708,13 +1139,20 @@ def main():
     log("kinokoholic.com Health Check Starting")
     log("=" * 60)
     
-    feature_1_page_availability(result)
-    feature_2_bilingual_parity(result)
-    feature_3_navigation_consistency(result)
+    if args.no_discover:
+        inventory = static_inventory()
+    else:
+        inventory = discover_pages(max_depth=args.max_depth, max_pages=args.max_pages)
+
+    feature_1_page_availability(result, inventory)
+    feature_2_bilingual_parity(result, inventory)
+    feature_3_navigation_consistency(result, inventory)
     feature_4_jd_widget_render(result)
     feature_5_api_functional_test(result)
     feature_6_rate_limiting(result)
     feature_7_asset_integrity(result)
+    feature_8_link_graph(result, inventory)
+    feature_9_performance_budget(result, inventory, budget)
     
     log("=" * 60)
     log("Health Check Complete")
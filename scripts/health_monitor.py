@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Continuous monitor for kinokoholic.com
+
+Long-running companion to health_check.py. Probes the site pages and the
+JD Analyzer API on a jittered schedule, keeps fixed-bucket latency
+histograms in per-minute ring buffers, and serves availability/latency SLO
+burn rates over sliding windows on a local metrics endpoint.
+
+Memory is bounded by construction: every series is a fixed ring of minute
+slots covering the longest window, and each slot is a fixed bucket array.
+
+Usage:
+    python3 scripts/health_monitor.py                       # metrics on 127.0.0.1:9108
+    python3 scripts/health_monitor.py --port 9200 --page-interval 120
+    curl -s localhost:9108/metrics                          # Prometheus text format
+    curl -s localhost:9108/slo                              # JSON burn rates
+"""
+
+import argparse
+import heapq
+import json
+import random
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from health_check import API_AUTH, API_URL, BASE_URL, ENGLISH_PAGES, JAPANESE_PAGES, log, requests
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is +Inf)
+BUCKET_BOUNDS_MS = (25, 50, 100, 200, 400, 800, 1600, 3200, 6400, 12800, 25600)
+SLOT_SECONDS = 60
+
+# (name, long window, short window, burn-rate threshold): multiwindow alerts
+# from the SRE workbook. Both windows must exceed the threshold to fire.
+BURN_ALERTS = (
+    ("fast", 3600, 300, 14.4),
+    ("slow", 6 * 3600, 1800, 6.0),
+)
+WINDOWS = sorted({seconds for _, long_w, short_w, _ in BURN_ALERTS for seconds in (long_w, short_w)})
+
+# The API allows 5 requests/hour per IP and the weekly health check spends 2.
+API_MIN_INTERVAL = 1200
+
+
+@dataclass
+class Objective:
+    availability: float  # Fraction of probes that must succeed
+    latency_ms: float  # Threshold for a "fast" probe; should be a bucket bound
+    latency_target: float  # Fraction of successful probes that must be fast
+
+
+OBJECTIVES = {
+    "page": Objective(availability=0.995, latency_ms=800, latency_target=0.95),
+    "api": Objective(availability=0.99, latency_ms=12800, latency_target=0.90),
+}
+
+
+def bucket_index(latency_ms: float) -> int:
+    for i, bound in enumerate(BUCKET_BOUNDS_MS):
+        if latency_ms <= bound:
+            return i
+    return len(BUCKET_BOUNDS_MS)
+
+
+class SlidingSeries:
+    """Per-minute ring of (probes, failures, latency buckets); fixed size forever."""
+
+    def __init__(self, horizon_seconds: int, clock: Callable[[], float] = time.time):
+        self.slots = horizon_seconds // SLOT_SECONDS + 1
+        self.clock = clock
+        self.slot_ids = [-1] * self.slots
+        self.totals = [0] * self.slots
+        self.failures = [0] * self.slots
+        self.buckets = [[0] * (len(BUCKET_BOUNDS_MS) + 1) for _ in range(self.slots)]
+        # Lifetime counters for the Prometheus histogram (monotonic, fixed size).
+        self.lifetime_buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.lifetime_total = 0
+        self.lifetime_failures = 0
+        self.lifetime_sum_ms = 0.0
+
+    def _slot(self, slot_id: int) -> int:
+        i = slot_id % self.slots
+        if self.slot_ids[i] != slot_id:
+            # Reuse the stale slot in place instead of allocating a new one.
+            self.slot_ids[i] = slot_id
+            self.totals[i] = self.failures[i] = 0
+            bucket = self.buckets[i]
+            for b in range(len(bucket)):
+                bucket[b] = 0
+        return i
+
+    def record(self, ok: bool, latency_ms: float):
+        i = self._slot(int(self.clock() // SLOT_SECONDS))
+        self.totals[i] += 1
+        self.lifetime_total += 1
+        if not ok:
+            self.failures[i] += 1
+            self.lifetime_failures += 1
+            return
+        b = bucket_index(latency_ms)
+        self.buckets[i][b] += 1
+        self.lifetime_buckets[b] += 1
+        self.lifetime_sum_ms += latency_ms
+
+    def window(self, seconds: int) -> tuple:
+        """(probes, failures, latency bucket counts) over the trailing window."""
+        current = int(self.clock() // SLOT_SECONDS)
+        oldest = current - seconds // SLOT_SECONDS + 1
+        total = failures = 0
+        buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        for i, slot_id in enumerate(self.slot_ids):
+            if oldest <= slot_id <= current:
+                total += self.totals[i]
+                failures += self.failures[i]
+                for b, count in enumerate(self.buckets[i]):
+                    buckets[b] += count
+        return total, failures, buckets
+
+
+def quantile_ms(buckets: list, q: float) -> Optional[float]:
+    """Upper bucket bound containing quantile q (None if empty or in +Inf)."""
+    total = sum(buckets)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(buckets):
+        seen += count
+        if seen >= rank:
+            return float(BUCKET_BOUNDS_MS[i]) if i < len(BUCKET_BOUNDS_MS) else None
+    return None
+
+
+def burn_rates(series: SlidingSeries, objective: Objective) -> dict:
+    """Availability and latency burn rate per window (1.0 = spending budget exactly on pace)."""
+    fast_buckets = bucket_index(objective.latency_ms) + 1
+    rates = {}
+    for seconds in WINDOWS:
+        total, failures, buckets = series.window(seconds)
+        succeeded = total - failures
+        slow = sum(buckets[fast_buckets:])
+        rates[seconds] = {
+            "probes": total,
+            "availability_burn": (failures / total) / (1 - objective.availability) if total else 0.0,
+            "latency_burn": (slow / succeeded) / (1 - objective.latency_target) if succeeded else 0.0,
+            "p50_ms": quantile_ms(buckets, 0.50),
+            "p95_ms": quantile_ms(buckets, 0.95),
+        }
+    return rates
+
+
+class Monitor:
+    """Holds one SlidingSeries per probe kind and renders metrics under a lock."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.lock = threading.Lock()
+        self.series = {kind: SlidingSeries(max(WINDOWS), clock) for kind in OBJECTIVES}
+        self.last_status: dict = {}  # target -> bool, bounded by the fixed target list
+
+    def record(self, kind: str, target: str, ok: bool, latency_ms: float, detail: str = ""):
+        with self.lock:
+            self.series[kind].record(ok, latency_ms)
+            changed = self.last_status.get(target) is not ok
+            self.last_status[target] = ok
+        if changed:
+            # Log transitions only, so logs stay flat during long outages or long uptimes.
+            log(f"{target} {'UP' if ok else 'DOWN'} {detail}".rstrip(), level="INFO" if ok else "ERROR")
+
+    def slo(self) -> dict:
+        with self.lock:
+            report = {}
+            for kind, objective in OBJECTIVES.items():
+                rates = burn_rates(self.series[kind], objective)
+                alerts = {}
+                for name, long_w, short_w, threshold in BURN_ALERTS:
+                    alerts[name] = {
+                        sli: rates[long_w][f"{sli}_burn"] > threshold and rates[short_w][f"{sli}_burn"] > threshold
+                        for sli in ("availability", "latency")
+                    }
+                report[kind] = {
+                    "objective": objective.__dict__,
+                    "windows": {f"{seconds}s": values for seconds, values in rates.items()},
+                    "alerts": alerts,
+                }
+            return report
+
+    def prometheus(self) -> str:
+        lines = []
+        slo = self.slo()
+        with self.lock:
+            for kind, series in self.series.items():
+                cumulative = 0
+                for bound, count in zip(BUCKET_BOUNDS_MS + ("+Inf",), series.lifetime_buckets):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else bound / 1000
+                    lines.append(f'kinokoholic_probe_latency_seconds_bucket{{kind="{kind}",le="{le}"}} {cumulative}')
+                lines.append(f'kinokoholic_probe_latency_seconds_sum{{kind="{kind}"}} {series.lifetime_sum_ms / 1000:.6f}')
+                lines.append(f'kinokoholic_probe_latency_seconds_count{{kind="{kind}"}} {cumulative}')
+                lines.append(f'kinokoholic_probes_total{{kind="{kind}"}} {series.lifetime_total}')
+                lines.append(f'kinokoholic_probe_failures_total{{kind="{kind}"}} {series.lifetime_failures}')
+        for kind, report in slo.items():
+            for window, values in report["windows"].items():
+                for sli in ("availability", "latency"):
+                    lines.append(
+                        f'kinokoholic_slo_burn_rate{{kind="{kind}",slo="{sli}",window="{window}"}} '
+                        f'{values[f"{sli}_burn"]:.4f}'
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def probe_page(session, path: str) -> tuple:
+    started = time.perf_counter()
+    try:
+        response = session.get(f"{BASE_URL}{path}", timeout=30)
+        return response.status_code == 200, (time.perf_counter() - started) * 1000, f"HTTP {response.status_code}"
+    except requests.RequestException as e:
+        return False, (time.perf_counter() - started) * 1000, type(e).__name__
+
+
+def probe_api(session) -> tuple:
+    payload = {"jd_text": "Senior AI Engineer: LLM applications, RAG, prompt engineering. English and Japanese."}
+    headers = {"Authorization": API_AUTH, "Content-Type": "application/json"}
+    started = time.perf_counter()
+    try:
+        response = session.post(API_URL, json=payload, headers=headers, timeout=30)
+        elapsed = (time.perf_counter() - started) * 1000
+        ok = response.status_code == 200 and "score" in response.json()
+        return ok, elapsed, f"HTTP {response.status_code}"
+    except (requests.RequestException, ValueError) as e:
+        return False, (time.perf_counter() - started) * 1000, type(e).__name__
+
+
+def jittered(interval: float, jitter: float) -> float:
+    return interval * (1 + random.uniform(-jitter, jitter))
+
+
+def run_schedule(monitor: Monitor, args: argparse.Namespace, stop: threading.Event):
+    """Min-heap of (due time, target); each target is rescheduled with fresh jitter."""
+    session = requests.Session()
+    session.headers["User-Agent"] = "Mozilla/5.0 (compatible; HealthMonitor/1.0; +https://kinokoholic.com)"
+    now = time.monotonic()
+    # Spread first probes over one interval so pages are not hit in a burst.
+    queue = [(now + random.uniform(0, args.page_interval), "page", path) for path in ENGLISH_PAGES + JAPANESE_PAGES]
+    if not args.no_api:
+        queue.append((now + random.uniform(0, args.api_interval), "api", API_URL))
+    heapq.heapify(queue)
+
+    while not stop.is_set():
+        due, kind, target = queue[0]
+        if stop.wait(max(0.0, due - time.monotonic())):
+            break
+        heapq.heappop(queue)
+        if kind == "page":
+            ok, latency_ms, detail = probe_page(session, target)
+            interval = args.page_interval
+        else:
+            ok, latency_ms, detail = probe_api(session)
+            interval = args.api_interval
+        monitor.record(kind, target, ok, latency_ms, detail)
+        heapq.heappush(queue, (time.monotonic() + jittered(interval, args.jitter), kind, target))
+    session.close()
+
+
+def make_handler(monitor: Monitor):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = monitor.prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/slo":
+                body, content_type = json.dumps(monitor.slo(), indent=2), "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every few seconds would otherwise flood the log
+
+    return MetricsHandler
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Continuous kinokoholic.com monitor with SLO burn rates")
+    parser.add_argument("--host", default="127.0.0.1", help="Metrics endpoint bind address")
+    parser.add_argument("--port", type=int, default=9108, help="Metrics endpoint port")
+    parser.add_argument("--page-interval", type=float, default=300.0, help="Seconds between probes of each page")
+    parser.add_argument("--api-interval", type=float, default=1800.0, help=f"Seconds between API probes (>= {API_MIN_INTERVAL})")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Fractional +/- jitter applied to every interval")
+    parser.add_argument("--no-api", action="store_true", help="Probe pages only")
+    args = parser.parse_args()
+    if not 0 <= args.jitter < 1:
+        parser.error("--jitter must be in [0, 1)")
+    if args.api_interval * (1 - args.jitter) < API_MIN_INTERVAL:
+        parser.error(f"--api-interval with jitter must stay >= {API_MIN_INTERVAL}s (API allows 5 requests/hour)")
+    return args
+
+
+def main():
+    args = parse_args()
+    monitor = Monitor()
+    stop = threading.Event()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(monitor))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def shutdown(signum, frame):
+        stop.set()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    log(f"Monitoring {BASE_URL}; metrics on http://{args.host}:{args.port}/metrics")
+    try:
+        run_schedule(monitor, args, stop)
+    finally:
+        server.shutdown()
+        log("Monitor stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+JD Analyzer calibration runner
+
+Scores the worker/testdata fixtures, the two inline health-check JDs and a
+generated corpus against the analyzer, compares each response with its
+expected properties, and reports aggregate calibration metrics computed with
+pandas: score distributions, risk-flag precision/recall, confidence
+agreement and a confidence Brier score. Metrics and per-case results are
+diffed against a stored baseline.
+
+The production API allows 5 requests/hour, so the default target is a local
+stand-in: `npm run dev` in worker/ (wrangler dev on port 8787).
+
+Usage:
+    python3 scripts/jd_calibration.py                         # local wrangler dev
+    python3 scripts/jd_calibration.py --generated 200 --workers 16
+    python3 scripts/jd_calibration.py --update-baseline       # accept this run
+    python3 scripts/jd_calibration.py --endpoint https://kinokoholic.com/api/analyze --allow-production
+"""
+
+import argparse
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+try:
+    import pandas as pd
+except ImportError:
+    print("ERROR: Missing dependencies. Run: pip install pandas")
+    sys.exit(1)
+
+from health_check import API_AUTH, BASE_URL, log, requests
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+TESTDATA_DIR = REPO_ROOT / "worker" / "testdata"
+DEFAULT_BASELINE = TESTDATA_DIR / "calibration_baseline.json"
+LOCAL_ENDPOINT = "http://127.0.0.1:8787/api/analyze"
+PRODUCTION_MAX_CASES = 2  # Stay well inside the 5 requests/hour limit
+
+# Mirrors STANDARD_RISK_FLAGS and the hard caps in worker/src/analysis.ts
+RISK_FLAGS = (
+    "JAPANESE_FLUENCY",
+    "ONSITE_REQUIRED",
+    "LANGUAGE_MISMATCH",
+    "CONTRACT_ONLY",
+    "LOCATION_MISMATCH",
+    "CONTRACT_AVAILABILITY",
+    "AVAILABILITY_MISMATCH",
+)
+JAPANESE_HARD_CAP = 60
+ONSITE_HARD_CAP = 70
+# calculateConfidence returns "Low" whenever a hard cap applies or the score is <= 40.
+LOW_CONFIDENCE_MAX_SCORE = 40
+SCORE_BINS = list(range(0, 101, 10))
+SCORE_DRIFT_POINTS = 5
+# Probability that a case passes, as implied by each confidence label (for the Brier score).
+CONFIDENCE_PROBABILITY = {"Low": 0.25, "Medium": 0.5, "High": 0.85}
+
+
+@dataclass
+class CalibrationCase:
+    case_id: str
+    source: str  # fixture | inline | generated
+    jd_text: str
+    min_score: int = 0
+    max_score: int = 100
+    # Flags listed in `labelled_flags` are fully labelled for this case:
+    # present in `required_flags` means expected, absent means must not fire.
+    required_flags: set = field(default_factory=set)
+    labelled_flags: set = field(default_factory=set)
+    expected_confidence: Optional[str] = None
+    forbidden_gap_terms: list = field(default_factory=list)
+
+
+# Expectations for fixtures that expected_properties.json does not describe
+FIXTURE_EXPECTATIONS = {
+    "jd_tc003_japanese_fluent": {
+        "max_score": JAPANESE_HARD_CAP,
+        "required_flags": {"JAPANESE_FLUENCY"},
+        "labelled_flags": {"JAPANESE_FLUENCY"},
+        "expected_confidence": "Low",
+    },
+    "jd_tc004_onsite_only": {
+        "max_score": ONSITE_HARD_CAP,
+        "required_flags": {"ONSITE_REQUIRED"},
+        "labelled_flags": {"ONSITE_REQUIRED"},
+        "expected_confidence": "Low",
+    },
+}
+
+# Same JDs and thresholds as feature_5_api_functional_test in health_check.py
+INLINE_CASES = (
+    CalibrationCase(
+        case_id="inline_strong_match",
+        source="inline",
+        jd_text=(
+            "We are looking for a Senior AI/ML Engineer with experience in LLM applications, RAG architectures, "
+            "and prompt engineering. The role is remote-friendly and requires English and Japanese language skills. "
+            "You will lead agentic workflow development and cross-functional stakeholder management."
+        ),
+        min_score=60,
+    ),
+    CalibrationCase(
+        case_id="inline_poor_match",
+        source="inline",
+        jd_text=(
+            "We need a civil engineer with 10 years of bridge construction experience. "
+            "Must be on-site in rural Alaska daily. No remote option."
+        ),
+        max_score=LOW_CONFIDENCE_MAX_SCORE,
+        expected_confidence="Low",
+    ),
+)
+
+
+def load_fixture_cases(testdata_dir: Path = TESTDATA_DIR) -> list:
+    """One case per jd_*.txt fixture; expected_properties.json applies to the cosmetics fixture."""
+    properties = json.loads((testdata_dir / "expected_properties.json").read_text(encoding="utf-8"))["invariants"]
+    cases = []
+    for path in sorted(testdata_dir.glob("jd_*.txt")):
+        case = CalibrationCase(case_id=path.stem, source="fixture", jd_text=path.read_text(encoding="utf-8"))
+        if path.stem == "jd_cosmetics_enablement":
+            case.forbidden_gap_terms = list(properties.get("should_not_see_in_gaps", []))
+        for key, value in FIXTURE_EXPECTATIONS.get(path.stem, {}).items():
+            setattr(case, key, value)
+        cases.append(case)
+    return cases
+
+
+GENERATED_ROLES = {
+    # domain: (title, responsibilities, requirements, strong profile fit)
+    "ai": (
+        "Senior AI Engineer",
+        ["Build LLM applications with RAG and evaluation harnesses", "Design agentic workflows and prompt engineering playbooks"],
+        ["Python and TypeScript", "Experience shipping retrieval-augmented generation to production"],
+        True,
+    ),
+    "enablement": (
+        "AI Enablement Lead",
+        ["Run workshops and change management for AI adoption", "Coach teams on prompt engineering"],
+        ["Stakeholder management across business units", "Program governance experience"],
+        True,
+    ),
+    "retail": (
+        "Cosmetics Counter Manager",
+        ["Manage the cosmetics counter and visual merchandising", "Hit monthly beauty sales targets"],
+        ["3+ years retail experience in cosmetics or beauty", "Customer service excellence"],
+        False,
+    ),
+    "civil": (
+        "Bridge Construction Engineer",
+        ["Supervise bridge construction crews", "Review structural drawings"],
+        ["PE license", "10 years of civil engineering experience"],
+        False,
+    ),
+}
+GENERATED_ARRANGEMENTS = {
+    "remote": ("Work Arrangement: Fully remote.", set()),
+    "hybrid": ("Work Arrangement: Hybrid, two days per week in the Tokyo office.", set()),
+    "onsite": ("Work Arrangement: This is a fully onsite role - no remote work available.", {"ONSITE_REQUIRED"}),
+}
+GENERATED_LANGUAGES = {
+    "none": ("", set()),
+    "business_ja": ("- Business-level Japanese preferred", set()),
+    "fluent_ja": ("- Native or fluent Japanese language skills required", {"JAPANESE_FLUENCY"}),
+}
+
+
+def generate_cases(count: int, seed: int = 7) -> list:
+    """Deterministic corpus over domain x arrangement x language, with filler variation."""
+    rng = random.Random(seed)
+    combos = list(itertools.product(GENERATED_ROLES, GENERATED_ARRANGEMENTS, GENERATED_LANGUAGES))
+    fillers = [
+        "You will partner with product and operations leaders.",
+        "The team values written communication and clear documentation.",
+        "We offer a learning budget and flexible hours.",
+        "Travel is occasional.",
+    ]
+    cases = []
+    for i in range(count):
+        domain, arrangement, language = combos[i % len(combos)]
+        title, responsibilities, requirements, strong_fit = GENERATED_ROLES[domain]
+        arrangement_line, arrangement_flags = GENERATED_ARRANGEMENTS[arrangement]
+        language_line, language_flags = GENERATED_LANGUAGES[language]
+        lines = [
+            f"Position: {title}",
+            "Company: Generated Co",
+            "",
+            arrangement_line,
+            "",
+            "Responsibilities:",
+            *[f"- {item}" for item in responsibilities],
+            "",
+            "Requirements:",
+            *[f"- {item}" for item in requirements],
+        ]
+        if language_line:
+            lines.append(language_line)
+        lines += ["", rng.choice(fillers)]
+
+        flags = arrangement_flags | language_flags
+        caps = [100]
+        if "ONSITE_REQUIRED" in flags:
+            caps.append(ONSITE_HARD_CAP)
+        if "JAPANESE_FLUENCY" in flags:
+            caps.append(JAPANESE_HARD_CAP)
+        cases.append(CalibrationCase(
+            case_id=f"gen_{i:04d}_{domain}_{arrangement}_{language}",
+            source="generated",
+            jd_text="\n".join(lines),
+            min_score=60 if strong_fit and not flags else 0,
+            max_score=min(caps) if strong_fit else LOW_CONFIDENCE_MAX_SCORE,
+            required_flags=flags,
+            labelled_flags={"ONSITE_REQUIRED", "JAPANESE_FLUENCY"},
+            # Strong fits without a hard cap may be Medium or High, so they stay unlabelled.
+            expected_confidence="Low" if flags or not strong_fit else None,
+        ))
+    return cases
+
+
+class AnalyzerClient:
+    """Thread-safe client: one requests.Session per worker thread."""
+
+    def __init__(self, endpoint: str, auth: str = API_AUTH, timeout: float = 30.0):
+        self.endpoint = endpoint
+        self.auth = auth
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+            self._local.session.headers.update({"Authorization": self.auth, "Content-Type": "application/json"})
+        return self._local.session
+
+    def analyze(self, case: CalibrationCase) -> dict:
+        started = time.perf_counter()
+        row = {"case_id": case.case_id, "status": None, "latency_ms": None, "error": ""}
+        try:
+            response = self._session().post(self.endpoint, json={"jd_text": case.jd_text}, timeout=self.timeout)
+            row["status"] = response.status_code
+            if response.status_code == 200:
+                data = response.json()
+                row.update({
+                    "score": data.get("score"),
+                    "confidence": data.get("confidence"),
+                    "risk_flags": list(data.get("risk_flags") or []),
+                    "gaps_text": json.dumps(data.get("gaps") or [], ensure_ascii=False),
+                })
+            else:
+                row["error"] = response.text[:200]
+        except (requests.RequestException, ValueError) as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+        row["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return row
+
+
+def run_cases(client: AnalyzerClient, cases: list, workers: int) -> pd.DataFrame:
+    """Score every case concurrently and join responses onto expectations."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        rows = list(pool.map(client.analyze, cases))
+    responses = pd.DataFrame(rows)
+    for column in ("score", "confidence", "risk_flags", "gaps_text"):
+        if column not in responses:
+            responses[column] = None
+    expected = pd.DataFrame([{
+        "case_id": c.case_id,
+        "source": c.source,
+        "min_score": c.min_score,
+        "max_score": c.max_score,
+        "required_flags": sorted(c.required_flags),
+        "labelled_flags": sorted(c.labelled_flags),
+        "expected_confidence": c.expected_confidence,
+        "forbidden_gap_terms": c.forbidden_gap_terms,
+    } for c in cases])
+    return expected.merge(responses, on="case_id", how="left")
+
+
+def flag_matrix(series: pd.Series) -> pd.DataFrame:
+    """Boolean case x RISK_FLAGS matrix from lists of flags ("FLAG: message" or "FLAG")."""
+    codes = series.apply(lambda flags: flags if isinstance(flags, list) else []).explode().dropna()
+    codes = codes.astype(str).str.split(":", n=1).str[0].str.strip()
+    matrix = pd.crosstab(codes.index, codes).astype(bool) if len(codes) else pd.DataFrame(index=[])
+    return matrix.reindex(index=series.index, columns=list(RISK_FLAGS), fill_value=False)
+
+
+def evaluate(frame: pd.DataFrame) -> tuple:
+    """Per-case pass/fail columns plus aggregate metrics, all vectorized."""
+    frame = frame.copy()
+    ok = frame["status"].eq(200) & frame["score"].notna()
+    scores = pd.to_numeric(frame["score"], errors="coerce")
+    frame["ok"] = ok
+    frame["score_in_range"] = ok & scores.between(frame["min_score"], frame["max_score"])
+
+    predicted = flag_matrix(frame["risk_flags"])
+    expected = flag_matrix(frame["required_flags"])
+    labelled = flag_matrix(frame["labelled_flags"]) & ok.to_numpy()[:, None]
+    frame["flags_match"] = ~((predicted != expected) & labelled).any(axis=1)
+
+    gaps = frame["gaps_text"].fillna("").str.lower()
+    frame["gap_leak"] = [
+        any(term.lower() in text for term in terms) for terms, text in zip(frame["forbidden_gap_terms"], gaps)
+    ]
+    has_confidence = frame["expected_confidence"].notna() & ok
+    frame["confidence_match"] = (frame["confidence"] == frame["expected_confidence"]).where(has_confidence)
+    frame["passed"] = ok & frame["score_in_range"] & frame["flags_match"] & ~frame["gap_leak"]
+
+    tp = (predicted & expected & labelled).sum()
+    fp = (predicted & ~expected & labelled).sum()
+    fn = (~predicted & expected & labelled).sum()
+    flag_metrics = pd.DataFrame({"tp": tp, "fp": fp, "fn": fn})
+    flag_metrics["precision"] = tp / (tp + fp).where(tp + fp > 0)
+    flag_metrics["recall"] = tp / (tp + fn).where(tp + fn > 0)
+    flag_metrics = flag_metrics[(flag_metrics[["tp", "fp", "fn"]].sum(axis=1) > 0)]
+
+    valid = frame[ok].assign(score=scores[ok])
+    brier = confidence_brier(frame)
+    metrics = {
+        "cases": int(len(frame)),
+        "responses_ok": int(ok.sum()),
+        "pass_rate": float(frame["passed"].mean()) if len(frame) else 0.0,
+        "score_in_range_rate": float(frame.loc[ok, "score_in_range"].mean()) if ok.any() else 0.0,
+        "confidence_cases": int(has_confidence.sum()),
+        "confidence_agreement": float(frame["confidence_match"].dropna().mean()) if has_confidence.any() else None,
+        "confidence_brier": brier,
+        "gap_leaks": int(frame["gap_leak"].sum()),
+        "latency_p50_ms": float(frame["latency_ms"].quantile(0.5)),
+        "latency_p95_ms": float(frame["latency_ms"].quantile(0.95)),
+        "score_by_source": valid.groupby("source")["score"].describe()[["count", "mean", "min", "50%", "max"]]
+        .round(1).to_dict(orient="index"),
+        "score_histogram": pd.cut(valid["score"], bins=SCORE_BINS, include_lowest=True)
+        .value_counts(sort=False).rename(index=str).to_dict(),
+        "confidence_counts": valid["confidence"].value_counts().to_dict(),
+        "flags": flag_metrics.round(3).astype(object).where(flag_metrics.notna(), None).to_dict(orient="index"),
+    }
+    return frame, metrics
+
+
+def confidence_brier(frame: pd.DataFrame) -> Optional[float]:
+    """Mean squared gap between the probability implied by `confidence` and whether the case passed."""
+    implied = frame.loc[frame["ok"], "confidence"].map(CONFIDENCE_PROBABILITY).dropna()
+    if implied.empty:
+        return None
+    outcome = frame.loc[implied.index, "passed"].astype(float)
+    return round(float(((implied - outcome) ** 2).mean()), 4)
+
+
+def case_snapshot(frame: pd.DataFrame) -> dict:
+    snapshot = frame.loc[frame["ok"], ["case_id", "score", "confidence", "risk_flags"]].copy()
+    if snapshot.empty:
+        return {}
+    snapshot["risk_flags"] = flag_matrix(snapshot["risk_flags"]).apply(lambda row: list(row.index[row]), axis=1)
+    return {
+        row.case_id: {"score": int(row.score), "confidence": row.confidence, "flags": row.risk_flags}
+        for row in snapshot.itertuples(index=False)
+    }
+
+
+def diff_against_baseline(metrics: dict, cases: dict, baseline: dict) -> dict:
+    """Scalar metric deltas plus per-case score drift and flag changes."""
+    deltas = {}
+    for key, value in metrics.items():
+        previous = baseline.get("metrics", {}).get(key)
+        if isinstance(value, (int, float)) and isinstance(previous, (int, float)):
+            deltas[key] = round(value - previous, 4)
+
+    current = pd.DataFrame.from_dict(cases, orient="index")
+    previous = pd.DataFrame.from_dict(baseline.get("cases", {}), orient="index")
+    if current.empty or previous.empty:
+        return {"metric_deltas": deltas, "score_drift": [], "flag_changes": [], "new_cases": len(current)}
+    joined = current.join(previous, how="inner", lsuffix="", rsuffix="_baseline")
+    joined["delta"] = joined["score"] - joined["score_baseline"]
+    drift = joined[joined["delta"].abs() >= SCORE_DRIFT_POINTS]
+    flag_changed = joined[joined["flags"].apply(sorted) != joined["flags_baseline"].apply(sorted)]
+    return {
+        "metric_deltas": deltas,
+        "score_drift": [
+            {"case_id": case_id, "baseline": int(row.score_baseline), "current": int(row.score), "delta": int(row.delta)}
+            for case_id, row in drift.sort_values("delta").iterrows()
+        ],
+        "flag_changes": [
+            {"case_id": case_id, "baseline": row["flags_baseline"], "current": row["flags"]}
+            for case_id, row in flag_changed.iterrows()
+        ],
+        "new_cases": int(len(current.index.difference(previous.index))),
+    }
+
+
+def print_report(frame: pd.DataFrame, metrics: dict, diff: Optional[dict]):
+    print(f"\nJD calibration: {metrics['responses_ok']}/{metrics['cases']} responses, pass rate {metrics['pass_rate']:.1%}")
+    print(f"Score in range: {metrics['score_in_range_rate']:.1%} | gap leaks: {metrics['gap_leaks']} | "
+          f"confidence agreement: {metrics['confidence_agreement'] if metrics['confidence_agreement'] is not None else 'n/a'} | "
+          f"confidence Brier: {metrics['confidence_brier'] if metrics['confidence_brier'] is not None else 'n/a'}")
+    print(f"Latency p50/p95: {metrics['latency_p50_ms']:.0f}/{metrics['latency_p95_ms']:.0f} ms")
+    if metrics["score_by_source"]:
+        print("\nScore by source:")
+        print(pd.DataFrame(metrics["score_by_source"]).T.to_string())
+    if metrics["flags"]:
+        print("\nRisk flags:")
+        print(pd.DataFrame(metrics["flags"]).T.to_string())
+    failed = frame.loc[~frame["passed"], ["case_id", "status", "score", "min_score", "max_score", "flags_match", "gap_leak",
+                                          "error"]].assign(error=lambda f: f["error"].fillna("").str.slice(0, 60))
+    if len(failed):
+        print(f"\nFailed cases ({len(failed)}):")
+        print(failed.to_string(index=False))
+    if diff:
+        print("\nAgainst baseline:")
+        changes = ", ".join(f"{k} {v:+}" for k, v in diff["metric_deltas"].items() if v)
+        print(f"  {changes or 'no metric changes'}")
+        for item in diff["score_drift"]:
+            print(f"  score {item['case_id']}: {item['baseline']} -> {item['current']} ({item['delta']:+})")
+        for item in diff["flag_changes"]:
+            print(f"  flags {item['case_id']}: {item['baseline']} -> {item['current']}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Calibrate the JD analyzer against fixtures and a generated corpus")
+    parser.add_argument("--endpoint", default=LOCAL_ENDPOINT, help="Analyzer URL (default: local wrangler dev)")
+    parser.add_argument("--allow-production", action="store_true",
+                        help=f"Permit the production API; runs at most {PRODUCTION_MAX_CASES} cases")
+    parser.add_argument("--generated", type=int, default=72, help="Number of generated corpus cases")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--json", type=Path, help="Also write per-case results and metrics to this file")
+    return parser.parse_args()
+
+
+def is_production_endpoint(endpoint: str) -> bool:
+    """True for any URL on the production host, whatever its scheme, port, path or www. prefix."""
+    host = urlparse(endpoint if "//" in endpoint else f"//{endpoint}").hostname or ""
+    production = urlparse(BASE_URL).hostname or ""
+    return host.removeprefix("www.") == production.removeprefix("www.")
+
+
+def main() -> int:
+    args = parse_args()
+    cases = load_fixture_cases() + list(INLINE_CASES) + generate_cases(args.generated, args.seed)
+    if is_production_endpoint(args.endpoint):
+        if not args.allow_production:
+            log("Refusing to run the corpus against production (5 requests/hour); use --allow-production", level="ERROR")
+            return 2
+        cases, args.workers = cases[:PRODUCTION_MAX_CASES], 1
+
+    log(f"Scoring {len(cases)} cases against {args.endpoint} with {args.workers} workers")
+    frame, metrics = evaluate(run_cases(AnalyzerClient(args.endpoint), cases, args.workers))
+    cases_now = case_snapshot(frame)
+    confidence_missing = bool(metrics["responses_ok"]) and metrics["confidence_agreement"] is None \
+        and any(c.expected_confidence for c in cases)
+    if confidence_missing:
+        log("Confidence agreement was not computed although cases carry expected_confidence", level="ERROR")
+
+    diff = None
+    if args.baseline.exists():
+        diff = diff_against_baseline(metrics, cases_now, json.loads(args.baseline.read_text(encoding="utf-8")))
+    print_report(frame, metrics, diff)
+
+    if args.json:
+        records = frame.drop(columns=["gaps_text"]).to_dict(orient="records")
+        args.json.write_text(json.dumps({"metrics": metrics, "diff": diff, "cases": records}, indent=2, default=str),
+                             encoding="utf-8")
+    if args.update_baseline:
+        args.baseline.write_text(
+            json.dumps({"endpoint": args.endpoint, "metrics": metrics, "cases": cases_now}, indent=2, ensure_ascii=False)
+            + "\n",
+            encoding="utf-8",
+        )
+        log(f"Baseline written to {args.baseline}")
+
+    return 0 if metrics["responses_ok"] == metrics["cases"] and not confidence_missing else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
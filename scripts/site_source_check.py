@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Offline source-tree checks for kinokoholic.com
+
+Runs the EN/JA parity (Feature 2) and navigation consistency (Feature 3)
+checks from prompts/openclaw-health-check.md directly against the Jekyll
+source tree, without HTTP. Pages are indexed once by front matter, permalink
+and layout; parsed files are cached by mtime under the git directory so
+repeat runs only re-read what changed.
+
+Usage:
+    python3 scripts/site_source_check.py              # whole site
+    python3 scripts/site_source_check.py about.md     # report on given files only
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CACHE_FILE_NAME = "site-source-cache.json"
+CACHE_VERSION = 1
+PAGE_SUFFIXES = (".md", ".markdown", ".html")
+
+# JD Concierge Sandbox has no Japanese counterpart
+PAGES_WITHOUT_JA_PARITY = ["/projects/jd-concierge-sandbox/"]
+
+FRONT_MATTER_PATTERN = re.compile(r"\A---\s*\n(.*?)\n---\s*(?:\n|\Z)", re.S)
+INCLUDE_PATTERN = re.compile(r"{%-?\s*include\s+([\w./-]+)")
+NAV_PATTERN = re.compile(r"<(?:nav|header)[\s>]", re.I)
+FOOTER_PATTERN = re.compile(r"<footer[\s>]", re.I)
+
+
+@dataclass
+class SourceFile:
+    """Facts extracted from one file; cached by mtime/size."""
+    path: str
+    front_matter: dict = field(default_factory=dict)
+    has_front_matter: bool = False
+    includes: list = field(default_factory=list)
+    has_nav: bool = False
+    has_footer: bool = False
+
+
+@dataclass
+class Page:
+    path: str
+    url: str
+    layout: str
+    lang: str
+
+
+@dataclass
+class Finding:
+    feature: str
+    path: str
+    url: str
+    expected: str
+    actual: str
+    severity: str
+
+
+def parse_front_matter(text: str) -> tuple:
+    """Parse flat `key: value` front matter (all this site uses)."""
+    match = FRONT_MATTER_PATTERN.match(text)
+    if not match:
+        return False, {}
+    data = {}
+    for line in match.group(1).splitlines():
+        if not line.strip() or line.lstrip().startswith("#") or line.startswith((" ", "\t", "-")):
+            continue
+        key, sep, value = line.partition(":")
+        if sep:
+            data[key.strip()] = value.strip().strip("'\"")
+    return True, data
+
+
+def parse_source(root: Path, rel: str) -> SourceFile:
+    """Read one file and extract front matter, includes and nav/footer markers."""
+    text = (root / rel).read_text(encoding="utf-8", errors="replace")
+    has_front_matter, front_matter = parse_front_matter(text)
+    return SourceFile(
+        path=rel,
+        front_matter=front_matter,
+        has_front_matter=has_front_matter,
+        includes=INCLUDE_PATTERN.findall(text),
+        has_nav=bool(NAV_PATTERN.search(text)),
+        has_footer=bool(FOOTER_PATTERN.search(text)),
+    )
+
+
+def load_excludes(root: Path) -> list:
+    """Read the `exclude:` list from _config.yml."""
+    excludes, in_exclude = [], False
+    config = root / "_config.yml"
+    if not config.exists():
+        return excludes
+    for line in config.read_text(encoding="utf-8").splitlines():
+        if re.match(r"^exclude\s*:", line):
+            in_exclude = True
+        elif in_exclude and line.lstrip().startswith("- "):
+            excludes.append(line.split("- ", 1)[1].strip().strip("'\"").rstrip("/"))
+        elif in_exclude and line and not line.startswith(" "):
+            in_exclude = False
+    return excludes
+
+
+def is_excluded(rel: str, excludes: list) -> bool:
+    parts = rel.split("/")
+    if any(part.startswith((".", "_")) for part in parts) or "node_modules" in parts:
+        return True
+    return any(rel == item or rel.startswith(item + "/") for item in excludes)
+
+
+def discover_files(root: Path) -> list:
+    """Candidate page sources plus every layout and include."""
+    excludes = load_excludes(root)
+    files = []
+    for path in root.rglob("*"):
+        if not path.is_file():
+            continue
+        rel = path.relative_to(root).as_posix()
+        if rel.startswith(("_layouts/", "_includes/")):
+            files.append(rel)
+        elif path.suffix in PAGE_SUFFIXES and not is_excluded(rel, excludes):
+            files.append(rel)
+    return sorted(files)
+
+
+def derive_url(rel: str, front_matter: dict) -> str:
+    """Jekyll URL for a page under `permalink: pretty`."""
+    if front_matter.get("permalink"):
+        return front_matter["permalink"]
+    stem = rel.rsplit(".", 1)[0]
+    if stem == "index":
+        return "/"
+    if stem.endswith("/index"):
+        return f"/{stem[: -len('/index')]}/"
+    return f"/{stem}/"
+
+
+def git_cache_path() -> Path | None:
+    proc = subprocess.run(
+        ["git", "rev-parse", "--git-path", CACHE_FILE_NAME],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return None
+    return REPO_ROOT / proc.stdout.strip()
+
+
+class SourceIndex:
+    """Index of the site source tree with an mtime-keyed parse cache."""
+
+    def __init__(self, root: Path = REPO_ROOT, cache_path: Path | None = None, workers: int = 8):
+        self.root = root
+        self.cache_path = cache_path
+        self.workers = workers
+        self.files: dict = {}
+        self.parsed = 0
+        self.reused = 0
+
+    def _load_cache(self) -> dict:
+        if not self.cache_path or not self.cache_path.exists():
+            return {}
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data.get("files", {}) if data.get("version") == CACHE_VERSION else {}
+
+    def _save_cache(self, entries: dict):
+        if not self.cache_path:
+            return
+        try:
+            self.cache_path.write_text(
+                json.dumps({"version": CACHE_VERSION, "files": entries}), encoding="utf-8"
+            )
+        except OSError:
+            pass  # Cache is an optimisation only
+
+    def build(self):
+        """Parse new or modified files in parallel; reuse cached facts for the rest."""
+        cached = self._load_cache()
+        entries, stale = {}, []
+        for rel in discover_files(self.root):
+            stat = (self.root / rel).stat()
+            stamp = [stat.st_mtime_ns, stat.st_size]
+            entry = cached.get(rel)
+            if entry and entry["stamp"] == stamp:
+                entries[rel] = entry
+                self.reused += 1
+            else:
+                stale.append((rel, stamp))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            parsed = pool.map(lambda item: parse_source(self.root, item[0]), stale)
+            for (rel, stamp), source in zip(stale, parsed):
+                entries[rel] = {"stamp": stamp, "source": source.__dict__}
+                self.parsed += 1
+
+        self.files = {rel: SourceFile(**entry["source"]) for rel, entry in entries.items()}
+        if stale or len(entries) != len(cached):
+            self._save_cache(entries)
+        return self
+
+    def pages(self) -> list:
+        pages = []
+        for rel, source in self.files.items():
+            if rel.startswith(("_layouts/", "_includes/")) or not source.has_front_matter:
+                continue
+            url = derive_url(rel, source.front_matter)
+            lang = source.front_matter.get("lang") or ("ja" if url.startswith("/ja/") else "en")
+            pages.append(Page(path=rel, url=url, layout=source.front_matter.get("layout", ""), lang=lang))
+        return sorted(pages, key=lambda page: page.url)
+
+    def _include_flags(self, name: str, seen: set) -> tuple:
+        rel = f"_includes/{name}"
+        if rel in seen or rel not in self.files:
+            return False, False
+        seen.add(rel)
+        source = self.files[rel]
+        has_nav, has_footer = source.has_nav, source.has_footer
+        for child in source.includes:
+            child_nav, child_footer = self._include_flags(child, seen)
+            has_nav, has_footer = has_nav or child_nav, has_footer or child_footer
+        return has_nav, has_footer
+
+    def layout_flags(self, layout: str) -> tuple:
+        """Whether a layout (following parents and includes) renders nav and footer."""
+        has_nav = has_footer = False
+        seen = set()
+        while layout:
+            rel = f"_layouts/{layout}.html"
+            if rel in seen or rel not in self.files:
+                break
+            seen.add(rel)
+            source = self.files[rel]
+            has_nav, has_footer = has_nav or source.has_nav, has_footer or source.has_footer
+            for name in source.includes:
+                inc_nav, inc_footer = self._include_flags(name, seen)
+                has_nav, has_footer = has_nav or inc_nav, has_footer or inc_footer
+            layout = source.front_matter.get("layout", "")
+        return has_nav, has_footer
+
+
+def check_parity(pages: list) -> list:
+    """Feature 2: every EN page has a /ja/ twin and vice versa."""
+    findings = []
+    urls = {page.url for page in pages}
+    for page in pages:
+        if page.url.startswith("/ja/"):
+            en_url = page.url.replace("/ja", "", 1)
+            if en_url not in urls:
+                findings.append(Finding(
+                    "Feature 2: Bilingual Parity", page.path, page.url,
+                    f"English counterpart at {en_url}", "No English page exists", "CRITICAL",
+                ))
+        elif page.url not in PAGES_WITHOUT_JA_PARITY:
+            ja_url = "/ja/" if page.url == "/" else f"/ja{page.url}"
+            if ja_url not in urls:
+                findings.append(Finding(
+                    "Feature 2: Bilingual Parity", page.path, page.url,
+                    f"Japanese counterpart at {ja_url}", "No Japanese page exists", "CRITICAL",
+                ))
+    return findings
+
+
+def check_navigation(index: SourceIndex, pages: list) -> list:
+    """Feature 3: every page's layout chain renders a nav/header and a footer."""
+    findings = []
+    flags = {}
+    for page in pages:
+        if not page.layout:
+            findings.append(Finding(
+                "Feature 3: Navigation", page.path, page.url,
+                "Front matter `layout`", "No layout (page renders without nav/footer)", "WARNING",
+            ))
+            continue
+        if f"_layouts/{page.layout}.html" not in index.files:
+            findings.append(Finding(
+                "Feature 3: Navigation", page.path, page.url,
+                f"_layouts/{page.layout}.html", "Layout file not found", "CRITICAL",
+            ))
+            continue
+        if page.layout not in flags:
+            flags[page.layout] = index.layout_flags(page.layout)
+        has_nav, has_footer = flags[page.layout]
+        if not has_nav:
+            findings.append(Finding(
+                "Feature 3: Navigation", page.path, page.url,
+                "<nav> or <header> element", f"Layout '{page.layout}' renders no navigation", "WARNING",
+            ))
+        if not has_footer:
+            findings.append(Finding(
+                "Feature 3: Navigation", page.path, page.url,
+                "<footer> element", f"Layout '{page.layout}' renders no footer", "WARNING",
+            ))
+    return findings
+
+
+def run_checks(index: SourceIndex, only_paths: list | None = None) -> list:
+    pages = index.pages()
+    findings = check_parity(pages) + check_navigation(index, pages)
+    if only_paths:
+        wanted = {Path(path).as_posix() for path in only_paths}
+        touches_layouts = any(path.startswith(("_layouts/", "_includes/")) for path in wanted)
+        findings = [f for f in findings if f.path in wanted or (touches_layouts and f.feature.startswith("Feature 3"))]
+    return findings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline EN/JA parity and navigation checks")
+    parser.add_argument("paths", nargs="*", help="Only report findings for these source files")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every file")
+    parser.add_argument("--json", action="store_true", help="Print findings as JSON")
+    args = parser.parse_args()
+
+    index = SourceIndex(cache_path=None if args.no_cache else git_cache_path()).build()
+    findings = run_checks(index, args.paths)
+    critical = sum(1 for f in findings if f.severity == "CRITICAL")
+
+    if args.json:
+        print(json.dumps([f.__dict__ for f in findings], indent=2, ensure_ascii=False))
+    else:
+        print(
+            f"Site source check: {len(index.pages())} pages "
+            f"({index.parsed} parsed, {index.reused} cached), {len(findings)} findings"
+        )
+        for f in findings:
+            print(f"[{f.severity}] {f.feature} | {f.path} ({f.url}) | expected {f.expected} | {f.actual}")
+
+    return 1 if critical else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
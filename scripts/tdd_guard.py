@@ -3,16 +3,30 @@
 
 Fails when source files are changed without corresponding test-file changes
 in the same diff. Use in CI and git hooks.
+
+Changed paths are streamed from ``git diff -z`` and evaluated as they arrive.
+Patterns are anchored at the repository root and git emits paths in sorted
+order, so once the stream has moved past every pattern root of a rule that
+rule's outcome is final; the diff is abandoned as soon as every rule is final.
+Results are cached under the git directory per (base, HEAD) commit pair for
+``--against`` runs and per (HEAD, index tree) pair for ``--staged`` runs, so
+repeated hook invocations on an unchanged tree return instantly.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
 import subprocess
 import sys
-from dataclasses import dataclass
-from pathlib import PurePosixPath
-from typing import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Iterator
+
+CACHE_FILE_NAME = "tdd-guard-cache.json"
+CACHE_MAX_ENTRIES = 64
+READ_CHUNK_BYTES = 64 * 1024
 
 
 @dataclass(frozen=True)
@@ -42,18 +56,31 @@ RULES: tuple[Rule, ...] = (
     ),
     Rule(
         name="Site widget JavaScript",
-        source_patterns=("assets/js/*.js", "assets/js/**/*.js"),
+        source_patterns=(
+            "assets/js/*.js",
+            "assets/js/**/*.js",
+            "site/assets/js/*.js",
+            "site/assets/js/**/*.js",
+        ),
         source_exclude_patterns=(
             "assets/js/*.test.js",
             "assets/js/**/*.test.js",
             "assets/js/*.spec.js",
             "assets/js/**/*.spec.js",
+            "site/assets/js/*.test.js",
+            "site/assets/js/**/*.test.js",
+            "site/assets/js/*.spec.js",
+            "site/assets/js/**/*.spec.js",
         ),
         test_patterns=(
             "tests/*.test.js",
             "tests/**/*.test.js",
             "tests/*.spec.js",
             "tests/**/*.spec.js",
+            "site/tests/*.test.js",
+            "site/tests/**/*.test.js",
+            "site/tests/*.spec.js",
+            "site/tests/**/*.spec.js",
         ),
     ),
     Rule(
@@ -80,58 +107,245 @@ def parse_args() -> argparse.Namespace:
         default="origin/main",
         help="Base ref for diff when not using --staged (default: origin/main)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore and do not update the per-commit result cache",
+    )
     return parser.parse_args()
 
 
-def run_git_diff(staged: bool, against: str) -> list[str]:
+def git_diff_command(staged: bool, against: str) -> list[str]:
+    # --no-renames keeps the output in path order: a rename is reported as an
+    # add at its new path instead of being moved next to its source.
+    base = ["git", "diff", "--name-only", "-z", "--no-renames", "--diff-filter=ACMR"]
     if staged:
-        cmd = ["git", "diff", "--cached", "--name-only", "--diff-filter=ACMR"]
-    else:
-        cmd = ["git", "diff", "--name-only", "--diff-filter=ACMR", f"{against}...HEAD"]
+        return [*base, "--cached"]
+    return [*base, f"{against}...HEAD"]
 
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    if proc.returncode != 0:
-        print(proc.stderr.strip() or "Failed to compute git diff.", file=sys.stderr)
-        sys.exit(proc.returncode)
 
-    files = [line.strip() for line in proc.stdout.splitlines() if line.strip()]
-    return files
+def iter_git_diff(staged: bool, against: str) -> Iterator[str]:
+    """Yield changed paths as git emits them; closing the iterator stops git."""
+    proc = subprocess.Popen(
+        git_diff_command(staged, against),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    assert proc.stdout is not None
+    finished = False
+    try:
+        pending = b""
+        while chunk := proc.stdout.read1(READ_CHUNK_BYTES):
+            pending += chunk
+            *paths, pending = pending.split(b"\0")
+            for raw in paths:
+                if raw:
+                    yield raw.decode("utf-8", errors="surrogateescape")
+        if pending:
+            yield pending.decode("utf-8", errors="surrogateescape")
+        finished = True
+    finally:
+        if not finished:
+            proc.kill()
+        proc.stdout.close()
+        stderr = proc.stderr.read().decode("utf-8", errors="replace") if proc.stderr else ""
+        if proc.stderr:
+            proc.stderr.close()
+        returncode = proc.wait()
+
+    if returncode != 0:
+        print(stderr.strip() or "Failed to compute git diff.", file=sys.stderr)
+        sys.exit(returncode)
+
+
+def run_git_diff(staged: bool, against: str) -> list[str]:
+    return list(iter_git_diff(staged=staged, against=against))
 
 
 def path_matches(path: str, patterns: Iterable[str]) -> bool:
+    """Match ``path`` against root-anchored patterns, one component per segment."""
     posix = PurePosixPath(path)
-    return any(posix.match(pattern) for pattern in patterns)
+    return any(
+        len(posix.parts) == len(PurePosixPath(pattern).parts) and posix.match(pattern)
+        for pattern in patterns
+    )
+
+
+def pattern_root(pattern: str) -> str:
+    """Return the literal directory prefix of ``pattern`` (e.g. ``"worker/src/"``)."""
+    literal: list[str] = []
+    for part in PurePosixPath(pattern).parts[:-1]:
+        if any(char in part for char in "*?["):
+            break
+        literal.append(part)
+    return "".join(f"{part}/" for part in literal)
+
+
+def rule_roots(rule: Rule) -> tuple[str, ...]:
+    return tuple(
+        sorted({pattern_root(pattern) for pattern in (*rule.source_patterns, *rule.test_patterns)})
+    )
+
+
+@dataclass
+class RuleState:
+    rule: Rule
+    changed_source: list[str] = field(default_factory=list)
+    has_changed_test: bool = False
+    # Set once the sorted path stream has moved past every root of the rule.
+    closed: bool = False
+    roots: tuple[str, ...] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.roots = rule_roots(self.rule)
+
+    def observe(self, path: str) -> None:
+        if self.decided:
+            return
+        # Paths under a root form one contiguous run in sorted order, so a path
+        # beyond a root that does not start with it means no later path will.
+        if all(path > root and not path.startswith(root) for root in self.roots):
+            self.closed = True
+            return
+        if path_matches(path, self.rule.test_patterns):
+            self.has_changed_test = True
+            self.changed_source.clear()
+        elif path_matches(path, self.rule.source_patterns) and not path_matches(
+            path, self.rule.source_exclude_patterns
+        ):
+            self.changed_source.append(path)
+
+    @property
+    def decided(self) -> bool:
+        # A test change satisfies the rule no matter which sources follow, and
+        # a closed rule cannot see any further matching path.
+        return self.has_changed_test or self.closed
+
+    @property
+    def violated(self) -> bool:
+        return bool(self.changed_source) and not self.has_changed_test
+
+
+@dataclass
+class GuardOutcome:
+    saw_changes: bool
+    violations: list[tuple[Rule, list[str]]]
+
+
+def evaluate_paths(paths: Iterable[str]) -> GuardOutcome:
+    """Evaluate rules over sorted paths, stopping once every rule is decided."""
+    states = [RuleState(rule) for rule in RULES]
+    saw_changes = False
+    for path in paths:
+        saw_changes = True
+        for state in states:
+            state.observe(path)
+        if all(state.decided for state in states):
+            break
+    violations = [(state.rule, list(state.changed_source)) for state in states if state.violated]
+    return GuardOutcome(saw_changes=saw_changes, violations=violations)
 
 
 def find_violations(changed_files: list[str]) -> list[tuple[Rule, list[str]]]:
+    return evaluate_paths(changed_files).violations
+
+
+def git_output(*args: str) -> str | None:
+    proc = subprocess.run(["git", *args], capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    return proc.stdout.strip()
+
+
+def rules_fingerprint() -> str:
+    return hashlib.sha256(repr(RULES).encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key(staged: bool, against: str) -> str | None:
+    head = git_output("rev-parse", "--verify", "--quiet", "HEAD^{commit}")
+    if staged:
+        # The staged diff is HEAD against the index, and write-tree names the
+        # index contents; it fails (no cache) while merge conflicts are unresolved.
+        tree = git_output("write-tree")
+        if not tree:
+            return None
+        return f"staged:{head or 'unborn'}:{tree}:{rules_fingerprint()}"
+    base = git_output("rev-parse", "--verify", "--quiet", f"{against}^{{commit}}")
+    if not base or not head:
+        return None
+    return f"{base}:{head}:{rules_fingerprint()}"
+
+
+def cache_path() -> Path | None:
+    path = git_output("rev-parse", "--git-path", CACHE_FILE_NAME)
+    return Path(path) if path else None
+
+
+def load_cache(path: Path) -> dict:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def read_cached_outcome(path: Path, key: str) -> GuardOutcome | None:
+    entry = load_cache(path).get(key)
+    if not isinstance(entry, dict):
+        return None
+    rules_by_name = {rule.name: rule for rule in RULES}
     violations: list[tuple[Rule, list[str]]] = []
+    for name, files in entry.get("violations", []):
+        if name not in rules_by_name:
+            return None
+        violations.append((rules_by_name[name], list(files)))
+    return GuardOutcome(saw_changes=bool(entry.get("saw_changes")), violations=violations)
+
+
+def write_cached_outcome(path: Path, key: str, outcome: GuardOutcome) -> None:
+    cache = load_cache(path)
+    cache.pop(key, None)
+    cache[key] = {
+        "saw_changes": outcome.saw_changes,
+        "violations": [[rule.name, files] for rule, files in outcome.violations],
+    }
+    # Dicts keep insertion order, so the oldest entries are evicted first.
+    while len(cache) > CACHE_MAX_ENTRIES:
+        cache.pop(next(iter(cache)))
+    try:
+        path.write_text(json.dumps(cache), encoding="utf-8")
+    except OSError:
+        pass  # The cache is an optimisation; never fail the guard over it.
+
 
-    for rule in RULES:
-        changed_source = [
-            path
-            for path in changed_files
-            if path_matches(path, rule.source_patterns)
-            and not path_matches(path, rule.source_exclude_patterns)
-        ]
-        if not changed_source:
-            continue
+def run_guard(staged: bool, against: str, use_cache: bool = True) -> GuardOutcome:
+    key = cache_key(staged, against) if use_cache else None
+    path = cache_path() if key else None
+    if key and path:
+        cached = read_cached_outcome(path, key)
+        if cached is not None:
+            return cached
 
-        has_changed_test = any(path_matches(path, rule.test_patterns) for path in changed_files)
-        if not has_changed_test:
-            violations.append((rule, changed_source))
+    paths = iter_git_diff(staged=staged, against=against)
+    try:
+        outcome = evaluate_paths(paths)
+    finally:
+        paths.close()
 
-    return violations
+    if key and path:
+        write_cached_outcome(path, key, outcome)
+    return outcome
 
 
 def main() -> int:
     args = parse_args()
-    changed_files = run_git_diff(staged=args.staged, against=args.against)
+    outcome = run_guard(staged=args.staged, against=args.against, use_cache=not args.no_cache)
 
-    if not changed_files:
+    if not outcome.saw_changes:
         print("TDD guard: no changed files to evaluate.")
         return 0
 
-    violations = find_violations(changed_files)
+    violations = outcome.violations
     if not violations:
         print("TDD guard: PASS (source changes include corresponding test changes).")
         return 0
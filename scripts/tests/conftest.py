@@ -0,0 +1,91 @@
+"""Shared test setup: scripts on sys.path and an offline stand-in for the live site."""
+
+import gzip
+import sys
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+class FakeRaw:
+    def __init__(self, wire, error):
+        self.wire = wire
+        self.error = error
+
+    def read(self, decode_content=True):
+        if self.error is not None:
+            raise self.error
+        return self.wire
+
+
+class FakeResponse:
+    def __init__(self, status, headers, wire, error=None):
+        self.status_code = status
+        self.headers = headers
+        self.content = gzip.decompress(wire) if headers.get("Content-Encoding") == "gzip" else wire
+        self.raw = FakeRaw(wire, error)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeSite:
+    """Canned responses for health_check's ``requests.get``/``requests.head``, with call counts.
+
+    Routes are keyed by path for the production host and by full URL otherwise;
+    anything unrouted is a 404.
+    """
+
+    def __init__(self, base_url):
+        self.host = urlparse(base_url).netloc
+        self.routes = {}
+        self.calls = Counter()
+
+    def _key(self, url):
+        parsed = urlparse(url)
+        return parsed.path or "/" if parsed.netloc == self.host else url
+
+    def add(self, path, body=b"", status=200, content_type="text/html", headers=None, error=None, gzip_body=False):
+        body = body.encode("utf-8") if isinstance(body, str) else body
+        all_headers = {"Content-Type": content_type, **(headers or {})}
+        if gzip_body:
+            body = gzip.compress(body, mtime=0)
+            all_headers["Content-Encoding"] = "gzip"
+        self.routes[path] = (status, all_headers, body, error)
+
+    def page(self, path, links=(), extra=""):
+        anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+        self.add(path, f"<html><body><nav>{anchors}</nav>{extra}<footer></footer></body></html>")
+
+    def _respond(self, method, url):
+        key = self._key(url)
+        self.calls[(method, key)] += 1
+        status, headers, body, error = self.routes.get(key, (404, {"Content-Type": "text/html"}, b"", None))
+        return FakeResponse(status, headers, body, error)
+
+    def get(self, url, **_kwargs):
+        return self._respond("GET", url)
+
+    def head(self, url, **_kwargs):
+        return self._respond("HEAD", url)
+
+
+@pytest.fixture
+def fake_site(monkeypatch):
+    import health_check
+
+    site = FakeSite(health_check.BASE_URL)
+    monkeypatch.setattr(health_check.requests, "get", site.get)
+    monkeypatch.setattr(health_check.requests, "head", site.head)
+    monkeypatch.setattr(health_check, "ENGLISH_PAGES", ["/"])
+    monkeypatch.setattr(health_check, "JAPANESE_PAGES", ["/ja/"])
+    return site
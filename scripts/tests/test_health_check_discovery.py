@@ -0,0 +1,118 @@
+import health_check
+from health_check import HealthCheckResult, SiteInventory
+
+BASE = health_check.BASE_URL
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(*paths):
+    locs = "".join(f"<url><loc>{path if '://' in path else BASE + path}</loc></url>" for path in paths)
+    return f'<?xml version="1.0"?><urlset {NS}>{locs}</urlset>'
+
+
+def sitemap_index(*urls):
+    locs = "".join(f"<sitemap><loc>{url}</loc></sitemap>" for url in urls)
+    return f'<?xml version="1.0"?><sitemapindex {NS}>{locs}</sitemapindex>'
+
+
+def test_sitemap_keeps_internal_pages_once_and_follows_one_index_level(fake_site):
+    fake_site.add("/sitemap.xml", sitemap_index(f"{BASE}/pages.xml", f"{BASE}/more.xml"), content_type="text/xml")
+    fake_site.add(
+        "/pages.xml",
+        urlset("/", "/about/", "/assets/logo.png", "https://elsewhere.example/x/", "/about/", "/feed.html"),
+        content_type="text/xml",
+    )
+    fake_site.add("/more.xml", sitemap_index(f"{BASE}/nested.xml"), content_type="text/xml")
+    fake_site.add("/nested.xml", urlset("/nested-only/"), content_type="text/xml")
+
+    assert health_check.discover_from_sitemap() == ["/", "/about/", "/feed.html"]
+    assert fake_site.calls[("GET", "/nested.xml")] == 0
+    assert health_check.discover_from_sitemap(max_pages=2) == ["/", "/about/"]
+
+
+def test_unparseable_or_missing_sitemap_yields_nothing(fake_site):
+    assert health_check.discover_from_sitemap() == []
+    fake_site.add("/sitemap.xml", "<urlset", content_type="text/xml")
+    assert health_check.discover_from_sitemap() == []
+
+
+def test_crawl_respects_depth_and_page_budgets(fake_site):
+    fake_site.page("/", ["/a/", "/b/", "/assets/site.css"])
+    fake_site.page("/a/", ["/a/deep/"])
+    fake_site.page("/b/", ["/"])
+    fake_site.page("/a/deep/", ["/a/deeper/"])
+    fake_site.page("/a/deeper/")
+
+    assert set(health_check.crawl_site(["/"], max_depth=1)) == {"/", "/a/", "/b/"}
+    graph = health_check.crawl_site(["/"], max_depth=3)
+    assert set(graph) == {"/", "/a/", "/b/", "/a/deep/", "/a/deeper/"}
+    assert graph["/"] == {"/a/", "/b/", "/assets/site.css"}
+    assert fake_site.calls[("GET", "/assets/site.css")] == 0  # Assets are not crawled.
+
+    assert set(health_check.crawl_site(["/"], max_depth=3, max_pages=2)) == {"/", "/a/"}
+
+
+def test_crawl_fetches_each_page_once_through_a_shared_cache(fake_site):
+    fake_site.page("/", ["/a/", "/b/"])
+    fake_site.page("/a/", ["/b/", "/"])
+    fake_site.page("/b/", ["/a/"])
+    pages = health_check.PageCache()
+
+    health_check.crawl_site(["/", "/a/"], max_depth=3, pages=pages)
+    health_check.crawl_site(["/"], max_depth=3, pages=pages)
+
+    assert {key: count for key, count in fake_site.calls.items()} == {
+        ("GET", "/"): 1,
+        ("GET", "/a/"): 1,
+        ("GET", "/b/"): 1,
+    }
+
+
+def test_discovery_and_page_features_share_one_fetch_per_url(fake_site):
+    fake_site.add("/sitemap.xml", urlset("/", "/about/", "/ja/", "/ja/about/"), content_type="text/xml")
+    for path in ("/", "/about/"):
+        fake_site.page(path, ["/", "/ja/", "/about/"])
+        fake_site.page(f"/ja{path}", ["/", "/ja/"])
+
+    inventory = health_check.discover_pages()
+    result = HealthCheckResult(timestamp="test")
+    health_check.feature_1_page_availability(result, inventory)
+    health_check.feature_2_bilingual_parity(result, inventory)
+    health_check.feature_3_navigation_consistency(result, inventory)
+    health_check.feature_9_performance_budget(result, inventory)
+
+    assert inventory.source == "sitemap"
+    assert inventory.english == ["/", "/about/"] and inventory.japanese == ["/ja/", "/ja/about/"]
+    assert result.failures == []
+    page_gets = {key: count for key, count in fake_site.calls.items() if key[1] != "/sitemap.xml"}
+    assert page_gets == {("GET", path): 1 for path in ("/", "/about/", "/ja/", "/ja/about/")}
+
+
+def test_crawl_fallback_is_used_without_a_sitemap(fake_site):
+    fake_site.page("/", ["/ja/", "/about/"])
+    fake_site.page("/ja/", ["/"])
+    fake_site.page("/about/", ["/"])
+
+    inventory = health_check.discover_pages(max_depth=2)
+
+    assert inventory.source == "crawl"
+    assert inventory.all_pages == ["/", "/about/", "/ja/"]
+
+
+def test_link_graph_validates_each_uncrawled_target_once(fake_site):
+    fake_site.add("/assets/site.css", "body {}", content_type="text/css")
+    inventory = SiteInventory(
+        english=["/", "/about/"],
+        japanese=[],
+        links={
+            "/": {"/about/", "/assets/site.css", "/missing/"},
+            "/about/": {"/", "/missing/", "/assets/site.css"},
+        },
+    )
+    result = HealthCheckResult(timestamp="test")
+
+    health_check.feature_8_link_graph(result, inventory)
+
+    assert [(f.url, f.actual) for f in result.failures] == [(f"{BASE}/missing/", "HTTP 404")]
+    assert result.failures[0].root_cause == "Broken link on /, /about/"
+    assert fake_site.calls == {("HEAD", "/assets/site.css"): 1, ("HEAD", "/missing/"): 1}
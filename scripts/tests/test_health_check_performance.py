@@ -0,0 +1,122 @@
+import gzip
+
+import health_check
+from health_check import HealthCheckResult, PerformanceBudget, SiteInventory, generate_report
+from urllib3.exceptions import ProtocolError
+
+BASE = health_check.BASE_URL
+
+
+def page_html(*assets):
+    tags = "".join(
+        f'<link rel="stylesheet" href="{src}">' if src.endswith(".css") else f'<img src="{src}">' for src in assets
+    )
+    return f"<html><head>{tags}</head><body><nav></nav><footer></footer></body></html>"
+
+
+def run_budget(pages, budget=None):
+    result = HealthCheckResult(timestamp="test")
+    inventory = SiteInventory(english=list(pages), japanese=[])
+    health_check.feature_9_performance_budget(result, inventory, budget or PerformanceBudget())
+    return result
+
+
+def flags(result):
+    return sorted((f.url.replace(BASE, ""), f.expected) for f in result.failures)
+
+
+def test_measure_resource_counts_wire_bytes_and_decodes_html(fake_site):
+    html = page_html() * 50
+    fake_site.add("/", html, gzip_body=True, headers={"Cache-Control": "max-age=60", "ETag": '"v1"'})
+
+    metrics, body = health_check.measure_resource(f"{BASE}/")
+
+    assert (metrics.status, metrics.error, metrics.content_encoding) == (200, "", "gzip")
+    assert metrics.compressed and metrics.compressible
+    assert 0 < metrics.transfer_bytes < len(html)
+    assert body.decode("utf-8") == html
+    assert (metrics.cache_control, metrics.etag) == ("max-age=60", '"v1"')
+
+
+def test_measure_resource_records_transfer_errors_instead_of_raising(fake_site):
+    fake_site.add("/reset/", error=ProtocolError("Connection broken"))
+    fake_site.add("/corrupt/", b"not gzip at all", headers={"Content-Encoding": "gzip"})
+    fake_site.add("/truncated/", gzip.compress(b"x" * 4096)[:20], headers={"Content-Encoding": "gzip"})
+
+    for path, error_type in (("/reset/", "ProtocolError"), ("/corrupt/", "BadGzipFile"), ("/truncated/", "EOFError")):
+        metrics, body = health_check.measure_resource(f"{BASE}{path}")
+        assert metrics.error, path
+        assert metrics.error.startswith(error_type)
+        assert body == b""
+
+
+def test_over_budget_page_is_flagged_for_every_exceeded_limit(fake_site):
+    fake_site.add("/", page_html("/assets/site.css", "/assets/hero.png", "/assets/icon.png") + " " * 2000)
+    fake_site.add("/assets/site.css", "body {}" * 400, content_type="text/css", headers={"ETag": '"c"'})
+    fake_site.add("/assets/hero.png", b"\x89PNG" * 100_000, content_type="image/png", headers={"ETag": '"h"'})
+    fake_site.add("/assets/icon.png", b"\x89PNG" * 100, content_type="image/png", headers={"ETag": '"i"'})
+    budget = PerformanceBudget(max_page_bytes=200_000, max_subresources=2, max_image_bytes=300_000)
+
+    result = run_budget(["/"], budget)
+
+    assert flags(result) == [
+        ("/", "<= 2 subresources"),
+        ("/", "HTML served with gzip or br"),
+        ("/", "Page weight <= 200000 bytes"),
+        ("/assets/hero.png", "Image <= 300000 bytes"),
+        ("/assets/site.css", "Served with gzip or br"),
+    ]
+    [page] = result.performance
+    assert page.subresources == 3
+    assert page.transfer_bytes == sum(
+        len(fake_site.routes[path][2]) for path in ("/", "/assets/site.css", "/assets/hero.png", "/assets/icon.png")
+    )
+
+
+def test_within_budget_page_and_cacheable_assets_are_clean(fake_site):
+    fake_site.add("/", page_html("/assets/site.css"), gzip_body=True)
+    fake_site.add(
+        "/assets/site.css", "body {}", content_type="text/css", headers={"Cache-Control": "max-age=600", "ETag": '"c"'}
+    )
+
+    result = run_budget(["/"])
+
+    assert result.failures == []
+    assert result.performance[0].compressed
+
+
+def test_transfer_errors_are_reported_for_pages_and_assets(fake_site):
+    fake_site.add("/broken/", error=ProtocolError("Connection broken"))
+    fake_site.add("/", page_html("/assets/app.css"))
+    fake_site.add("/assets/app.css", error=ProtocolError("Connection reset"), content_type="text/css")
+
+    result = run_budget(["/", "/broken/"])
+
+    reported = {(f.url.replace(BASE, ""), f.root_cause, f.actual.split(":")[0]) for f in result.failures}
+    assert reported == {
+        ("/broken/", "Transfer failed while measuring", "ProtocolError"),
+        ("/assets/app.css", "Transfer failed while measuring", "ProtocolError"),
+    }
+    assert [page.path for page in result.performance] == ["/"]
+
+
+def test_every_image_size_is_listed_in_the_report(fake_site):
+    sizes = {"/assets/a.png": 10, "/assets/b.jpg": 5_000, "/assets/c.webp": 400_000}
+    fake_site.add("/", page_html(*sizes))
+    fake_site.add("/about/", page_html("/assets/a.png"))
+    for path, size in sizes.items():
+        fake_site.add(path, b"x" * size, content_type=f"image/{path.rsplit('.', 1)[1]}", headers={"ETag": '"i"'})
+
+    result = run_budget(["/", "/about/"])
+
+    assert sorted((image.url.replace(BASE, ""), image.transfer_bytes) for image in result.images) == sorted(
+        sizes.items()
+    )
+    assert fake_site.calls[("GET", "/assets/a.png")] == 1  # Shared subresources are fetched once.
+    report = generate_report(result)
+    rows = [line for line in report.split("### Images")[1].splitlines() if line.startswith(f"| {BASE}")]
+    assert rows == [
+        f"| {BASE}/assets/c.webp | image/webp | 400000 |",
+        f"| {BASE}/assets/b.jpg | image/jpg | 5000 |",
+        f"| {BASE}/assets/a.png | image/png | 10 |",
+    ]
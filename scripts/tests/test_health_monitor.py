@@ -0,0 +1,142 @@
+import re
+
+import pytest
+
+import health_monitor
+from health_monitor import SLOT_SECONDS, Monitor, SlidingSeries, bucket_index, quantile_ms
+
+START = 1_700_000_000 // SLOT_SECONDS * SLOT_SECONDS
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = float(START)
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def fill_minutes(monitor, clock, minutes, ok, failed=0, latency_ms=30.0, kind="page"):
+    """Record ``ok`` successes and ``failed`` failures in each of the next ``minutes`` minutes."""
+    for _ in range(minutes):
+        for _ in range(ok):
+            monitor.record(kind, "/", True, latency_ms)
+        for _ in range(failed):
+            monitor.record(kind, "/", False, 0.0)
+        clock.now += SLOT_SECONDS
+    clock.now -= SLOT_SECONDS  # Stay inside the last filled minute.
+
+
+def test_bucket_index_and_quantiles_use_upper_bounds():
+    assert bucket_index(25) == 0
+    assert bucket_index(26) == 1
+    assert bucket_index(10**6) == len(health_monitor.BUCKET_BOUNDS_MS)
+    buckets = [0] * (len(health_monitor.BUCKET_BOUNDS_MS) + 1)
+    buckets[0], buckets[5] = 90, 10
+    assert quantile_ms(buckets, 0.5) == 25.0
+    assert quantile_ms(buckets, 0.95) == 800.0
+    assert quantile_ms([0] * len(buckets), 0.5) is None
+
+
+def test_window_drops_slots_older_than_the_window(clock):
+    series = SlidingSeries(3600, clock)
+    series.record(False, 0.0)
+    clock.now += 4 * SLOT_SECONDS
+    series.record(True, 30.0)
+
+    assert series.window(300)[:2] == (2, 1)
+    clock.now += SLOT_SECONDS
+    assert series.window(300)[:2] == (1, 0)  # The failure's minute left the 5-minute window.
+    assert series.window(3600)[:2] == (2, 1)
+
+
+def test_ring_reuses_slots_without_growing(clock):
+    series = SlidingSeries(300, clock)
+    slots = series.slots
+    for _ in range(3 * slots):
+        clock.now += SLOT_SECONDS
+        series.record(False, 0.0)
+
+    assert (len(series.slot_ids), len(series.totals), len(series.buckets)) == (slots, slots, slots)
+    assert series.window(300)[:2] == (5, 5)  # Only the trailing five minutes survive.
+    assert series.lifetime_total == series.lifetime_failures == 3 * slots
+
+
+def fast_alert(monitor, sli="availability"):
+    return monitor.slo()["page"]["alerts"]["fast"][sli]
+
+
+def test_fast_burn_needs_both_windows_over_threshold(clock):
+    # A two-minute spike burns the 5m window but not the 1h window.
+    spike = Monitor(clock)
+    fill_minutes(spike, clock, 58, ok=100)
+    clock.now += SLOT_SECONDS
+    fill_minutes(spike, clock, 2, ok=0, failed=100)
+    windows = spike.slo()["page"]["windows"]
+    assert windows["300s"]["availability_burn"] > 14.4
+    assert windows["3600s"]["availability_burn"] < 14.4
+    assert not fast_alert(spike)
+
+    # A recovered outage still burns the 1h window but no longer the 5m one.
+    clock.now += 7 * SLOT_SECONDS
+    recovered = Monitor(clock)
+    fill_minutes(recovered, clock, 40, ok=85, failed=15)
+    clock.now += SLOT_SECONDS
+    fill_minutes(recovered, clock, 20, ok=100)
+    windows = recovered.slo()["page"]["windows"]
+    assert windows["3600s"]["availability_burn"] > 14.4
+    assert windows["300s"]["availability_burn"] == 0.0
+    assert not fast_alert(recovered)
+
+    # A sustained outage burns both.
+    clock.now += 7 * SLOT_SECONDS
+    outage = Monitor(clock)
+    fill_minutes(outage, clock, 60, ok=80, failed=20)
+    assert fast_alert(outage)
+    assert outage.slo()["page"]["alerts"]["slow"]["availability"]
+
+
+def test_latency_burn_counts_probes_slower_than_the_objective(clock):
+    monitor = Monitor(clock)
+    fill_minutes(monitor, clock, 60, ok=50, latency_ms=1600.0)
+
+    assert fast_alert(monitor, "latency")
+    assert not fast_alert(monitor, "availability")
+    assert monitor.slo()["page"]["windows"]["300s"]["p95_ms"] == 1600.0
+
+
+PROM_LINE = re.compile(r'^[a-z_]+\{(?:[a-z]+="[^"]*",?)+\} -?\d+(?:\.\d+)?$')
+
+
+def test_prometheus_exposition_is_cumulative_and_well_formed(clock):
+    monitor = Monitor(clock)
+    for latency in (10.0, 30.0, 30.0, 900.0, 50_000.0):
+        monitor.record("page", "/", True, latency)
+    monitor.record("page", "/about/", False, 0.0)
+
+    text = monitor.prometheus()
+    lines = text.splitlines()
+
+    assert text.endswith("\n")
+    assert all(PROM_LINE.match(line) for line in lines), [line for line in lines if not PROM_LINE.match(line)]
+    buckets = {
+        re.search(r'le="([^"]+)"', line).group(1): int(line.rsplit(" ", 1)[1])
+        for line in lines
+        if line.startswith('kinokoholic_probe_latency_seconds_bucket{kind="page"')
+    }
+    assert list(buckets)[:3] == ["0.025", "0.05", "0.1"]
+    assert (buckets["0.025"], buckets["0.05"], buckets["1.6"], buckets["25.6"], buckets["+Inf"]) == (1, 3, 4, 4, 5)
+    assert list(buckets.values()) == sorted(buckets.values())
+    assert 'kinokoholic_probe_latency_seconds_count{kind="page"} 5' in lines
+    assert 'kinokoholic_probe_latency_seconds_sum{kind="page"} 50.970000' in lines
+    assert 'kinokoholic_probes_total{kind="page"} 6' in lines
+    assert 'kinokoholic_probe_failures_total{kind="page"} 1' in lines
+    assert 'kinokoholic_probes_total{kind="api"} 0' in lines
+    burn = [line for line in lines if line.startswith("kinokoholic_slo_burn_rate")]
+    assert len(burn) == len(health_monitor.OBJECTIVES) * len(health_monitor.WINDOWS) * 2
+    assert 'kinokoholic_slo_burn_rate{kind="page",slo="availability",window="300s"} 33.3333' in lines
@@ -0,0 +1,132 @@
+import sys
+
+import pytest
+
+import jd_calibration
+from jd_calibration import CalibrationCase, case_snapshot, diff_against_baseline, evaluate, run_cases
+
+
+class FakeClient:
+    """Returns canned analyzer responses keyed by case id (a missing id is a 500)."""
+
+    def __init__(self, responses):
+        self.responses = responses
+
+    def analyze(self, case):
+        data = self.responses.get(case.case_id)
+        if data is None:
+            return {"case_id": case.case_id, "status": 500, "latency_ms": 5.0, "error": "boom"}
+        return {
+            "case_id": case.case_id,
+            "status": 200,
+            "latency_ms": 10.0,
+            "error": "",
+            "score": data["score"],
+            "confidence": data["confidence"],
+            "risk_flags": data.get("flags", []),
+            "gaps_text": "[]",
+        }
+
+
+CASES = [
+    CalibrationCase("fluent", "fixture", "jd", max_score=60, required_flags={"JAPANESE_FLUENCY"},
+                    labelled_flags={"JAPANESE_FLUENCY"}, expected_confidence="Low"),
+    CalibrationCase("onsite", "fixture", "jd", max_score=70, required_flags={"ONSITE_REQUIRED"},
+                    labelled_flags={"ONSITE_REQUIRED"}, expected_confidence="Low"),
+    CalibrationCase("strong", "inline", "jd", min_score=60),
+    CalibrationCase("poor", "inline", "jd", max_score=40, expected_confidence="Low"),
+]
+
+RESPONSES = {
+    # Passes; Low predicts 0.25 -> (0.25 - 1)^2 = 0.5625
+    "fluent": {"score": 55, "confidence": "Low", "flags": ["JAPANESE_FLUENCY: needs JLPT N1"]},
+    # Missing flag fails the case; Medium predicts 0.5 -> 0.25; confidence disagrees
+    "onsite": {"score": 65, "confidence": "Medium", "flags": []},
+    # Passes; High predicts 0.85 -> 0.0225
+    "strong": {"score": 82, "confidence": "High"},
+    # Score out of range fails the case; Low predicts 0.25 -> 0.0625
+    "poor": {"score": 55, "confidence": "Low"},
+}
+
+
+def evaluated(responses=RESPONSES):
+    return evaluate(run_cases(FakeClient(responses), CASES, workers=2))
+
+
+def test_metrics_cover_agreement_brier_and_flag_recall():
+    frame, metrics = evaluated()
+
+    assert list(frame["passed"]) == [True, False, True, False]
+    assert metrics["pass_rate"] == 0.5
+    assert metrics["confidence_cases"] == 3
+    assert metrics["confidence_agreement"] == pytest.approx(2 / 3)
+    assert metrics["confidence_brier"] == pytest.approx((0.5625 + 0.25 + 0.0225 + 0.0625) / 4, abs=1e-4)
+    assert metrics["flags"]["JAPANESE_FLUENCY"] == {"tp": 1, "fp": 0, "fn": 0, "precision": 1.0, "recall": 1.0}
+    assert metrics["flags"]["ONSITE_REQUIRED"]["recall"] == 0.0
+    assert metrics["flags"]["ONSITE_REQUIRED"]["precision"] is None
+
+
+def test_failed_responses_are_excluded_from_confidence_metrics():
+    frame, metrics = evaluated({"strong": RESPONSES["strong"]})
+
+    assert metrics["responses_ok"] == 1
+    assert metrics["confidence_cases"] == 0
+    assert metrics["confidence_agreement"] is None
+    assert metrics["confidence_brier"] == pytest.approx(0.0225)
+    assert list(case_snapshot(frame)) == ["strong"]
+
+    _, nothing = evaluated({})
+    assert nothing["confidence_brier"] is None
+    assert case_snapshot(evaluated({})[0]) == {}
+
+
+def test_baseline_diff_reports_metric_deltas_score_drift_and_flag_changes():
+    frame, metrics = evaluated()
+    baseline = {
+        "metrics": {**metrics, "pass_rate": 0.75, "confidence_brier": 0.2},
+        "cases": {
+            "fluent": {"score": 52, "confidence": "Low", "flags": ["JAPANESE_FLUENCY"]},
+            "onsite": {"score": 40, "confidence": "Low", "flags": ["ONSITE_REQUIRED"]},
+            "retired": {"score": 10, "confidence": "Low", "flags": []},
+        },
+    }
+
+    diff = diff_against_baseline(metrics, case_snapshot(frame), baseline)
+
+    assert diff["metric_deltas"]["pass_rate"] == -0.25
+    assert diff["metric_deltas"]["confidence_brier"] == pytest.approx(0.2244 - 0.2, abs=1e-4)
+    assert diff["metric_deltas"]["cases"] == 0
+    assert diff["score_drift"] == [{"case_id": "onsite", "baseline": 40, "current": 65, "delta": 25}]
+    assert diff["flag_changes"] == [{"case_id": "onsite", "baseline": ["ONSITE_REQUIRED"], "current": []}]
+    assert diff["new_cases"] == 2
+
+    empty = diff_against_baseline(metrics, case_snapshot(frame), {})
+    assert (empty["score_drift"], empty["new_cases"]) == ([], 4)
+
+
+@pytest.mark.parametrize("endpoint", [
+    "https://kinokoholic.com/api/analyze",
+    "https://kinokoholic.com/api/analyze/",
+    "http://kinokoholic.com/api/analyze",
+    "https://www.kinokoholic.com/api/analyze",
+    "https://KINOKOHOLIC.com:443/api/analyze?x=1",
+    "kinokoholic.com/api/analyze",
+])
+def test_production_guard_matches_any_url_on_the_production_host(endpoint):
+    assert jd_calibration.is_production_endpoint(endpoint)
+
+
+@pytest.mark.parametrize("endpoint", [
+    jd_calibration.LOCAL_ENDPOINT,
+    "https://kinokoholic.com.example.net/api/analyze",
+    "https://staging-kinokoholic.com/api/analyze",
+])
+def test_production_guard_leaves_other_hosts_alone(endpoint):
+    assert not jd_calibration.is_production_endpoint(endpoint)
+
+
+def test_main_refuses_production_without_opt_in(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["jd_calibration.py", "--endpoint", "http://www.kinokoholic.com/api/analyze/"])
+    monkeypatch.setattr(jd_calibration, "run_cases", lambda *a: pytest.fail("must not send requests"))
+
+    assert jd_calibration.main() == 2
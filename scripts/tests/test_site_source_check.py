@@ -0,0 +1,76 @@
+import pytest
+
+import site_source_check
+from site_source_check import SourceIndex, run_checks
+
+PAGE = "---\nlayout: {layout}\ntitle: {title}\n---\nBody\n"
+
+
+def write(root, rel, text):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+@pytest.fixture
+def site(tmp_path):
+    root = tmp_path / "site"
+    write(root, "_config.yml", "title: Test\nexclude:\n  - vendor/\n  - README.md\n")
+    write(root, "_includes/header.html", "<header><nav><a href='/'>Home</a></nav></header>\n")
+    write(root, "_includes/footer.html", "<footer>(c)</footer>\n")
+    write(root, "_layouts/default.html", "{% include header.html %}\n{{ content }}\n{% include footer.html %}\n")
+    write(root, "_layouts/page.html", "---\nlayout: default\n---\n<article>{{ content }}</article>\n")
+    write(root, "_layouts/bare.html", "<main>{{ content }}</main>\n<footer></footer>\n")
+    for rel in ("index.md", "ja/index.md", "projects/alpha.md", "ja/projects/alpha.md"):
+        write(root, rel, PAGE.format(layout="page", title=rel))
+    write(root, "about.md", PAGE.format(layout="page", title="About"))  # No /ja/about/.
+    write(root, "ja/contact.md", PAGE.format(layout="page", title="Contact"))  # No /contact/.
+    write(root, "projects/jd-concierge-sandbox.md", PAGE.format(layout="page", title="Sandbox"))
+    write(root, "broken.md", PAGE.format(layout="missing", title="Broken"))
+    write(root, "ja/broken.md", PAGE.format(layout="bare", title="Broken JA"))
+    write(root, "vendor/ignored.md", PAGE.format(layout="missing", title="Vendored"))
+    return root
+
+
+def summarize(findings):
+    return sorted((f.feature.split(":")[0], f.path, f.severity, f.actual) for f in findings)
+
+
+def test_reports_missing_ja_page_broken_layouts_and_honours_exemptions(site):
+    findings = run_checks(SourceIndex(site).build())
+
+    assert summarize(findings) == [
+        ("Feature 2", "about.md", "CRITICAL", "No Japanese page exists"),
+        ("Feature 2", "ja/contact.md", "CRITICAL", "No English page exists"),
+        ("Feature 3", "broken.md", "CRITICAL", "Layout file not found"),
+        ("Feature 3", "ja/broken.md", "WARNING", "Layout 'bare' renders no navigation"),
+    ]
+
+
+def test_exemption_list_controls_parity(site, monkeypatch):
+    monkeypatch.setattr(site_source_check, "PAGES_WITHOUT_JA_PARITY", [])
+    findings = run_checks(SourceIndex(site).build())
+
+    parity = [f.path for f in findings if f.feature.startswith("Feature 2")]
+    assert "projects/jd-concierge-sandbox.md" in parity
+
+
+def test_only_paths_limits_report_unless_layouts_change(site):
+    index = SourceIndex(site).build()
+
+    assert [f.path for f in run_checks(index, ["about.md"])] == ["about.md"]
+    layout_findings = run_checks(index, ["_layouts/bare.html"])
+    assert {f.path for f in layout_findings} == {"broken.md", "ja/broken.md"}
+
+
+def test_cache_reparses_only_changed_files(site, tmp_path):
+    cache = tmp_path / "cache.json"
+    first = SourceIndex(site, cache_path=cache).build()
+    assert first.reused == 0 and first.parsed > 0
+
+    write(site, "ja/about.md", PAGE.format(layout="page", title="About JA"))
+    second = SourceIndex(site, cache_path=cache).build()
+
+    assert second.parsed == 1
+    assert second.reused == first.parsed
+    assert "about.md" not in [f.path for f in run_checks(second)]
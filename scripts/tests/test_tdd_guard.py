@@ -0,0 +1,133 @@
+import subprocess
+
+import pytest
+
+import tdd_guard
+
+
+def git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "config", "user.email", "guard@example.com")
+    git(tmp_path, "config", "user.name", "guard")
+    (tmp_path / "README.md").write_text("readme\n")
+    git(tmp_path, "add", "README.md")
+    git(tmp_path, "commit", "-q", "-m", "init")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def stage(repo, *paths):
+    for rel in paths:
+        target = repo / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(f"// {rel}\n")
+    git(repo, "add", *paths)
+
+
+def test_evaluate_paths_reports_source_without_test():
+    outcome = tdd_guard.evaluate_paths(["agentic-workflows/src/agent.py", "docs/notes.md"])
+    assert outcome.saw_changes
+    assert [(rule.name, files) for rule, files in outcome.violations] == [
+        ("Agentic workflows Python", ["agentic-workflows/src/agent.py"])
+    ]
+
+
+def test_evaluate_paths_passes_when_test_follows_source():
+    outcome = tdd_guard.evaluate_paths(
+        ["agentic-workflows/src/agent.py", "agentic-workflows/tests/test_agent.py"]
+    )
+    assert outcome.violations == []
+
+
+def test_patterns_are_anchored_at_the_repository_root():
+    outcome = tdd_guard.evaluate_paths(["site/assets/js/menu.js", "vendor/worker/src/index.ts"])
+    assert [rule.name for rule, _ in outcome.violations] == ["Site widget JavaScript"]
+
+
+def test_evaluate_paths_stops_once_every_rule_is_final():
+    consumed = []
+
+    def paths():
+        for path in ["assets/js/about.js", "tests/about.test.js", "zzz/a.md", "zzz/b.md"]:
+            consumed.append(path)
+            yield path
+
+    outcome = tdd_guard.evaluate_paths(paths())
+    assert outcome.violations == []
+    # "zzz/a.md" sorts after every rule root, so nothing later can change the result.
+    assert consumed == ["assets/js/about.js", "tests/about.test.js", "zzz/a.md"]
+
+
+def test_evaluate_paths_keeps_reading_while_a_rule_can_still_change():
+    outcome = tdd_guard.evaluate_paths(
+        ["agentic-workflows/src/agent.py", "assets/js/about.js", "tests/about.test.js"]
+    )
+    assert [rule.name for rule, _ in outcome.violations] == ["Agentic workflows Python"]
+
+
+def test_iter_git_diff_yields_sorted_paths(repo):
+    stage(repo, "b.md", "a.md", "agentic-workflows/src/agent.py")
+    assert tdd_guard.run_git_diff(staged=True, against="HEAD") == [
+        "a.md",
+        "agentic-workflows/src/agent.py",
+        "b.md",
+    ]
+
+
+def test_iter_git_diff_stops_git_when_closed_early(repo, monkeypatch):
+    stage(repo, *(f"docs/{index:03}.md" for index in range(50)))
+    procs = []
+    real_popen = subprocess.Popen
+
+    def recording_popen(*args, **kwargs):
+        proc = real_popen(*args, **kwargs)
+        procs.append(proc)
+        return proc
+
+    monkeypatch.setattr(tdd_guard.subprocess, "Popen", recording_popen)
+    paths = tdd_guard.iter_git_diff(staged=True, against="HEAD")
+    assert next(paths) == "docs/000.md"
+    paths.close()
+
+    (proc,) = procs
+    assert proc.returncode is not None
+    assert proc.stdout.closed and proc.stderr.closed
+
+
+def test_staged_cache_hits_until_the_index_changes(repo, monkeypatch):
+    stage(repo, "agentic-workflows/src/agent.py")
+    first = tdd_guard.run_guard(staged=True, against="HEAD")
+    assert [rule.name for rule, _ in first.violations] == ["Agentic workflows Python"]
+
+    def no_diff(**_kwargs):
+        raise AssertionError("git diff should not run on a cache hit")
+
+    monkeypatch.setattr(tdd_guard, "iter_git_diff", no_diff)
+    cached = tdd_guard.run_guard(staged=True, against="HEAD")
+    assert cached.violations == first.violations
+
+    monkeypatch.undo()
+    monkeypatch.chdir(repo)
+    stage(repo, "agentic-workflows/tests/test_agent.py")
+    assert tdd_guard.run_guard(staged=True, against="HEAD").violations == []
+
+
+def test_no_cache_always_runs_the_diff(repo, monkeypatch):
+    stage(repo, "docs/a.md")
+    tdd_guard.run_guard(staged=True, against="HEAD")
+    calls = []
+    real_iter = tdd_guard.iter_git_diff
+
+    def counting_iter(**kwargs):
+        calls.append(kwargs)
+        return real_iter(**kwargs)
+
+    monkeypatch.setattr(tdd_guard, "iter_git_diff", counting_iter)
+    tdd_guard.run_guard(staged=True, against="HEAD", use_cache=False)
+    tdd_guard.run_guard(staged=True, against="HEAD")
+    assert len(calls) == 1
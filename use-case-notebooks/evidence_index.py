@@ -0,0 +1,400 @@
+"""Offline BM25 evidence index used by ``02_rfp_response_assistant.ipynb``.
+
+Best-practice note:
+- Index approved evidence once; answer questions from postings, never a full scan.
+- Keep every passage traceable to a source file so drafts carry ``evidence_refs``.
+- Everything runs locally: no network, no hosted vector store.
+
+Layout of an index directory:
+- ``manifest.json``: per-source fingerprint (mtime/size/sha1), tokenized passages and
+  the ``generation`` of the arrays below.
+- ``term_ptr.<generation>.npy`` / ``post_doc.<generation>.npy`` / ``post_tf.<generation>.npy``:
+  CSR postings, memory-mapped.
+- ``doc_len.<generation>.npy``: passage lengths for BM25 length normalization.
+
+Each rebuild writes a new generation next to the old one and then swaps
+``manifest.json`` in with ``os.replace``, so a crash or a concurrent reader sees
+either the old index or the new one, never a mix.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import statistics
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Callable, Iterable
+
+import numpy as np
+import yaml
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_INDEX_DIR = Path(__file__).resolve().parent / "output" / "evidence_index"
+
+# Approved evidence corpus, relative to the repository root.
+DEFAULT_SOURCES = (
+    "about.md",
+    "work-history.md",
+    "projects/*.md",
+    "_data/projects/*.yml",
+    "use-case-notebooks/data/evidence/*.md",
+)
+
+ARRAY_NAMES = ("term_ptr", "post_doc", "post_tf", "doc_len")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_PASSAGE_WORDS = 120
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or our that the this to "
+    "was we were what when which with you your".split()
+)
+FRONT_MATTER_PATTERN = re.compile(r"\A---\n.*?\n---\n", re.S)
+MARKUP_PATTERN = re.compile(r"{%.*?%}|{{.*?}}|<[^>]+>", re.S)
+
+
+@dataclass
+class SearchHit:
+    ref: str
+    score: float
+    text: str
+
+
+@dataclass
+class UpdateStats:
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    passages: int = 0
+    seconds: float = 0.0
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "section"
+
+
+def collect_sources(root: Path = REPO_ROOT, patterns: Iterable[str] = DEFAULT_SOURCES) -> list[Path]:
+    paths: set[Path] = set()
+    for pattern in patterns:
+        paths.update(path for path in root.glob(pattern) if path.is_file())
+    return sorted(paths)
+
+
+def _windows(words: list[str], size: int = MAX_PASSAGE_WORDS) -> Iterable[str]:
+    for start in range(0, len(words), size):
+        yield " ".join(words[start : start + size])
+
+
+def split_markdown(text: str) -> list[tuple[str, str]]:
+    """Split markdown into ``(heading, passage)`` pairs of bounded length."""
+    body = MARKUP_PATTERN.sub(" ", FRONT_MATTER_PATTERN.sub("", text))
+    sections: list[tuple[str, list[str]]] = [("intro", [])]
+    for line in body.splitlines():
+        if line.lstrip().startswith("#"):
+            sections.append((line.strip("# ").strip(), []))
+        elif line.strip():
+            sections[-1][1].append(line.strip())
+
+    passages = []
+    for heading, lines in sections:
+        for window in _windows(" ".join(lines).split()):
+            passages.append((heading, window))
+    return passages
+
+
+def _flatten(value: object) -> list[str]:
+    if isinstance(value, dict):
+        return [text for key, item in value.items() if not str(key).endswith("_ja") for text in _flatten(item)]
+    if isinstance(value, list):
+        return [text for item in value for text in _flatten(item)]
+    return [str(value)] if value is not None else []
+
+
+def split_yaml(text: str) -> list[tuple[str, str]]:
+    """Split project data files into one passage group per top-level field."""
+    data = yaml.safe_load(text) or {}
+    passages = []
+    for key, value in data.items():
+        if str(key).endswith("_ja"):
+            continue
+        for window in _windows(" ".join(_flatten(value)).split()):
+            passages.append((str(key), window))
+    return passages
+
+
+def split_source(path: Path) -> list[tuple[str, str]]:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in {".yml", ".yaml"}:
+        return split_yaml(text)
+    return split_markdown(text)
+
+
+def _fingerprint(path: Path) -> dict:
+    stat = path.stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _write_atomic(path: Path, write: Callable[[IO[bytes]], None]) -> None:
+    """Write ``path`` through a temporary sibling so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            write(handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _array_path(index_dir: Path, name: str, generation: str) -> Path:
+    return index_dir / (f"{name}.{generation}.npy" if generation else f"{name}.npy")
+
+
+class EvidenceIndex:
+    """BM25 index over evidence passages with memory-mapped postings."""
+
+    def __init__(self, index_dir: Path = DEFAULT_INDEX_DIR, root: Path = REPO_ROOT) -> None:
+        self.index_dir = index_dir
+        self.root = root
+        self.manifest: dict = {"sources": {}}
+        self.vocab: dict[str, int] = {}
+        self.passages: list[dict] = []
+        self.term_ptr = np.zeros(1, dtype=np.int64)
+        self.post_doc = np.zeros(0, dtype=np.int32)
+        self.post_tf = np.zeros(0, dtype=np.float32)
+        self.doc_len = np.zeros(0, dtype=np.float32)
+        self._load()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.index_dir / "manifest.json"
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def _load(self) -> None:
+        if not self.manifest_path.exists():
+            return
+        self.manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        self._rebuild_views()
+        if self.passages:
+            generation = self.manifest.get("generation", "")
+            for name in ARRAY_NAMES:
+                setattr(self, name, np.load(_array_path(self.index_dir, name, generation), mmap_mode="r"))
+
+    def _rebuild_views(self) -> None:
+        self.passages = [
+            passage for source in sorted(self.manifest["sources"]) for passage in self.manifest["sources"][source]["passages"]
+        ]
+        self.vocab = {term: term_id for term_id, term in enumerate(self.manifest.get("vocab", []))}
+
+    def _rel(self, path: Path) -> str:
+        return path.resolve().relative_to(self.root.resolve()).as_posix()
+
+    def update(self, paths: Iterable[Path] | None = None) -> UpdateStats:
+        """Re-tokenize only new or modified sources, then rewrite the postings arrays.
+
+        Without ``paths`` the corpus is re-collected from ``DEFAULT_SOURCES``. With
+        ``paths``, only those files are re-checked and merged into the existing
+        index; other sources are kept unless they no longer exist on disk.
+        """
+        started = time.perf_counter()
+        stats = UpdateStats()
+        sources = self.manifest["sources"]
+        refreshed = False
+        if paths is None:
+            current = {self._rel(path): path for path in collect_sources(self.root)}
+            removed = [rel for rel in sources if rel not in current]
+        else:
+            current = {self._rel(path): path for path in paths}
+            removed = [rel for rel in sources if not (self.root / rel).is_file()]
+            current = {rel: path for rel, path in current.items() if path.is_file()}
+
+        for rel in removed:
+            del sources[rel]
+            stats.removed += 1
+
+        for rel, path in current.items():
+            fingerprint = _fingerprint(path)
+            entry = sources.get(rel)
+            if entry and entry["mtime_ns"] == fingerprint["mtime_ns"] and entry["size"] == fingerprint["size"]:
+                stats.unchanged += 1
+                continue
+            digest = hashlib.sha1(path.read_bytes()).hexdigest()
+            if entry and entry["sha1"] == digest:
+                entry.update(fingerprint)  # Touched but identical content.
+                refreshed = True
+                stats.unchanged += 1
+                continue
+            passages = [
+                {
+                    "ref": f"{rel}#{slugify(heading)}-{number}",
+                    "text": text,
+                    "counts": Counter(tokenize(f"{heading} {text}")),
+                }
+                for number, (heading, text) in enumerate(split_source(path), start=1)
+            ]
+            sources[rel] = {**fingerprint, "sha1": digest, "passages": passages}
+            if entry:
+                stats.changed += 1
+            else:
+                stats.added += 1
+
+        if stats.added or stats.changed or stats.removed or not self.manifest_path.exists():
+            self._write()
+        elif refreshed:
+            self._write_manifest()
+        stats.passages = len(self.passages)
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+    def _write(self) -> None:
+        passages = [
+            passage for source in sorted(self.manifest["sources"]) for passage in self.manifest["sources"][source]["passages"]
+        ]
+        vocab = sorted({term for passage in passages for term in passage["counts"]})
+        term_ids = {term: term_id for term_id, term in enumerate(vocab)}
+
+        postings: list[list[tuple[int, int]]] = [[] for _ in vocab]
+        doc_len = np.zeros(len(passages), dtype=np.float32)
+        for doc_id, passage in enumerate(passages):
+            doc_len[doc_id] = sum(passage["counts"].values())
+            for term, tf in passage["counts"].items():
+                postings[term_ids[term]].append((doc_id, tf))
+
+        term_ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        term_ptr[1:] = np.cumsum([len(items) for items in postings])
+        post_doc = np.fromiter((doc for items in postings for doc, _ in items), dtype=np.int32, count=int(term_ptr[-1]))
+        post_tf = np.fromiter((tf for items in postings for _, tf in items), dtype=np.float32, count=int(term_ptr[-1]))
+
+        # New arrays get a fresh generation so the files a loaded index has
+        # memory-mapped are never overwritten; the manifest swap publishes them.
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        previous = self.manifest.get("generation")
+        generation = f"{time.time_ns():x}"
+        for name, array in zip(ARRAY_NAMES, (term_ptr, post_doc, post_tf, doc_len)):
+            _write_atomic(_array_path(self.index_dir, name, generation), lambda handle, array=array: np.save(handle, array))
+        self.manifest["vocab"] = vocab
+        self.manifest["generation"] = generation
+        self._write_manifest()
+        self._load()
+        self._remove_stale_arrays(keep={generation, previous})
+
+    def _write_manifest(self) -> None:
+        payload = json.dumps(self.manifest, ensure_ascii=False).encode("utf-8")
+        _write_atomic(self.manifest_path, lambda handle: handle.write(payload))
+
+    def _remove_stale_arrays(self, keep: set[str | None]) -> None:
+        # The previous generation stays one round for readers that loaded its manifest.
+        keep_files = {
+            _array_path(self.index_dir, name, generation).name
+            for name in ARRAY_NAMES
+            for generation in keep
+            if generation is not None
+        }
+        for path in self.index_dir.glob("*.npy"):
+            if path.name not in keep_files:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass  # Still mapped on platforms that forbid it; removed next time.
+
+    def _term_scores(self, term_id: int, avg_len: float) -> tuple[np.ndarray, np.ndarray]:
+        n_docs = len(self.passages)
+        start, end = int(self.term_ptr[term_id]), int(self.term_ptr[term_id + 1])
+        docs = np.asarray(self.post_doc[start:end])
+        tf = np.asarray(self.post_tf[start:end])
+        idf = np.log(1.0 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+        norm = tf + BM25_K1 * (1.0 - BM25_B + BM25_B * np.asarray(self.doc_len[docs]) / avg_len)
+        return docs, idf * tf * (BM25_K1 + 1.0) / norm
+
+    def _rank(self, term_scores: list[tuple[np.ndarray, np.ndarray]], k: int) -> list[SearchHit]:
+        if not term_scores:
+            return []
+        candidates, inverse = np.unique(np.concatenate([docs for docs, _ in term_scores]), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate([weights for _, weights in term_scores]))
+        top = np.argsort(-scores)[:k]
+        return [
+            SearchHit(ref=self.passages[candidates[i]]["ref"], score=float(scores[i]), text=self.passages[candidates[i]]["text"])
+            for i in top
+        ]
+
+    def _query_terms(self, query: str) -> list[int]:
+        return sorted({self.vocab[token] for token in tokenize(query) if token in self.vocab})
+
+    def search(self, query: str, k: int = 5) -> list[SearchHit]:
+        """Score only passages that share a term with ``query``."""
+        if not len(self.passages):
+            return []
+        avg_len = float(np.mean(self.doc_len)) or 1.0
+        return self._rank([self._term_scores(term_id, avg_len) for term_id in self._query_terms(query)], k)
+
+    def search_batch(self, queries: list[str], k: int = 5) -> list[list[SearchHit]]:
+        """Answer many queries, reading each distinct term's postings once."""
+        if not len(self.passages):
+            return [[] for _ in queries]
+        avg_len = float(np.mean(self.doc_len)) or 1.0
+        query_terms = [self._query_terms(query) for query in queries]
+        shared = {term_id: self._term_scores(term_id, avg_len) for term_id in set().union(*query_terms)}
+        return [self._rank([shared[term_id] for term_id in term_ids], k) for term_ids in query_terms]
+
+
+def benchmark_queries(index: EvidenceIndex, queries: list[str], repeats: int = 20, k: int = 5) -> dict:
+    """Return query latency percentiles in milliseconds."""
+    timings = []
+    for _ in range(repeats):
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query, k=k)
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "queries": len(timings),
+        "passages": len(index),
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(0.95 * (len(timings) - 1))], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and query the offline RFP evidence index")
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR, type=Path)
+    parser.add_argument("--query", action="append", default=[])
+    parser.add_argument("--k", default=5, type=int)
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    index = EvidenceIndex(args.index_dir)
+    stats = index.update()
+    print(
+        f"Index: {stats.passages} passages "
+        f"(added {stats.added}, changed {stats.changed}, removed {stats.removed}) in {stats.seconds:.3f}s"
+    )
+    for query in args.query:
+        print(f"\nQ: {query}")
+        for hit in index.search(query, k=args.k):
+            print(f"  {hit.score:6.2f}  {hit.ref}")
+    if args.benchmark:
+        print(json.dumps(benchmark_queries(index, args.query or ["incident response uptime"], k=args.k), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Batch RFP answering over the offline evidence index.
+
+Best-practice note:
+- Deduplicate near-identical questions before spending retrieval or model calls.
+- Retrieve for the whole batch at once; near-duplicates reuse their representative's hits.
+- Cap concurrent generation calls so provider rate limits are respected.
+- Report per-stage timings so the slow stage is obvious.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from evidence_index import EvidenceIndex, SearchHit, tokenize
+
+
+DEFAULT_MODEL = "opus-4.6"
+DEFAULT_PROMPT_VERSION = "v1.0"
+DEFAULT_TOP_K = 3
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_SIMILARITY = 0.85
+
+# Schema assumption: CSV with `question_id` and `question` columns.
+ID_COLUMN = "question_id"
+QUESTION_COLUMN = "question"
+OUTPUT_COLUMNS = ("answer", "evidence_refs", "confidence")
+
+
+@dataclass
+class BatchReport:
+    questions: int = 0
+    unique_questions: int = 0
+    generation_calls: int = 0
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {
+            "questions": self.questions,
+            "unique_questions": self.unique_questions,
+            "generation_calls": self.generation_calls,
+            "stage_seconds": {stage: round(seconds, 4) for stage, seconds in self.stage_seconds.items()},
+        }
+
+
+def question_key(question: str) -> frozenset[str]:
+    """Order-, case- and punctuation-insensitive content words of a question."""
+    return frozenset(tokenize(question))
+
+
+def jaccard(left: frozenset[str], right: frozenset[str]) -> float:
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+def group_questions(questions: list[str], threshold: float = DEFAULT_SIMILARITY) -> list[int]:
+    """Map each question to the index of its representative (first near-duplicate seen)."""
+    keys = [question_key(question) for question in questions]
+    exact: dict[frozenset[str], int] = {}
+    representatives: list[int] = []
+    assignment: list[int] = []
+    for position, key in enumerate(keys):
+        if key in exact:
+            assignment.append(exact[key])
+            continue
+        match = next((rep for rep in representatives if jaccard(keys[rep], key) >= threshold), None)
+        if match is None:
+            representatives.append(position)
+            match = position
+        exact[key] = match
+        assignment.append(match)
+    return assignment
+
+
+def score_confidence(hits: list[SearchHit]) -> float:
+    # Saturating map from the top BM25 score; no evidence means no confidence.
+    if not hits:
+        return 0.0
+    top = hits[0].score
+    return round(min(0.95, top / (top + 2.0)), 2)
+
+
+def fake_generate(model: str, prompt_version: str, question: str, passages: list[str]) -> str:
+    # Replace this stub with a real provider call constrained to ``passages``.
+    _ = (model, prompt_version, question)
+    if not passages:
+        return "No approved evidence found; route to an SME."
+    return " ".join(passages[:2])
+
+
+def answer_batch(
+    frame: pd.DataFrame,
+    index: EvidenceIndex,
+    model: str = DEFAULT_MODEL,
+    prompt_version: str = DEFAULT_PROMPT_VERSION,
+    top_k: int = DEFAULT_TOP_K,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    similarity: float = DEFAULT_SIMILARITY,
+) -> tuple[pd.DataFrame, BatchReport]:
+    """Fill ``answer``, ``evidence_refs`` and ``confidence`` for every question row."""
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+    report = BatchReport(questions=len(frame))
+    questions = frame[QUESTION_COLUMN].fillna("").astype(str).tolist()
+
+    started = time.perf_counter()
+    assignment = group_questions(questions, threshold=similarity)
+    unique = sorted(set(assignment))
+    report.unique_questions = len(unique)
+    report.stage_seconds["dedupe"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch_hits = index.search_batch([questions[position] for position in unique], k=top_k)
+    by_position = dict(zip(unique, batch_hits))
+    report.stage_seconds["retrieve"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        futures = {
+            position: pool.submit(
+                fake_generate, model, prompt_version, questions[position], [hit.text for hit in by_position[position]]
+            )
+            for position in unique
+        }
+        answers = {position: future.result() for position, future in futures.items()}
+    report.generation_calls = len(unique)
+    report.stage_seconds["generate"] = time.perf_counter() - started
+
+    result = frame.copy()
+    result["answer"] = [answers[rep] for rep in assignment]
+    result["evidence_refs"] = [[hit.ref for hit in by_position[rep]] for rep in assignment]
+    result["confidence"] = [score_confidence(by_position[rep]) for rep in assignment]
+    return result, report
+
+
+def answer_csv(input_path: Path, output_path: Path, index: EvidenceIndex | None = None, **options) -> BatchReport:
+    """Read a questions CSV, answer it as one batch and write the filled CSV."""
+    started = time.perf_counter()
+    frame = pd.read_csv(input_path, dtype={ID_COLUMN: "string", QUESTION_COLUMN: "string"})
+    if index is None:
+        index = EvidenceIndex()
+        index.update()
+    load_seconds = time.perf_counter() - started
+
+    result, report = answer_batch(frame, index, **options)
+
+    started = time.perf_counter()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    result.assign(evidence_refs=result["evidence_refs"].str.join("; ")).to_csv(output_path, index=False)
+    report.stage_seconds = {"load": load_seconds, **report.stage_seconds, "write": time.perf_counter() - started}
+    return report
+
+
+def positive_int(raw: str) -> int:
+    value = int(raw)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"Expected an integer >= 1, got {raw!r}")
+    return value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Answer an RFP questions CSV in one batch")
+    parser.add_argument("--input", required=True, type=Path)
+    parser.add_argument("--output", required=True, type=Path)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--prompt-version", default=DEFAULT_PROMPT_VERSION)
+    parser.add_argument("--top-k", default=DEFAULT_TOP_K, type=int)
+    parser.add_argument("--max-concurrency", default=DEFAULT_MAX_CONCURRENCY, type=positive_int)
+    parser.add_argument("--similarity", default=DEFAULT_SIMILARITY, type=float)
+    args = parser.parse_args()
+
+    report = answer_csv(
+        args.input,
+        args.output,
+        model=args.model,
+        prompt_version=args.prompt_version,
+        top_k=args.top_k,
+        max_concurrency=args.max_concurrency,
+        similarity=args.similarity,
+    )
+    print(f"Answered {report.questions} questions ({report.unique_questions} unique) -> {args.output}")
+    for stage, seconds in report.stage_seconds.items():
+        print(f"  {stage:<9} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
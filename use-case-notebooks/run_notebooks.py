@@ -0,0 +1,519 @@
+"""Headless, parallel runner for the use-case notebooks.
+
+Best-practice note:
+- Notebooks stay the readable artifact; batch jobs execute them unchanged with
+  parameters injected after the cell tagged ``parameters`` (papermill style).
+- Each notebook runs in its own worker process with a fresh namespace, so no
+  Jupyter server or kernel is needed on the batch host.
+- Cell results are cached under a chained hash of (parameters, local modules,
+  data and evidence sources, every cell source up to and including the cell).
+  An unchanged prefix is restored from a namespace snapshot instead of being
+  re-executed.
+- Each notebook writes its files (Parquet exports, the evidence index) under
+  its own ``output/<notebook stem>/`` directory. Files a cell writes there are
+  cached with its outputs and put back when the cell is replayed, so later
+  cells and downstream jobs see the same files as after a real run. Writes are
+  found by diffing only that directory around each cell, so notebooks running
+  in parallel never claim each other's files.
+- The cache is pruned least-recently-used to ``--cache-max-mb`` after each run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+import traceback
+import tracemalloc
+import types
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from evidence_index import REPO_ROOT, collect_sources
+
+NOTEBOOK_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT_DIR = NOTEBOOK_DIR / "output" / "executed"
+DEFAULT_CACHE_DIR = NOTEBOOK_DIR / "output" / "notebook_cache"
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+EVICT_TO_FRACTION = 0.9  # Prune below the limit so the next run does not prune again.
+CACHE_VERSION = 3
+PARAMETERS_TAG = "parameters"
+INJECTED_TAG = "injected-parameters"
+MAX_REPR_CHARS = 20_000
+
+
+@dataclass
+class CellRun:
+    index: int
+    status: str  # "ran" | "cached" | "error"
+    duration_ms: float = 0.0
+    peak_memory_kb: float | None = None
+
+
+@dataclass
+class NotebookRun:
+    notebook: str
+    output: str
+    ok: bool
+    duration_ms: float
+    cells: list[CellRun] = field(default_factory=list)
+    error: str = ""
+
+    @property
+    def cached_cells(self) -> int:
+        return sum(1 for cell in self.cells if cell.status == "cached")
+
+
+def parse_parameter(raw: str) -> tuple[str, Any]:
+    """``NAME=VALUE``; VALUE is read as JSON when possible (numbers, booleans), else a string."""
+    name, sep, value = raw.partition("=")
+    if not sep or not name.isidentifier():
+        raise argparse.ArgumentTypeError(f"Expected NAME=VALUE, got {raw!r}")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+
+def _path_assignments(source: str) -> set[str]:
+    """Names the parameters cell assigns from a ``Path(...)`` call."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return set()
+    names = set()
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and isinstance(node.value, ast.Call)
+            and isinstance(node.value.func, ast.Name)
+            and node.value.func.id == "Path"
+        ):
+            names.update(target.id for target in node.targets if isinstance(target, ast.Name))
+    return names
+
+
+def inject_parameters(cells: list[dict], parameters: dict[str, Any]) -> list[dict]:
+    """Insert an ``injected-parameters`` cell after the ``parameters`` cell (or the first code cell)."""
+    if not parameters:
+        return cells
+    code_cells = [i for i, cell in enumerate(cells) if cell["cell_type"] == "code"]
+    if not code_cells:
+        raise ValueError("Notebook has no code cell to parameterize")
+    tagged = [i for i in code_cells if PARAMETERS_TAG in cells[i].get("metadata", {}).get("tags", [])]
+    anchor = tagged[0] if tagged else code_cells[0]
+    path_names = _path_assignments("".join(cells[anchor]["source"]))
+
+    lines = ["# Parameters injected by run_notebooks.py"]
+    for name, value in parameters.items():
+        rendered = f"Path({str(value)!r})" if name in path_names else repr(value)
+        lines.append(f"{name} = {rendered}")
+    injected = {
+        "cell_type": "code",
+        "execution_count": None,
+        "metadata": {"tags": [INJECTED_TAG]},
+        "outputs": [],
+        "source": "\n".join(lines) + "\n",
+    }
+    return cells[: anchor + 1] + [injected] + cells[anchor + 1 :]
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def inputs_fingerprint(parameters: dict[str, Any], root: Path = NOTEBOOK_DIR) -> str:
+    """Seed of the hash chain: parameters, Python version, local modules, data files and evidence sources."""
+    material: list[Any] = [CACHE_VERSION, sys.version_info[:2], sorted(parameters.items(), key=lambda kv: kv[0])]
+    for module in sorted(root.glob("*.py")):
+        material.append([module.name, _file_digest(module)])
+    data_files = {path for path in (root / "data").rglob("*") if path.is_file()}
+    # Portfolio pages under the repository root that the evidence index reads.
+    data_files.update(collect_sources(REPO_ROOT))
+    for value in parameters.values():
+        candidate = (root / str(value)) if not Path(str(value)).is_absolute() else Path(str(value))
+        if isinstance(value, str) and candidate.is_file():
+            data_files.add(candidate)
+    for path in sorted(data_files):
+        # Size + mtime keeps full-dataset runs from re-hashing gigabytes on every start.
+        stat = path.stat()
+        material.append([str(path), stat.st_size, stat.st_mtime_ns])
+    return hashlib.sha256(json.dumps(material, default=str).encode("utf-8")).hexdigest()
+
+
+def chain_keys(cells: list[dict], seed: str) -> list[str]:
+    keys, previous = [], seed
+    for cell in cells:
+        if cell["cell_type"] == "code":
+            previous = hashlib.sha256((previous + "\0" + "".join(cell["source"])).encode("utf-8")).hexdigest()
+        keys.append(previous)
+    return keys
+
+
+def notebook_output_dir(notebook_path: Path) -> Path:
+    """The directory a notebook writes its files to; only writes there are cached with its cells."""
+    return notebook_path.parent / "output" / notebook_path.stem
+
+
+def _scan_files(root: Path, exclude: list[Path]) -> dict[Path, tuple[int, int]]:
+    """(size, mtime) of every file under ``root``; bytecode and ``exclude`` subtrees are skipped."""
+    files = {}
+    for path in root.rglob("*"):
+        if "__pycache__" in path.parts or any(path.is_relative_to(skip) for skip in exclude):
+            continue
+        with contextlib.suppress(OSError):
+            if path.is_file():
+                stat = path.stat()
+                files[path] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+class CellCache:
+    """``<key>.json`` holds a cell's outputs and written files; ``<key>.pkl`` the namespace snapshot after it.
+
+    Files a cell wrote are copied to ``<key>.files/``. The ``.json`` mtime marks
+    when the entry was last used; ``prune`` drops whole entries oldest first.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _entry(self, key: str) -> dict[str, Any] | None:
+        path = self.root / f"{key}.json"
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return entry
+
+    def outputs(self, key: str) -> list[dict] | None:
+        entry = self._entry(key)
+        return entry["outputs"] if entry is not None else None
+
+    def save_outputs(
+        self, key: str, outputs: list[dict], written: list[Path] | None = None, base: Path = NOTEBOOK_DIR
+    ) -> None:
+        files = {}
+        if written:
+            store = self.root / f"{key}.files"
+            shutil.rmtree(store, ignore_errors=True)
+            store.mkdir()
+            for number, path in enumerate(sorted(written)):
+                shutil.copy2(path, store / str(number))
+                files[str(path.relative_to(base))] = str(number)
+        tmp = self.root / f".{key}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps({"outputs": outputs, "files": files}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.root / f"{key}.json")
+
+    def restore_files(self, key: str, base: Path = NOTEBOOK_DIR) -> int:
+        """Put back the files the cell wrote, unless an identical copy is already in place."""
+        entry = self._entry(key) or {}
+        restored = 0
+        for name, stored in entry.get("files", {}).items():
+            source, target = self.root / f"{key}.files" / stored, base / name
+            cached = source.stat()
+            with contextlib.suppress(FileNotFoundError):
+                current = target.stat()
+                if (current.st_size, current.st_mtime_ns) == (cached.st_size, cached.st_mtime_ns):
+                    continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+            restored += 1
+        return restored
+
+    def has_snapshot(self, key: str) -> bool:
+        return (self.root / f"{key}.pkl").exists()
+
+    def load_snapshot(self, key: str) -> dict[str, Any]:
+        return restore_namespace(pickle.loads((self.root / f"{key}.pkl").read_bytes()))
+
+    def save_snapshot(self, key: str, namespace: dict[str, Any]) -> bool:
+        snapshot = snapshot_namespace(namespace)
+        if snapshot is None:
+            return False
+        tmp = self.root / f".{key}.{os.getpid()}.pkl.tmp"
+        tmp.write_bytes(snapshot)
+        os.replace(tmp, self.root / f"{key}.pkl")
+        return True
+
+    def prune(self) -> int:
+        """Drop least-recently-used entries (outputs, snapshot and files) once over ``max_bytes``."""
+        sizes: dict[str, int] = {}
+        for path in self.root.iterdir():
+            key = path.name.split(".", 1)[0]
+            if not key:
+                continue  # Temporary file of an interrupted write.
+            files = path.rglob("*") if path.is_dir() else [path]
+            sizes[key] = sizes.get(key, 0) + sum(item.stat().st_size for item in files if item.is_file())
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return 0
+
+        def last_used(key: str) -> float:
+            with contextlib.suppress(FileNotFoundError):
+                return (self.root / f"{key}.json").stat().st_mtime
+            return 0.0  # Orphaned snapshot or files: drop first.
+
+        target = int(self.max_bytes * EVICT_TO_FRACTION)
+        evicted = 0
+        for key in sorted(sizes, key=last_used):
+            if total <= target:
+                break
+            for suffix in (".json", ".pkl"):
+                (self.root / f"{key}{suffix}").unlink(missing_ok=True)
+            shutil.rmtree(self.root / f"{key}.files", ignore_errors=True)
+            total -= sizes[key]
+            evicted += 1
+        return evicted
+
+
+def snapshot_namespace(namespace: dict[str, Any]) -> bytes | None:
+    """Pickle user variables; modules and importable functions are stored by name.
+
+    Returns None when any variable cannot be captured (open files, memory
+    maps, ...), so that cell is never used as a resume point.
+    """
+    entries = {}
+    for name, value in namespace.items():
+        if name.startswith("__"):
+            continue
+        if isinstance(value, types.ModuleType):
+            entries[name] = ("module", value.__name__)
+            continue
+        module = getattr(value, "__module__", None)
+        qualname = getattr(value, "__qualname__", None)
+        if (isinstance(value, (types.FunctionType, type)) and module and qualname and module != "__main__"
+                and "<" not in qualname):
+            entries[name] = ("ref", module, qualname)
+            continue
+        try:
+            entries[name] = ("value", pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return None
+    return pickle.dumps(entries, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def restore_namespace(entries: dict[str, tuple]) -> dict[str, Any]:
+    namespace: dict[str, Any] = {"__name__": "__main__"}
+    for name, entry in entries.items():
+        if entry[0] == "module":
+            namespace[name] = importlib.import_module(entry[1])
+        elif entry[0] == "ref":
+            target: Any = importlib.import_module(entry[1])
+            for part in entry[2].split("."):
+                target = getattr(target, part)
+            namespace[name] = target
+        else:
+            namespace[name] = pickle.loads(entry[1])
+    return namespace
+
+
+def execute_cell(source: str, namespace: dict[str, Any], label: str) -> list[dict]:
+    """Run one cell like a kernel would: stdout as a stream, the last expression as a result."""
+    tree = ast.parse(source, filename=label)
+    tail = None
+    if tree.body and isinstance(tree.body[-1], ast.Expr):
+        tail = ast.Expression(tree.body.pop().value)
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        exec(compile(tree, label, "exec"), namespace)
+        value = eval(compile(tail, label, "eval"), namespace) if tail is not None else None
+    outputs = []
+    if stdout.getvalue():
+        outputs.append({"output_type": "stream", "name": "stdout", "text": stdout.getvalue()})
+    if value is not None:
+        text = value.to_string() if hasattr(value, "to_string") else repr(value)
+        outputs.append({"output_type": "execute_result", "metadata": {}, "data": {"text/plain": text[:MAX_REPR_CHARS]}})
+    return outputs
+
+
+def run_notebook(
+    path: str,
+    parameters: dict[str, Any],
+    output_dir: str,
+    cache_dir: str | None,
+    track_memory: bool = True,
+) -> NotebookRun:
+    """Execute one notebook in this process (the pool gives each notebook its own interpreter)."""
+    started = time.perf_counter()
+    notebook_path = Path(path).resolve()
+    os.chdir(notebook_path.parent)  # Notebooks use paths relative to their directory.
+    if str(notebook_path.parent) not in sys.path:
+        sys.path.insert(0, str(notebook_path.parent))
+
+    notebook = json.loads(notebook_path.read_text(encoding="utf-8"))
+    cells = inject_parameters(notebook["cells"], parameters)
+    keys = chain_keys(cells, inputs_fingerprint(parameters, notebook_path.parent))
+    cache = CellCache(Path(cache_dir)) if cache_dir else None
+    # Files written under the notebook's own output directory are cached with the cell that wrote them;
+    # paths are stored relative to the notebook directory.
+    base = notebook_path.parent
+    watched = notebook_output_dir(notebook_path)
+    unwatched = [Path(output_dir).resolve()] + ([Path(cache_dir).resolve()] if cache_dir else [])
+    code_indices = [i for i, cell in enumerate(cells) if cell["cell_type"] == "code"]
+
+    # Longest cached prefix, then the latest snapshot inside it to resume from.
+    cached_prefix = 0
+    if cache is not None:
+        for i in code_indices:
+            if cache.outputs(keys[i]) is None:
+                break
+            cached_prefix += 1
+    if cached_prefix == len(code_indices):
+        resume = cached_prefix  # Nothing changed: replay outputs, execute nothing.
+    else:
+        resume = cached_prefix
+        while resume and not cache.has_snapshot(keys[code_indices[resume - 1]]):
+            resume -= 1
+
+    run = NotebookRun(notebook=notebook_path.name, output="", ok=True, duration_ms=0.0)
+    namespace: dict[str, Any] = {"__name__": "__main__"}
+    if resume and resume < len(code_indices):
+        namespace = cache.load_snapshot(keys[code_indices[resume - 1]])
+    if track_memory:
+        tracemalloc.start()
+
+    for position, i in enumerate(code_indices, start=1):
+        cell = cells[i]
+        cell["execution_count"] = position
+        if position <= resume:
+            cache.restore_files(keys[i], base)
+            cell["outputs"] = cache.outputs(keys[i])
+            cell["metadata"]["execution"] = {"cached": True}
+            run.cells.append(CellRun(index=i, status="cached"))
+            continue
+        files_before = _scan_files(watched, unwatched) if cache is not None else {}
+        if track_memory:
+            tracemalloc.reset_peak()
+        cell_started = time.perf_counter()
+        try:
+            outputs = execute_cell("".join(cell["source"]), namespace, f"<{notebook_path.name} cell {i}>")
+            status = "ran"
+        except Exception as error:
+            outputs = [{
+                "output_type": "error",
+                "ename": type(error).__name__,
+                "evalue": str(error),
+                "traceback": traceback.format_exc().splitlines(),
+            }]
+            status = "error"
+        duration_ms = (time.perf_counter() - cell_started) * 1000
+        peak_kb = tracemalloc.get_traced_memory()[1] / 1024 if track_memory else None
+        cell["outputs"] = outputs
+        cell["metadata"]["execution"] = {
+            "cached": False,
+            "duration_ms": round(duration_ms, 1),
+            "peak_memory_kb": round(peak_kb, 1) if peak_kb is not None else None,
+        }
+        run.cells.append(CellRun(index=i, status=status, duration_ms=round(duration_ms, 1),
+                                 peak_memory_kb=round(peak_kb, 1) if peak_kb is not None else None))
+        if status == "error":
+            run.ok = False
+            run.error = f"cell {i}: {outputs[0]['ename']}: {outputs[0]['evalue']}"
+            break
+        if cache is not None:
+            written = [path for path, stat in _scan_files(watched, unwatched).items() if files_before.get(path) != stat]
+            cache.save_outputs(keys[i], outputs, written, base)
+            cache.save_snapshot(keys[i], namespace)
+
+    if track_memory:
+        tracemalloc.stop()
+    notebook["cells"] = cells
+    notebook.setdefault("metadata", {})["run_notebooks"] = {"parameters": parameters, "ok": run.ok}
+    target = Path(output_dir) / notebook_path.name
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(json.dumps(notebook, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    run.output = str(target)
+    run.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    return run
+
+
+def run_all(
+    notebooks: list[Path],
+    parameters: dict[str, Any],
+    output_dir: Path = DEFAULT_OUTPUT_DIR,
+    cache_dir: Path | None = DEFAULT_CACHE_DIR,
+    workers: int | None = None,
+    track_memory: bool = True,
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+) -> list[NotebookRun]:
+    workers = workers or min(len(notebooks), os.cpu_count() or 1)
+    # A fresh process per notebook: namespaces, cwd and tracemalloc never leak between notebooks.
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        futures = [
+            pool.submit(run_notebook, str(path), parameters, str(output_dir), str(cache_dir) if cache_dir else None,
+                        track_memory)
+            for path in notebooks
+        ]
+        runs = [future.result() for future in futures]
+    if cache_dir:
+        # Pruned here, after every worker exited, so no run loses an entry it is replaying.
+        CellCache(cache_dir, cache_max_bytes).prune()
+    return runs
+
+
+def format_report(runs: list[NotebookRun]) -> str:
+    lines = []
+    for run in runs:
+        status = "ok" if run.ok else f"FAILED ({run.error})"
+        lines.append(f"{run.notebook}: {status} in {run.duration_ms / 1000:.2f}s, "
+                     f"{run.cached_cells}/{len(run.cells)} cells from cache -> {run.output}")
+        for cell in run.cells:
+            memory = f"{cell.peak_memory_kb:,.0f} KiB peak" if cell.peak_memory_kb is not None else ""
+            lines.append(f"  cell {cell.index:>2}  {cell.status:<8} {cell.duration_ms:>9.1f} ms  {memory}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Execute use-case notebooks headlessly and in parallel")
+    parser.add_argument("notebooks", nargs="*", type=Path, help="Default: every *.ipynb next to this script")
+    parser.add_argument("-p", "--parameter", action="append", default=[], type=parse_parameter,
+                        metavar="NAME=VALUE", help="Inject a parameter, e.g. -p MODEL=glm -p TICKETS_PATH=/data/t.csv")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="Execute every cell")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_CACHE_MAX_BYTES / (1024 * 1024),
+                        help="Prune the cell cache to this size after the run")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc (it slows allocation-heavy cells)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--report", type=Path, help="Write the run report as JSON")
+    args = parser.parse_args()
+
+    notebooks = [path.resolve() for path in args.notebooks] or sorted(NOTEBOOK_DIR.glob("*.ipynb"))
+    runs = run_all(
+        notebooks,
+        dict(args.parameter),
+        output_dir=args.output_dir.resolve(),
+        cache_dir=None if args.no_cache else args.cache_dir.resolve(),
+        workers=args.workers,
+        track_memory=not args.no_memory,
+        cache_max_bytes=int(args.cache_max_mb * 1024 * 1024),
+    )
+    print(format_report(runs))
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps([asdict(run) for run in runs], indent=2) + "\n", encoding="utf-8")
+    if not all(run.ok for run in runs):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
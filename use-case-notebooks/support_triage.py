@@ -0,0 +1,210 @@
+"""Chunked support-ticket triage used by ``01_customer_support_triage.ipynb``.
+
+Best-practice note:
+- Keep routing rules explicit and versioned next to the notebook, not inside it.
+- Stream large CSV exports chunk by chunk; never materialize the full file.
+- Report throughput so prompt/model changes can be compared on the same data.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - surfaced when writing output
+    pa = None
+    pq = None
+
+
+DEFAULT_MODEL = "codex-5.3"
+DEFAULT_PROMPT_VERSION = "v1.0"
+DEFAULT_CHUNKSIZE = 50_000
+DEFAULT_BATCH_SIZE = 256
+
+# Schema assumption: one row per ticket with an id and free-text body.
+ID_COLUMN = "ticket_id"
+TEXT_COLUMN = "text"
+
+# Ordered: the first matching team wins when a ticket mentions several areas.
+TEAM_RULES: tuple[tuple[str, str], ...] = (
+    ("security-ops", r"\b(?:breach|phish\w*|hack\w*|unauthori[sz]ed|2fa|mfa|password reset)\b"),
+    ("billing-ops", r"\b(?:bill\w*|invoice\w*|charge\w*|refund\w*|payment\w*|plan upgrade|subscription)\b"),
+    ("platform-sre", r"\b(?:outage|down|5\d\d|timeout\w*|latency|slow|error rate|unavailable)\b"),
+    ("account-support", r"\b(?:login|log in|account|profile|email change|locked out)\b"),
+)
+DEFAULT_TEAM = "general-support"
+
+HIGH_PRIORITY_PATTERN = (
+    r"\b(?:urgent|asap|outage|down|breach|fail\w*|repeated\w*|cannot|can't|blocked|data loss)\b"
+)
+LOW_PRIORITY_PATTERN = r"\b(?:question|how do i|feature request|suggestion|feedback|typo)\b"
+
+OUTPUT_SCHEMA = (
+    pa.schema(
+        [
+            (ID_COLUMN, pa.string()),
+            (TEXT_COLUMN, pa.string()),
+            ("priority", pa.string()),
+            ("assigned_team", pa.string()),
+            ("reason", pa.string()),
+            ("model", pa.string()),
+            ("prompt_version", pa.string()),
+        ]
+    )
+    if pa is not None
+    else None
+)
+
+
+@dataclass
+class TriageStats:
+    tickets: int = 0
+    chunks: int = 0
+    model_calls: int = 0
+    seconds: float = 0.0
+
+    @property
+    def tickets_per_second(self) -> float:
+        return self.tickets / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "tickets": self.tickets,
+            "chunks": self.chunks,
+            "model_calls": self.model_calls,
+            "seconds": round(self.seconds, 4),
+            "tickets_per_second": round(self.tickets_per_second, 1),
+        }
+
+
+def load_ticket_chunks(path: Path, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """Yield ticket frames of at most ``chunksize`` rows."""
+    reader = pd.read_csv(
+        path,
+        usecols=[ID_COLUMN, TEXT_COLUMN],
+        dtype={ID_COLUMN: "string", TEXT_COLUMN: "string"},
+        chunksize=chunksize,
+    )
+    with reader:
+        for chunk in reader:
+            chunk[TEXT_COLUMN] = chunk[TEXT_COLUMN].fillna("")
+            yield chunk
+
+
+def rule_features(texts: pd.Series) -> pd.DataFrame:
+    """Boolean keyword features, one column per team plus priority hints."""
+    lowered = texts.str.lower()
+    features = {
+        f"is_{team}": lowered.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+        for team, pattern in TEAM_RULES
+    }
+    features["is_high"] = lowered.str.contains(HIGH_PRIORITY_PATTERN, regex=True).to_numpy(dtype=bool)
+    features["is_low"] = lowered.str.contains(LOW_PRIORITY_PATTERN, regex=True).to_numpy(dtype=bool)
+    return pd.DataFrame(features, index=texts.index)
+
+
+def assign_routing(features: pd.DataFrame) -> pd.DataFrame:
+    """Derive ``priority`` and ``assigned_team`` from rule features without row loops."""
+    team_conditions = [features[f"is_{team}"].to_numpy() for team, _ in TEAM_RULES]
+    assigned_team = np.select(team_conditions, [team for team, _ in TEAM_RULES], default=DEFAULT_TEAM)
+
+    is_security = features["is_security-ops"].to_numpy()
+    priority = np.select(
+        [is_security | features["is_high"].to_numpy(), features["is_low"].to_numpy()],
+        ["high", "low"],
+        default="medium",
+    )
+    return pd.DataFrame({"priority": priority, "assigned_team": assigned_team}, index=features.index)
+
+
+def fake_model_batch(model: str, prompt_version: str, tickets: pd.DataFrame) -> list[str]:
+    # Replace this stub with one batched provider call per ``tickets`` frame.
+    _ = (model, prompt_version)
+    return [
+        f"{priority} priority routed to {team} by keyword rules"
+        for priority, team in zip(tickets["priority"], tickets["assigned_team"])
+    ]
+
+
+def triage_frame(
+    frame: pd.DataFrame,
+    model: str = DEFAULT_MODEL,
+    prompt_version: str = DEFAULT_PROMPT_VERSION,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    stats: TriageStats | None = None,
+) -> pd.DataFrame:
+    """Triage one chunk: vectorized routing, then batched model calls for reasons."""
+    routed = frame[[ID_COLUMN, TEXT_COLUMN]].join(assign_routing(rule_features(frame[TEXT_COLUMN])))
+
+    reasons: list[str] = []
+    for start in range(0, len(routed), batch_size):
+        reasons.extend(fake_model_batch(model, prompt_version, routed.iloc[start : start + batch_size]))
+        if stats is not None:
+            stats.model_calls += 1
+
+    routed["reason"] = reasons
+    routed["model"] = model
+    routed["prompt_version"] = prompt_version
+    return routed
+
+
+def triage_csv(
+    input_path: Path,
+    output_path: Path,
+    model: str = DEFAULT_MODEL,
+    prompt_version: str = DEFAULT_PROMPT_VERSION,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> TriageStats:
+    """Stream ``input_path`` through triage and append each chunk to a Parquet file."""
+    if pq is None:
+        raise ImportError("Writing Parquet requires pyarrow. Run: pip install -r requirements.txt")
+
+    stats = TriageStats()
+    started = time.perf_counter()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with pq.ParquetWriter(output_path, OUTPUT_SCHEMA) as writer:
+        for chunk in load_ticket_chunks(input_path, chunksize=chunksize):
+            triaged = triage_frame(chunk, model, prompt_version, batch_size, stats)
+            writer.write_table(pa.Table.from_pandas(triaged, schema=OUTPUT_SCHEMA, preserve_index=False))
+            stats.tickets += len(triaged)
+            stats.chunks += 1
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Triage a support ticket CSV export")
+    parser.add_argument("--input", required=True, type=Path)
+    parser.add_argument("--output", required=True, type=Path)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--prompt-version", default=DEFAULT_PROMPT_VERSION)
+    parser.add_argument("--chunksize", default=DEFAULT_CHUNKSIZE, type=int)
+    parser.add_argument("--batch-size", default=DEFAULT_BATCH_SIZE, type=int)
+    args = parser.parse_args()
+
+    stats = triage_csv(
+        args.input,
+        args.output,
+        model=args.model,
+        prompt_version=args.prompt_version,
+        chunksize=args.chunksize,
+        batch_size=args.batch_size,
+    )
+    print(
+        f"Triaged {stats.tickets} tickets in {stats.seconds:.2f}s "
+        f"({stats.tickets_per_second:,.0f} tickets/s, {stats.model_calls} model calls) -> {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
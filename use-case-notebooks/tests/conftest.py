@@ -0,0 +1,8 @@
+"""Make the notebook helper modules importable in these tests."""
+
+import sys
+from pathlib import Path
+
+NOTEBOOKS_DIR = Path(__file__).resolve().parents[1]
+if str(NOTEBOOKS_DIR) not in sys.path:
+    sys.path.insert(0, str(NOTEBOOKS_DIR))
@@ -0,0 +1,109 @@
+import os
+
+import pytest
+
+import evidence_index
+from evidence_index import EvidenceIndex
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def make_corpus(root):
+    write(root / "about.md", "# About\nPlatform engineer focused on incident response.\n")
+    write(root / "work-history.md", "# Work\nRan the uptime program for payments.\n")
+    write(root / "projects" / "search.md", "# Search\nBuilt an offline BM25 retrieval service.\n")
+
+
+def build(tmp_path):
+    root = tmp_path / "repo"
+    make_corpus(root)
+    index = EvidenceIndex(tmp_path / "index", root=root)
+    stats = index.update()
+    return root, index, stats
+
+
+def refs(hits):
+    return [hit.ref.split("#")[0] for hit in hits]
+
+
+def test_full_update_indexes_corpus_and_searches(tmp_path):
+    _, index, stats = build(tmp_path)
+    assert (stats.added, stats.removed) == (3, 0)
+    assert refs(index.search("incident response", k=1)) == ["about.md"]
+    assert refs(index.search("bm25 retrieval", k=1)) == ["projects/search.md"]
+    assert index.search("kubernetes") == []
+
+
+def test_update_with_paths_merges_into_existing_index(tmp_path):
+    root, index, _ = build(tmp_path)
+    passages = len(index)
+    write(root / "about.md", "# About\nPlatform engineer focused on chaos engineering drills.\n")
+
+    stats = index.update([root / "about.md"])
+
+    assert (stats.added, stats.changed, stats.removed) == (0, 1, 0)
+    assert len(index) == passages
+    assert refs(index.search("chaos drills", k=1)) == ["about.md"]
+    assert refs(index.search("uptime payments", k=1)) == ["work-history.md"]
+    assert index.search("incident response") == []
+
+
+def test_update_with_paths_adds_new_files_and_drops_deleted_ones(tmp_path):
+    root, index, _ = build(tmp_path)
+    extra = write(root / "projects" / "queue.md", "# Queue\nDesigned a lease-based work queue.\n")
+    (root / "work-history.md").unlink()
+
+    stats = index.update([extra])
+
+    assert (stats.added, stats.removed) == (1, 1)
+    assert refs(index.search("lease queue", k=1)) == ["projects/queue.md"]
+    assert index.search("uptime payments") == []
+    assert refs(index.search("incident response", k=1)) == ["about.md"]
+
+
+def test_full_update_removes_sources_outside_the_corpus(tmp_path):
+    root, index, _ = build(tmp_path)
+    (root / "projects" / "search.md").unlink()
+    stats = index.update()
+    assert stats.removed == 1
+    assert index.search("bm25 retrieval") == []
+
+
+def test_reload_sees_the_published_generation_only(tmp_path):
+    root, index, _ = build(tmp_path)
+    first = index.manifest["generation"]
+    write(root / "about.md", "# About\nNow focused on capacity planning.\n")
+    index.update([root / "about.md"])
+    second = index.manifest["generation"]
+    write(root / "about.md", "# About\nNow focused on cost reviews.\n")
+    index.update([root / "about.md"])
+    third = index.manifest["generation"]
+
+    names = sorted(path.name for path in index.index_dir.glob("*.npy"))
+    assert len({first, second, third}) == 3
+    assert not any(first in name for name in names)
+    assert {name.split(".")[1] for name in names} == {second, third}
+    assert not [name for name in os.listdir(index.index_dir) if name.endswith(".tmp")]
+
+    reloaded = EvidenceIndex(index.index_dir, root=root)
+    assert refs(reloaded.search("cost reviews", k=1)) == ["about.md"]
+
+
+def test_failed_write_keeps_the_previous_manifest(tmp_path, monkeypatch):
+    root, index, _ = build(tmp_path)
+    before = index.manifest_path.read_bytes()
+
+    def fail(*_args, **_kwargs):
+        raise OSError("disk full")
+
+    write(root / "about.md", "# About\nRewritten.\n")
+    monkeypatch.setattr(evidence_index.np, "save", fail)
+    with pytest.raises(OSError):
+        index.update([root / "about.md"])
+    assert index.manifest_path.read_bytes() == before
+    reloaded = EvidenceIndex(index.index_dir, root=root)
+    assert refs(reloaded.search("incident response", k=1)) == ["about.md"]
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import rfp_batch
+from evidence_index import SearchHit
+
+
+class StubIndex:
+    """Returns one hit per query whose text echoes the query."""
+
+    def __init__(self):
+        self.queries = []
+
+    def search_batch(self, queries, k=5):
+        self.queries.append(list(queries))
+        return [[SearchHit(ref=f"doc.md#q{n}", score=4.0, text=query)] for n, query in enumerate(queries)]
+
+
+def frame(questions):
+    return pd.DataFrame(
+        {
+            rfp_batch.ID_COLUMN: [f"q{n}" for n in range(len(questions))],
+            rfp_batch.QUESTION_COLUMN: questions,
+        }
+    )
+
+
+def test_jaccard_handles_empty_and_partial_overlap():
+    assert rfp_batch.jaccard(frozenset(), frozenset()) == 1.0
+    assert rfp_batch.jaccard(frozenset({"a", "b"}), frozenset({"b", "c"})) == pytest.approx(1 / 3)
+
+
+def test_group_questions_merges_reworded_duplicates_only():
+    questions = [
+        "Describe your incident response process.",
+        "describe YOUR process, incident response?",
+        "How do you encrypt customer data at rest?",
+        "Describe your incident response and escalation process.",
+        "Describe your incident response and escalation process.",
+    ]
+    # 3 shares 4 of its 5 content words with 0 (0.8), so it stays separate at 0.85.
+    assert rfp_batch.group_questions(questions) == [0, 0, 2, 3, 3]
+    assert rfp_batch.group_questions(questions, threshold=0.7) == [0, 0, 2, 0, 0]
+
+
+def test_answer_batch_retrieves_once_per_unique_question_and_keeps_row_order(monkeypatch):
+    def slow_first(model, prompt_version, question, passages):
+        # Earlier questions finish last, so completion order differs from input order.
+        time.sleep(0.02 if question.startswith("Describe") else 0.0)
+        return f"answer: {passages[0]}"
+
+    monkeypatch.setattr(rfp_batch, "fake_generate", slow_first)
+    index = StubIndex()
+    questions = [
+        "Describe your incident response process.",
+        "How do you encrypt customer data at rest?",
+        "describe your process, incident response?",
+        "Which regions host production workloads?",
+    ]
+
+    result, report = rfp_batch.answer_batch(frame(questions), index, max_concurrency=3)
+
+    assert index.queries == [[questions[0], questions[1], questions[3]]]
+    assert (report.questions, report.unique_questions, report.generation_calls) == (4, 3, 3)
+    assert list(result[rfp_batch.ID_COLUMN]) == ["q0", "q1", "q2", "q3"]
+    assert list(result["answer"]) == [
+        f"answer: {questions[0]}",
+        f"answer: {questions[1]}",
+        f"answer: {questions[0]}",
+        f"answer: {questions[3]}",
+    ]
+    assert list(result["evidence_refs"]) == [["doc.md#q0"], ["doc.md#q1"], ["doc.md#q0"], ["doc.md#q2"]]
+    assert set(report.stage_seconds) == {"dedupe", "retrieve", "generate"}
+
+
+def test_answer_batch_caps_concurrent_generation_calls(monkeypatch):
+    lock = threading.Lock()
+    active = peak = 0
+
+    def tracked(model, prompt_version, question, passages):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return question
+
+    monkeypatch.setattr(rfp_batch, "fake_generate", tracked)
+    questions = [f"Distinct question number {n} about topic{n}" for n in range(12)]
+
+    _, report = rfp_batch.answer_batch(frame(questions), StubIndex(), max_concurrency=2)
+
+    assert report.generation_calls == 12
+    assert peak == 2
+
+
+def test_answer_batch_rejects_non_positive_concurrency():
+    with pytest.raises(ValueError):
+        rfp_batch.answer_batch(frame(["q"]), StubIndex(), max_concurrency=0)
@@ -0,0 +1,227 @@
+import argparse
+import json
+import math
+import os
+import pickle
+from pathlib import Path
+
+import pytest
+
+import run_notebooks
+from run_notebooks import (
+    CellCache,
+    chain_keys,
+    inject_parameters,
+    notebook_output_dir,
+    parse_parameter,
+    restore_namespace,
+    run_notebook,
+    snapshot_namespace,
+)
+
+
+def code(source, tags=()):
+    metadata = {"tags": list(tags)} if tags else {}
+    return {"cell_type": "code", "execution_count": None, "metadata": metadata, "outputs": [], "source": source}
+
+
+def markdown(source):
+    return {"cell_type": "markdown", "metadata": {}, "source": source}
+
+
+def write_notebook(path, cells):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 5}), encoding="utf-8")
+    return path
+
+
+def notebook_cells(last="print(total + 1)"):
+    return [
+        markdown("# Demo"),
+        code('from pathlib import Path\nSTART = 40\nDATA_PATH = Path("data/in.csv")', tags=["parameters"]),
+        code("total = START + 1\nprint('ran first')"),
+        code(last),
+    ]
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    # run_notebook changes into the notebook directory; restore the test's cwd afterwards.
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def run(workspace, notebook, parameters=None):
+    return run_notebook(
+        str(notebook),
+        parameters or {},
+        str(workspace / "executed"),
+        str(workspace / "cache"),
+        track_memory=False,
+    )
+
+
+def statuses(result):
+    return [cell.status for cell in result.cells]
+
+
+def executed_outputs(result):
+    notebook = json.loads(Path(result.output).read_text(encoding="utf-8"))
+    return [cell["outputs"] for cell in notebook["cells"] if cell["cell_type"] == "code"]
+
+
+def test_parse_parameter_reads_json_values_and_falls_back_to_strings():
+    assert parse_parameter("LIMIT=5") == ("LIMIT", 5)
+    assert parse_parameter("DRY_RUN=true") == ("DRY_RUN", True)
+    assert parse_parameter("MODEL=glm") == ("MODEL", "glm")
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_parameter("no-equals")
+
+
+def test_parameters_are_injected_after_the_tagged_cell():
+    cells = [code("import os"), *notebook_cells()]
+
+    injected = inject_parameters(cells, {"START": 1, "DATA_PATH": "/data/full.csv"})
+
+    assert injected[3]["metadata"]["tags"] == [run_notebooks.INJECTED_TAG]
+    assert injected[3]["source"].splitlines()[1:] == ["START = 1", "DATA_PATH = Path('/data/full.csv')"]
+    assert injected[:3] == cells[:3] and injected[4:] == cells[3:]
+    assert inject_parameters(cells, {}) is cells
+
+
+def test_parameters_without_a_tag_go_after_the_first_code_cell():
+    cells = [markdown("# Demo"), code("x = 1"), code("x")]
+
+    injected = inject_parameters(cells, {"x": 2})
+
+    assert injected[2]["source"].endswith("x = 2\n")
+    with pytest.raises(ValueError):
+        inject_parameters([markdown("# Demo")], {"x": 2})
+
+
+def test_chained_keys_change_from_the_edited_cell_onwards():
+    cells = notebook_cells()
+    edited = notebook_cells(last="print(total + 2)")
+
+    keys, edited_keys = chain_keys(cells, "seed"), chain_keys(edited, "seed")
+
+    assert keys[:3] == edited_keys[:3]
+    assert keys[3] != edited_keys[3]
+    assert keys[0] == "seed"  # Markdown cells do not extend the chain.
+    assert set(chain_keys(cells, "other seed")).isdisjoint(keys)
+
+
+def test_unchanged_rerun_replays_every_cell(workspace):
+    notebook = write_notebook(workspace / "demo.ipynb", notebook_cells())
+
+    first = run(workspace, notebook)
+    second = run(workspace, notebook)
+
+    assert first.ok and statuses(first) == ["ran", "ran", "ran"]
+    assert statuses(second) == ["cached", "cached", "cached"]
+    assert executed_outputs(second) == executed_outputs(first)
+    assert executed_outputs(second)[2][0]["text"] == "42\n"
+
+
+def test_edit_resumes_from_the_snapshot_before_the_edited_cell(workspace):
+    notebook = write_notebook(workspace / "demo.ipynb", notebook_cells())
+    run(workspace, notebook)
+
+    write_notebook(notebook, notebook_cells(last="print(total * 2)"))
+    result = run(workspace, notebook)
+
+    # ``total`` comes from the restored namespace; the first cells did not run again.
+    assert result.ok and statuses(result) == ["cached", "cached", "ran"]
+    assert executed_outputs(result)[2][0]["text"] == "82\n"
+
+
+def test_parameter_change_invalidates_the_cache(workspace):
+    notebook = write_notebook(workspace / "demo.ipynb", notebook_cells())
+    run(workspace, notebook)
+
+    result = run(workspace, notebook, {"START": 10})
+
+    assert statuses(result) == ["ran", "ran", "ran", "ran"]
+    assert executed_outputs(result)[3][0]["text"] == "12\n"
+    assert json.loads(Path(result.output).read_text())["metadata"]["run_notebooks"]["parameters"] == {"START": 10}
+
+
+def test_unpicklable_namespace_resumes_from_an_earlier_snapshot(workspace):
+    cells = notebook_cells()
+    cells.insert(3, code("handle = open('demo.ipynb')"))
+    notebook = write_notebook(workspace / "demo.ipynb", cells)
+    run(workspace, notebook)
+
+    cells[4] = code("print(total * 2)")
+    write_notebook(notebook, cells)
+    result = run(workspace, notebook)
+
+    # The open file has no snapshot, so the cell that opened it runs again.
+    assert statuses(result) == ["cached", "cached", "ran", "ran"]
+    assert executed_outputs(result)[3][0]["text"] == "82\n"
+
+
+def test_failing_cell_stops_the_run_and_is_not_cached(workspace):
+    notebook = write_notebook(workspace / "demo.ipynb", notebook_cells(last="1 / 0"))
+
+    first = run(workspace, notebook)
+    second = run(workspace, notebook)
+
+    assert not first.ok and "ZeroDivisionError" in first.error
+    assert statuses(second) == ["cached", "cached", "error"]
+
+
+def test_written_files_are_restored_on_replay(workspace):
+    notebook = workspace / "demo.ipynb"
+    target = notebook_output_dir(notebook) / "report.txt"
+    cells = notebook_cells()
+    cells.append(code("Path('output/demo').mkdir(parents=True, exist_ok=True)\nPath('output/demo/report.txt').write_text('done')"))
+    write_notebook(notebook, cells)
+    run(workspace, notebook)
+
+    target.unlink()
+    result = run(workspace, notebook)
+
+    assert statuses(result)[-1] == "cached"
+    assert target.read_text() == "done"
+
+
+def test_only_the_notebooks_own_output_directory_is_attributed(workspace):
+    notebook = workspace / "demo.ipynb"
+    cells = notebook_cells()
+    # The write to output/other/ stands in for a notebook running in parallel.
+    cells.append(code(
+        "for name in ('output/demo/mine.txt', 'output/other/theirs.txt', 'scratch.txt'):\n"
+        "    Path(name).parent.mkdir(parents=True, exist_ok=True)\n"
+        "    Path(name).write_text(name)"
+    ))
+    write_notebook(notebook, cells)
+    run(workspace, notebook)
+
+    entries = [json.loads(path.read_text()) for path in (workspace / "cache").glob("*.json")]
+    files = {name for entry in entries for name in entry["files"]}
+
+    assert files == {"output/demo/mine.txt"}
+
+
+def test_namespace_snapshot_round_trip():
+    namespace = {"__name__": "__main__", "json": json, "sqrt": math.sqrt, "Path": Path, "data": {"rows": [1, 2]}}
+
+    restored = restore_namespace(pickle.loads(snapshot_namespace(namespace)))
+
+    assert restored["json"] is json
+    assert restored["sqrt"] is math.sqrt
+    assert restored["Path"] is Path
+    assert restored["data"] == {"rows": [1, 2]}
+    assert snapshot_namespace({"gen": (n for n in range(3))}) is None
+
+
+def test_prune_drops_least_recently_used_entries(tmp_path):
+    cache = CellCache(tmp_path / "cache", max_bytes=10_000)
+    for last_used, key in enumerate(["old", "mid", "new"], start=1_000_000):
+        cache.save_outputs(key, [{"text": "x" * 4_000}])
+        os.utime(tmp_path / "cache" / f"{key}.json", (last_used, last_used))
+
+    assert cache.prune() == 1
+    assert cache.outputs("old") is None
+    assert cache.outputs("new") is not None
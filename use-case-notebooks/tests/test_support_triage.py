@@ -0,0 +1,55 @@
+import pandas as pd
+import pyarrow.parquet as pq
+
+import support_triage
+
+# One ticket per branch of the team and priority np.select calls.
+TICKETS = [
+    ("t1", "Suspicious phishing email asked for my password reset"),  # security, high
+    ("t2", "Question about my invoice from last month"),  # billing, low
+    ("t3", "URGENT: checkout has a 503 outage"),  # sre, high
+    ("t4", "How do I update my profile picture?"),  # account, low
+    ("t5", "The office plant needs watering"),  # default team, medium
+    ("t6", "Refund still missing after a timeout and my account is locked out"),  # first rule wins
+    ("t7", ""),  # empty text falls through to defaults
+]
+
+EXPECTED = {
+    "t1": ("high", "security-ops"),
+    "t2": ("low", "billing-ops"),
+    "t3": ("high", "platform-sre"),
+    "t4": ("low", "account-support"),
+    "t5": ("medium", "general-support"),
+    "t6": ("medium", "billing-ops"),
+    "t7": ("medium", "general-support"),
+}
+
+
+def write_tickets(tmp_path):
+    path = tmp_path / "tickets.csv"
+    pd.DataFrame(TICKETS, columns=[support_triage.ID_COLUMN, support_triage.TEXT_COLUMN]).to_csv(
+        path, index=False
+    )
+    return path
+
+
+def test_small_chunks_route_every_branch_like_a_single_chunk(tmp_path):
+    source = write_tickets(tmp_path)
+    chunked_path = tmp_path / "chunked.parquet"
+    single_path = tmp_path / "single.parquet"
+
+    chunked = support_triage.triage_csv(source, chunked_path, chunksize=2, batch_size=1)
+    single = support_triage.triage_csv(source, single_path, chunksize=len(TICKETS))
+
+    assert chunked.chunks == 4 and single.chunks == 1
+    assert chunked.tickets == single.tickets == len(TICKETS)
+    assert chunked.model_calls == len(TICKETS)
+
+    chunked_frame = pq.read_table(chunked_path).to_pandas()
+    single_frame = pq.read_table(single_path).to_pandas()
+    pd.testing.assert_frame_equal(chunked_frame, single_frame)
+
+    routed = {
+        row.ticket_id: (row.priority, row.assigned_team) for row in chunked_frame.itertuples()
+    }
+    assert routed == EXPECTED